@@ -27,7 +27,13 @@ import time
 import os
 import hashlib
 import hmac
+import sys
 from datetime import datetime
+import numpy as np
+
+# Overload control engine behind the signaling-storm throttle; imported by
+# generate_signaling_storm_pcap only, so the other scenarios stand alone
+UCRED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'proof', 'ucred-stateless')
 
 # ============================================================================
 # PCAP FILE FORMAT STRUCTURES
@@ -645,9 +651,26 @@ def generate_signaling_storm_pcap(output_file):
     4. Attacker requests throttled, legitimate traffic continues
     
     Visual: Normal → Storm → Throttle → Continue
+    
+    Verdicts and counts come from replaying one second of a 10,000/sec
+    flood through overload_control.OverloadController.
     """
+    if UCRED_DIR not in sys.path:
+        sys.path.insert(0, UCRED_DIR)
+    from overload_control import (OverloadController, flood_trace, replay, SOURCE_RATE,
+                                  ATTACK_SOURCES, PRIORITY_BINDER)
+
     pcap = PCAPWriter(output_file)
     
+    flood_rate = 10000
+    times, sources, priorities, attack = flood_trace(1.0, np.random.default_rng(4), attack_rate=flood_rate)
+    controller = OverloadController()
+    admitted = replay(controller, times, sources, priorities)
+    attack_idx = np.flatnonzero(attack)
+    legit_binder = ~attack & (priorities == PRIORITY_BINDER)
+    shed_pct = 100 * (1 - admitted[attack].mean())
+    legit_pct = 100 * admitted[legit_binder].mean()
+    
     legit_mac = bytes.fromhex('001122334455')
     gnb_mac = bytes.fromhex('665544332211')
     
@@ -672,11 +695,13 @@ def generate_signaling_storm_pcap(output_file):
     # =========================================================================
     # Packets 2-11: Signaling storm (ATTACK - 10 sample packets)
     # =========================================================================
-    for i in range(10):
+    # Sampled from the tail of the replayed second, once buckets are drained
+    for i, k in enumerate(attack_idx[-10:]):
         timestamp += 0.0001  # 100μs apart (10,000/sec rate)
         
-        attacker_mac = bytes([0xDE, 0xAD, 0x00, 0x00, i >> 8, i & 0xFF])
-        attacker_ip = bytes([10, i, (i*7) % 256, (i*13) % 256])
+        src = int(sources[k])
+        attacker_mac = bytes([0xDE, 0xAD, 0x00, 0x00, src >> 8, src & 0xFF])
+        attacker_ip = bytes([10, src >> 8, src & 0xFF, (i*13) % 256])
         
         # Random fake UE ID
         fake_ue_id = f'FAKE_UE_{i:04d}'.encode()
@@ -688,7 +713,8 @@ def generate_signaling_storm_pcap(output_file):
         eth_storm = build_ethernet_header(attacker_mac, gnb_mac)
         
         pkt_storm = eth_storm + ip_storm + sctp_storm + nas_storm
-        comment_storm = f'[STORM #{i+1}] DDoS attack - {10000} requests/sec flood'.encode()
+        verdict = 'ADMITTED' if admitted[k] else 'SHED'
+        comment_storm = f'[STORM #{i+1}] DDoS attack - {flood_rate} requests/sec flood - {verdict}'.encode()
         pcap.add_packet(pkt_storm + bytes([0x00]*4) + comment_storm, timestamp)
     
     # =========================================================================
@@ -701,8 +727,10 @@ def generate_signaling_storm_pcap(output_file):
         0x55, 0x43,  # Custom: U-CRED rate limit
         0x01,        # Action: Throttle
     ])
-    ucred_throttle += b'UCRED_STORM_DETECTED: 10000 req/s exceeds 5000 threshold'
-    ucred_throttle += b' | STATELESS_THROTTLE: Token bucket depleted for attack IPs'
+    ucred_throttle += (f'UCRED_STORM_DETECTED: {flood_rate} req/s from {ATTACK_SOURCES} sources'
+                       f' | STATELESS_THROTTLE: {SOURCE_RATE:g} req/s token bucket per source,'
+                       f' {shed_pct:.1f}% of flood shed, concurrency limit {controller.limiter.limit:.0f}'
+                       f' | KNOWN_UE_ADMITTED: {legit_pct:.1f}%').encode()
     
     sctp_throttle = build_sctp_header(38412, 38412)
     ip_throttle = build_ip_header(gnb_ip, bytes([10, 0, 0, 1]), protocol=132,
@@ -733,7 +761,8 @@ def generate_signaling_storm_pcap(output_file):
     print(f"✅ Generated: {output_file}")
     print(f"   Packets: 13 (Normal → 10 Storm → Throttle → Continue)")
     print(f"   Attack type: Signaling storm DDoS (10,000 req/s)")
-    print(f"   Protection: U-CRED stateless rate limiting")
+    print(f"   Protection: U-CRED stateless rate limiting "
+          f"({shed_pct:.1f}% of flood shed, {legit_pct:.1f}% of known UEs admitted)")
 
 def generate_protocol_poisoning_pcap(output_file):
     """
@@ -1,7 +1,9 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import csv
+import time
 from math import log, ceil
+from pfcp_replay_filter import PFCPReplayBloomFilter
 
 """
 ARC-3 E7: Bloom Filter Sizing & Performance
@@ -25,6 +27,9 @@ Test Configurations:
 Target Results (from paper):
 - 1M sessions @ FPR=1e-6: 3.43 MB, k=20 hash functions
 - Lookup time: 0.8μs (meets 10μs budget)
+
+Insert/lookup times are measured on this host with the working filter in
+pfcp_replay_filter.py (see that module for the full 1M-100M benchmark).
 """
 
 def calculate_bloom_parameters(n, p):
@@ -46,29 +51,41 @@ def calculate_bloom_parameters(n, p):
     
     return m, k
 
-def simulate_bloom_filter_performance(n, m, k, num_trials=10000):
+def simulate_bloom_filter_performance(n, m, k, num_scalar=10_000):
     """
-    Simulates Bloom filter insertion and lookup performance.
-    
+    Measures a real filter of geometry (m, k) filled to its design load n.
+
     Returns:
-        (insert_time_us, lookup_time_us, actual_fpr)
+        (insert_time_us, lookup_time_us, batch_lookup_us, expected_fpr)
+        insert_time_us / batch_lookup_us: per nonce, amortized over
+        add_many / contains_many batches (throughput, not latency)
+        lookup_time_us: scalar contains() per PFCP message for nonces
+        already seen, the worst case (all k probes are tested)
     """
-    # Simulate hash computation time (SHA-256 based)
-    # Modern CPU: ~1 cycle per byte, SHA-256 block = 64 bytes, 3GHz CPU
-    hash_time_per_operation = 0.021  # microseconds (measured on Intel i7)
-    
-    # Insertion: k hash computations + k bit sets
-    insert_time = k * hash_time_per_operation + k * 0.002  # bit set = 2ns
-    
-    # Lookup: k hash computations + k bit checks
-    lookup_time = k * hash_time_per_operation + k * 0.002
-    
-    # Actual FPR (depends on fill ratio)
-    # After inserting n elements, probability that k random bits are all set:
-    # actual_fpr = (1 - e^(-kn/m))^k
-    actual_fpr = (1 - np.exp(-k * n / m)) ** k
-    
-    return insert_time, lookup_time, actual_fpr
+    rng = np.random.default_rng(n ^ k)
+    bf = PFCPReplayBloomFilter(n, None, num_bits=m, num_hashes=k)
+    inserted = rng.integers(0, 2**63, size=n, dtype=np.uint64)
+    
+    start = time.perf_counter()
+    bf.add_many(inserted)
+    insert_time = (time.perf_counter() - start) / n * 1e6
+    
+    start = time.perf_counter()
+    bf.contains_many(inserted)
+    batch_lookup = (time.perf_counter() - start) / n * 1e6
+    
+    # Per-message latency: one scalar lookup per PFCP message
+    seen = [int(x) for x in inserted[:num_scalar]]
+    start = time.perf_counter()
+    for nonce in seen:
+        bf.contains(nonce)
+    lookup_time = (time.perf_counter() - start) / num_scalar * 1e6
+    
+    # Closed-form FPR at design load: probability that k random bits are all set
+    # expected_fpr = (1 - e^(-kn/m))^k
+    expected_fpr = (1 - np.exp(-k * n / m)) ** k
+    
+    return insert_time, lookup_time, batch_lookup, expected_fpr
 
 def run_bloom_filter_analysis():
     """Main analysis: Test 9 configurations (3 session counts × 3 FPR targets)."""
@@ -80,7 +97,8 @@ def run_bloom_filter_analysis():
     
     results = []
     
-    print(f"{'Sessions':<12} {'FPR Target':<12} {'Memory (MB)':<14} {'k hashes':<10} {'Lookup (μs)':<13} {'Status':<10}")
+    print(f"{'Sessions':<12} {'FPR Target':<12} {'Memory (MB)':<14} {'k hashes':<10} {'Lookup (μs)':<13} "
+          f"{'Batch (μs)':<12} {'Status':<10}")
     print("-" * 90)
     
     for n in session_counts:
@@ -92,13 +110,13 @@ def run_bloom_filter_analysis():
             memory_mb = m / (8 * 1024 * 1024)
             
             # Performance
-            insert_time, lookup_time, actual_fpr = simulate_bloom_filter_performance(n, m, k)
+            insert_time, lookup_time, batch_lookup, expected_fpr = simulate_bloom_filter_performance(n, m, k)
             
-            # Budget: 10μs lookup time (must fit within PFCP processing budget)
+            # Budget: 10μs per-message lookup (must fit within PFCP processing budget)
             compliant = lookup_time < 10.0
             status = "✅" if compliant else "❌"
             
-            print(f"{n:<12,} {p:<12.0e} {memory_mb:<14.2f} {k:<10} {lookup_time:<13.3f} {status:<10}")
+            print(f"{n:<12,} {p:<12.0e} {memory_mb:<14.2f} {k:<10} {lookup_time:<13.3f} {batch_lookup:<12.3f} {status:<10}")
             
             results.append({
                 "sessions": n,
@@ -106,7 +124,8 @@ def run_bloom_filter_analysis():
                 "memory_mb": memory_mb,
                 "k_hashes": k,
                 "lookup_time_us": lookup_time,
-                "actual_fpr": actual_fpr,
+                "batch_lookup_us": batch_lookup,
+                "expected_fpr": expected_fpr,
                 "compliant": compliant,
             })
     
@@ -126,7 +145,7 @@ def run_bloom_filter_analysis():
     # Save CSV
     with open('bloom_filter_sizing.csv', 'w', newline='') as f:
         writer = csv.DictWriter(f, fieldnames=['sessions', 'fpr_target', 'memory_mb', 'k_hashes', 
-                                               'lookup_time_us', 'actual_fpr', 'compliant'])
+                                               'lookup_time_us', 'batch_lookup_us', 'expected_fpr', 'compliant'])
         writer.writeheader()
         writer.writerows(results)
     
@@ -186,7 +205,7 @@ def run_bloom_filter_analysis():
     bars = ax3.bar(k_values, lookup_times, color='#0074D9', edgecolor='black', linewidth=1.5)
     ax3.axhline(10.0, color='red', linestyle='--', linewidth=2, label='10μs Budget')
     ax3.set_xlabel('Number of Hash Functions (k)', fontsize=12)
-    ax3.set_ylabel('Lookup Time (μs)', fontsize=12)
+    ax3.set_ylabel('Per-Message Lookup Time (μs)', fontsize=12)
     ax3.set_title('Bloom Filter Lookup Performance', fontsize=13, fontweight='bold')
     ax3.legend(fontsize=10)
     ax3.grid(axis='y', alpha=0.3)
@@ -236,9 +255,13 @@ def run_bloom_filter_analysis():
     print(f"  - Cost of 100x better security: {target['memory_mb'] / [r for r in results if r['sessions']==1_000_000 and r['fpr_target']==1e-4][0]['memory_mb']:.2f}x memory")
     
     print(f"\nPerformance:")
-    print(f"  - Lookup time scales linearly with k (number of hash functions)")
-    print(f"  - All configurations meet <10μs budget (PFCP processing constraint)")
-    print(f"  - k=20 @ 0.8μs leaves 9.2μs for other validation steps")
+    print(f"  - Per-message lookup of a seen nonce tests all k probes (worst case above); "
+          f"fresh nonces usually exit after one or two")
+    compliant_count = sum(r["compliant"] for r in results)
+    print(f"  - {compliant_count}/{len(results)} configurations meet the <10μs per-message budget "
+          f"(PFCP processing constraint)")
+    print(f"  - k={target['k_hashes']} @ {target['lookup_time_us']:.2f}μs (measured) leaves "
+          f"{10.0 - target['lookup_time_us']:.2f}μs for other validation steps")
     
     # Alternative: Hash table comparison
     print(f"\n--- Hash Table Comparison ---")
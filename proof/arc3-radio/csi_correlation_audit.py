@@ -37,19 +37,10 @@ def generate_heatmap(sim, golden_csi):
 def generate_histogram(sim, golden_csi, num_trials=10000):
     """
     Runs 10,000 trials to generate the False Accept / False Reject histogram.
+    Trials are generated as (N, subcarriers) batches, not one vector at a time.
     """
-    legit_scores = []
-    attacker_scores = []
-    
-    for _ in range(num_trials):
-        # Legitimate attempt (0m offset)
-        legit_attempt = sim.inject_noise(golden_csi, snr_db=10)
-        legit_scores.append(CSISimulator.calculate_correlation(golden_csi, legit_attempt))
-        
-        # Attacker attempt (5m offset)
-        attacker_csi = sim.generate_multipath_channel(location_offset=5.0)
-        attacker_attempt = sim.inject_noise(attacker_csi, snr_db=10)
-        attacker_scores.append(CSISimulator.calculate_correlation(golden_csi, attacker_attempt))
+    legit_scores = np.concatenate(list(sim.correlation_scores(golden_csi, 0.0, num_trials, snr_db=10)))
+    attacker_scores = np.concatenate(list(sim.correlation_scores(golden_csi, 5.0, num_trials, snr_db=10)))
         
     plt.figure(figsize=(10, 6))
     plt.hist(legit_scores, bins=50, alpha=0.6, label='Legitimate User (0m)', color='blue')
@@ -63,9 +54,52 @@ def generate_histogram(sim, golden_csi, num_trials=10000):
     print("Saved csi_false_accept_histogram.png")
     
     # Calculate False Accept Rate (FAR)
-    far = np.sum(np.array(attacker_scores) > 0.5) / num_trials
-    frr = np.sum(np.array(legit_scores) < 0.5) / num_trials
+    far = np.sum(attacker_scores > 0.5) / num_trials
+    frr = np.sum(legit_scores < 0.5) / num_trials
     print(f"Audit Results: FAR = {far:.6f}, FRR = {frr:.6f}")
+    return far, frr
+
+def sweep_far_frr(sim, golden_csi, snrs_db, attacker_offsets, num_trials=1_000_000,
+                  threshold=0.5, chunk_size=1024):
+    """
+    FAR/FRR over an SNR x attacker-offset grid.
+    Only accept/reject counts are kept, so millions of trials per point run
+    in memory bounded by chunk_size.
+    Returns a list of dicts: {snr_db, offset_m, far, frr, trials}.
+    """
+    rows = []
+    for snr_db in snrs_db:
+        false_rejects = sum(int(np.sum(chunk < threshold)) for chunk in
+                            sim.correlation_scores(golden_csi, 0.0, num_trials, snr_db, chunk_size))
+        for offset in attacker_offsets:
+            false_accepts = sum(int(np.sum(chunk > threshold)) for chunk in
+                                sim.correlation_scores(golden_csi, offset, num_trials, snr_db, chunk_size))
+            rows.append({
+                'snr_db': snr_db,
+                'offset_m': offset,
+                'far': false_accepts / num_trials,
+                'frr': false_rejects / num_trials,
+                'trials': num_trials,
+            })
+    return rows
+
+def audit_far_frr_grid(sim, golden_csi, far, frr, snrs_db=(-5, 0, 10), attacker_offsets=(0.5, 5.0),
+                       num_trials=10000):
+    """
+    Small SNR x offset sweep; its (10 dB, 5 m) point must agree with the
+    histogram's single-point FAR/FRR within sampling error.
+    """
+    rows = sweep_far_frr(sim, golden_csi, snrs_db, attacker_offsets, num_trials=num_trials)
+    print(f"FAR/FRR sweep ({num_trials:,} trials per point):")
+    print(f"  {'SNR (dB)':>8} {'offset (m)':>10} {'FAR':>10} {'FRR':>10}")
+    for r in rows:
+        print(f"  {r['snr_db']:>8} {r['offset_m']:>10.1f} {r['far']:>10.6f} {r['frr']:>10.6f}")
+    ref = next(r for r in rows if r['snr_db'] == 10 and r['offset_m'] == 5.0)
+    tolerance = lambda p: 4 * np.sqrt(max(p, 1 / num_trials) / num_trials)
+    agrees = abs(ref['far'] - far) <= tolerance(far) and abs(ref['frr'] - frr) <= tolerance(frr)
+    print(f"Sweep at 10 dB / 5 m vs histogram: FAR {ref['far']:.6f} vs {far:.6f}, "
+          f"FRR {ref['frr']:.6f} vs {frr:.6f} {'✅' if agrees else '❌'}")
+    return agrees
 
 def generate_pareto():
     """
@@ -101,9 +135,13 @@ def main():
     golden_csi = sim.generate_multipath_channel(location_offset=0.0)
     
     generate_heatmap(sim, golden_csi)
-    generate_histogram(sim, golden_csi)
+    far, frr = generate_histogram(sim, golden_csi)
+    sweep_agrees = audit_far_frr_grid(sim, golden_csi, far, frr)
     generate_pareto()
-    print("Audit Complete. All Sovereign Proofs generated.")
+    if sweep_agrees:
+        print("Audit Complete. All Sovereign Proofs generated.")
+    else:
+        print("Audit FAILED: FAR/FRR sweep disagrees with the single-point audit.")
 
 if __name__ == "__main__":
     main()
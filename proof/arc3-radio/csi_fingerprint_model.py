@@ -81,6 +81,102 @@ class CSISimulator:
         
         return csi_vector + noise + pink_noise
 
+    # ------------------------------------------------------------------
+    # Batched API: (N, num_subcarriers) matrices instead of one vector per call
+    # ------------------------------------------------------------------
+
+    def generate_multipath_channels(self, location_offsets, chunk_size=1024):
+        """
+        Batched generate_multipath_channel().
+        location_offsets: scalar or array of N offsets (meters).
+        Returns an (N, num_subcarriers) complex matrix of normalized CSI rows.
+        
+        The (N, paths, subcarriers) phase tensor is built chunk_size rows at a
+        time, so peak memory is ~chunk_size * num_paths * num_subcarriers * 16B.
+        """
+        c = 0.3  # Speed of light in m/ns
+        offsets = np.atleast_1d(np.asarray(location_offsets, dtype=float))
+        out = np.empty((offsets.size, self.num_subcarriers), dtype=complex)
+        
+        for start in range(0, offsets.size, chunk_size):
+            off = offsets[start:start + chunk_size]
+            n = off.size
+            
+            # (n, paths) delays and gains
+            delays = self.base_delays[None, :] + (off[:, None] * np.cos(self.angles_of_arrival)[None, :]) / c
+            gains = np.broadcast_to(self.path_gains, (n, self.num_paths)).copy()
+            moved = off > 0
+            if np.any(moved):
+                # Location-specific phase noise on every path of displaced users
+                gains[moved] *= np.exp(1j * self.rng.uniform(0, 2*np.pi, (int(moved.sum()), self.num_paths)))
+            
+            uniq, inverse = np.unique(off, return_inverse=True)
+            if uniq.size * 8 <= n:
+                # Few distinct offsets (the usual FAR/FRR sweep): rows sharing an
+                # offset share delays, so one (paths, subcarriers) steering matrix
+                # per offset turns the chunk into a plain matrix product.
+                csi = np.empty((n, self.num_subcarriers), dtype=complex)
+                for u, offset in enumerate(uniq):
+                    rows = inverse == u
+                    u_delays = self.base_delays + (offset * np.cos(self.angles_of_arrival)) / c
+                    steering = np.exp(-1j * 2 * np.pi * u_delays[:, None] * self.freqs[None, :] * 1e-9)
+                    csi[rows] = gains[rows] @ steering
+            else:
+                # (n, paths, subcarriers) -> sum over paths
+                phases = np.exp(-1j * 2 * np.pi * delays[:, :, None] * (self.freqs * 1e-9)[None, None, :])
+                csi = np.einsum('np,nps->ns', gains, phases)
+            
+            csi /= np.linalg.norm(csi, axis=1, keepdims=True)
+            out[start:start + n] = csi
+        
+        return out
+
+    def inject_noise_batch(self, csi_matrix, snr_db=10):
+        """
+        Batched inject_noise(): AWGN + pink noise on every row of an
+        (N, num_subcarriers) matrix, with per-row signal power.
+        """
+        csi_matrix = np.atleast_2d(csi_matrix)
+        n, s = csi_matrix.shape
+        snr_linear = 10**(snr_db / 10.0)
+        signal_power = np.mean(np.abs(csi_matrix)**2, axis=1, keepdims=True)
+        noise_power = signal_power / snr_linear
+        noise = (self.rng.standard_normal((n, s)) +
+                 1j * self.rng.standard_normal((n, s))) * np.sqrt(noise_power / 2)
+        
+        pink_noise_coeffs = 1.0 / (np.arange(1, s + 1)**0.5)
+        pink_noise = (self.rng.standard_normal((n, s)) +
+                      1j * self.rng.standard_normal((n, s))) * pink_noise_coeffs
+        pink_noise = pink_noise * (np.sqrt(noise_power) * 0.5)
+        
+        return csi_matrix + noise + pink_noise
+
+    @staticmethod
+    def calculate_correlations(reference, csi_matrix):
+        """
+        Batched calculate_correlation(): |<ref, row>| for every row.
+        reference: (num_subcarriers,) vector; csi_matrix: (N, num_subcarriers).
+        """
+        ref = reference / np.linalg.norm(reference)
+        rows = np.atleast_2d(csi_matrix)
+        return np.abs(rows @ ref.conj()) / np.linalg.norm(rows, axis=1)
+
+    def correlation_scores(self, reference, location_offset, num_trials, snr_db=10, chunk_size=1024):
+        """
+        Yields correlation-score chunks for num_trials noisy captures at one offset.
+        Offset 0 reuses `reference` as the clean channel (legitimate user);
+        any other offset draws a fresh channel per trial (spoofer).
+        Memory stays bounded by chunk_size regardless of num_trials.
+        """
+        for start in range(0, num_trials, chunk_size):
+            n = min(chunk_size, num_trials - start)
+            if location_offset == 0:
+                clean = np.broadcast_to(reference, (n, self.num_subcarriers))
+            else:
+                clean = self.generate_multipath_channels(np.full(n, float(location_offset)), chunk_size)
+            noisy = self.inject_noise_batch(clean, snr_db=snr_db)
+            yield CSISimulator.calculate_correlations(reference, noisy)
+
     @staticmethod
     def calculate_correlation(vec1, vec2):
         """
@@ -0,0 +1,370 @@
+import numpy as np
+import secrets
+import time
+import csv
+from math import log, ceil
+
+"""
+ARC-3 E7b: PFCP Nonce Replay Filter (Working Implementation + Benchmark)
+Companion to bloom_filter_sizing.py, which only evaluates the closed-form FPR.
+
+This module is the filter the SMF would actually run:
+- Packed bit array (8 bits per byte, shared between a bytearray and a NumPy view)
+- Kirsch-Mitzenmacher double hashing: k probe positions g_i = h1 + i*h2 (mod m)
+  derived from ONE keyed 128-bit digest per nonce
+- Bulk add_many / contains_many / check_and_add_many over uint64 NumPy arrays
+- Time-windowed generations so nonces expire without rebuilding the filter
+
+The keyed digest is a 64->128 bit mix (MurmurHash3 fmix64 finalizer with a
+secret 128-bit key). It is not a MAC, but the key keeps probe positions
+unpredictable to an attacker trying to pre-compute colliding nonces.
+
+The benchmark at the bottom measures real inserts/sec, lookups/sec and
+observed FPR at 1M-100M sessions so SMF memory can be sized from
+measurements rather than formulas.
+
+Reference: Kirsch & Mitzenmacher, "Less Hashing, Same Performance" (ESA 2006)
+"""
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+BENCH_SESSION_COUNTS = [1_000_000, 10_000_000, 100_000_000]
+BENCH_FPR_TARGET = 1e-6
+BENCH_PROBE_COUNT = 2_000_000     # Fresh nonces used to measure observed FPR
+BENCH_CHUNK = 1 << 18             # Nonces per vectorized batch (bounds temp memory)
+
+POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+FMIX_C1 = 0xFF51AFD7ED558CCD
+FMIX_C2 = 0xC4CEB9FE1A85EC53
+
+# ============================================================================
+# KEYED DIGEST (scalar and vectorized forms produce identical bits)
+# ============================================================================
+
+def _fmix64(x):
+    """MurmurHash3 64-bit finalizer (Python int)."""
+    x ^= x >> 33
+    x = (x * FMIX_C1) & MASK64
+    x ^= x >> 33
+    x = (x * FMIX_C2) & MASK64
+    x ^= x >> 33
+    return x
+
+def _fmix64_np(x):
+    """MurmurHash3 64-bit finalizer over a uint64 array (wrapping multiply)."""
+    x = x ^ (x >> np.uint64(33))
+    x = x * np.uint64(FMIX_C1)
+    x = x ^ (x >> np.uint64(33))
+    x = x * np.uint64(FMIX_C2)
+    x = x ^ (x >> np.uint64(33))
+    return x
+
+def keyed_digest(nonce, key):
+    """128-bit keyed digest of a 64-bit nonce -> (h1, h2), h2 forced odd."""
+    k0, k1 = key
+    h1 = _fmix64((nonce ^ k0) & MASK64)
+    h2 = _fmix64(h1 ^ k1) | 1
+    return h1, h2
+
+def keyed_digest_many(nonces, key):
+    """Vectorized keyed_digest(): uint64 array -> (h1, h2) uint64 arrays."""
+    k0, k1 = np.uint64(key[0]), np.uint64(key[1])
+    with np.errstate(over='ignore'):
+        h1 = _fmix64_np(np.asarray(nonces, dtype=np.uint64) ^ k0)
+        h2 = _fmix64_np(h1 ^ k1) | np.uint64(1)
+    return h1, h2
+
+def nonce_from_bytes(nonce_bytes):
+    """PFCP nonces on the wire are opaque bytes; the filter keys on 64 bits."""
+    return int.from_bytes(nonce_bytes[:8].ljust(8, b"\x00"), "big")
+
+# ============================================================================
+# BLOOM FILTER
+# ============================================================================
+
+def calculate_bloom_parameters(n, p):
+    """Optimal (m bits, k hashes) for n elements at false positive rate p."""
+    m = ceil(-(n * log(p)) / (log(2) ** 2))
+    k = ceil((m / n) * log(2))
+    return m, k
+
+class PFCPReplayBloomFilter:
+    """
+    Packed-bit Bloom filter for 64-bit PFCP nonces.
+
+    Storage is a bytearray (fast scalar path) with a zero-copy uint8 NumPy
+    view (bulk path), so both paths read and write the same bits.
+    """
+
+    def __init__(self, capacity, fpr, key=None, num_bits=None, num_hashes=None):
+        """
+        capacity/fpr size the filter optimally; num_bits/num_hashes override
+        the geometry (e.g. to benchmark a configuration from a sizing table).
+        """
+        self.capacity = capacity
+        self.fpr_target = fpr
+        if num_bits is None or num_hashes is None:
+            num_bits, num_hashes = calculate_bloom_parameters(capacity, fpr)
+        self.num_bits, self.num_hashes = num_bits, num_hashes
+        self.key = key if key is not None else (secrets.randbits(64), secrets.randbits(64))
+        self._buf = bytearray((self.num_bits + 7) // 8)
+        self.bits = np.frombuffer(self._buf, dtype=np.uint8)
+        self.count = 0
+
+        self._probe_steps = np.arange(self.num_hashes, dtype=np.uint64)
+
+    @property
+    def memory_bytes(self):
+        return len(self._buf)
+
+    def clear(self):
+        self.bits[:] = 0
+        self.count = 0
+
+    # ------------------------------------------------------------------
+    # Scalar path (one PFCP message at a time)
+    # ------------------------------------------------------------------
+
+    def _positions(self, nonce):
+        """Probe positions g_i = h1 + i*h2 (mod 2^64) mod m, generated lazily."""
+        g, h2 = keyed_digest(nonce, self.key)
+        m = self.num_bits
+        for _ in range(self.num_hashes):
+            yield g % m
+            g = (g + h2) & MASK64
+
+    def add(self, nonce):
+        buf = self._buf
+        for pos in self._positions(nonce):
+            buf[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def contains(self, nonce):
+        # Early exit: a fresh nonce usually misses on the first probe or two
+        buf = self._buf
+        for pos in self._positions(nonce):
+            if not buf[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def __contains__(self, nonce):
+        return self.contains(nonce)
+
+    # ------------------------------------------------------------------
+    # Bulk path (NumPy uint64 arrays)
+    # ------------------------------------------------------------------
+
+    def _positions_many(self, nonces):
+        """(N, k) probe positions for N nonces."""
+        h1, h2 = keyed_digest_many(nonces, self.key)
+        with np.errstate(over='ignore'):
+            g = h1[:, None] + self._probe_steps[None, :] * h2[:, None]
+        return g % np.uint64(self.num_bits)
+
+    def add_many(self, nonces):
+        nonces = np.asarray(nonces, dtype=np.uint64)
+        pos = self._positions_many(nonces).ravel()
+        np.bitwise_or.at(self.bits, pos >> np.uint64(3),
+                         np.left_shift(1, pos & np.uint64(7)).astype(np.uint8))
+        self.count += nonces.size
+
+    def contains_many(self, nonces):
+        """Boolean array: True where every probe bit is set (possible replay)."""
+        pos = self._positions_many(np.asarray(nonces, dtype=np.uint64))
+        hits = (self.bits[pos >> np.uint64(3)] >> (pos & np.uint64(7)).astype(np.uint8)) & 1
+        return hits.all(axis=1)
+
+    def check_and_add_many(self, nonces):
+        """
+        Replay check for a batch in arrival order: returns a boolean mask of
+        nonces that were already seen (earlier batches OR earlier in this
+        batch), then records all of them.
+        """
+        nonces = np.asarray(nonces, dtype=np.uint64)
+        seen = self.contains_many(nonces)
+        _, first_idx = np.unique(nonces, return_index=True)
+        repeated = np.ones(nonces.size, dtype=bool)
+        repeated[first_idx] = False
+        self.add_many(nonces)
+        return seen | repeated
+
+    def fill_ratio(self, chunk=1 << 24):
+        """Fraction of bits set (chunked popcount; no full unpackbits copy)."""
+        ones = 0
+        for start in range(0, self.bits.size, chunk):
+            ones += int(POPCOUNT8[self.bits[start:start + chunk]].sum(dtype=np.int64))
+        return ones / self.num_bits
+
+# ============================================================================
+# TIME-WINDOWED ROTATION
+# ============================================================================
+
+class RotatingReplayFilter:
+    """
+    Generational Bloom filter: nonces expire after `window_s` seconds.
+
+    The window is split into `generations` slices. Inserts go to the newest
+    generation; lookups check all of them. When a slice elapses the oldest
+    generation is cleared and reused as the newest. A nonce is therefore
+    remembered for at least window_s * (G-1)/G and at most window_s.
+    Each generation is sized for fpr/G so the union still meets `fpr`.
+    """
+
+    def __init__(self, capacity_per_window, fpr, window_s=30.0, generations=4, key=None, clock=time.monotonic):
+        self.window_s = window_s
+        self.slice_s = window_s / generations
+        self.clock = clock
+        key = key if key is not None else (secrets.randbits(64), secrets.randbits(64))
+        per_gen = max(1, ceil(capacity_per_window / generations))
+        self.generations = [PFCPReplayBloomFilter(per_gen, fpr / generations, key=key)
+                            for _ in range(generations)]
+        self.current = 0
+        self.slice_started = clock()
+        self.rotations = 0
+
+    @property
+    def memory_bytes(self):
+        return sum(g.memory_bytes for g in self.generations)
+
+    def advance(self, now=None):
+        """Rotate out every slice that has fully elapsed by `now`."""
+        now = self.clock() if now is None else now
+        elapsed = int((now - self.slice_started) // self.slice_s)
+        for _ in range(min(elapsed, len(self.generations))):
+            self.rotate()
+        if elapsed:
+            self.slice_started += elapsed * self.slice_s
+
+    def rotate(self):
+        self.current = (self.current + 1) % len(self.generations)
+        self.generations[self.current].clear()
+        self.rotations += 1
+
+    def add(self, nonce):
+        self.generations[self.current].add(nonce)
+
+    def contains(self, nonce):
+        return any(g.contains(nonce) for g in self.generations)
+
+    def __contains__(self, nonce):
+        return self.contains(nonce)
+
+    def add_many(self, nonces):
+        self.generations[self.current].add_many(nonces)
+
+    def contains_many(self, nonces):
+        nonces = np.asarray(nonces, dtype=np.uint64)
+        seen = np.zeros(nonces.size, dtype=bool)
+        for g in self.generations:
+            if g.count:
+                seen |= g.contains_many(nonces)
+        return seen
+
+    def check_and_add_many(self, nonces):
+        nonces = np.asarray(nonces, dtype=np.uint64)
+        older = np.zeros(nonces.size, dtype=bool)
+        for i, g in enumerate(self.generations):
+            if i != self.current and g.count:
+                older |= g.contains_many(nonces)
+        return older | self.generations[self.current].check_and_add_many(nonces)
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark_filter(n, fpr=BENCH_FPR_TARGET, probe_count=BENCH_PROBE_COUNT, chunk=BENCH_CHUNK, seed=7):
+    """
+    Fill a filter with n distinct nonces and measure:
+    bulk inserts/sec, bulk lookups/sec, scalar lookup latency, observed FPR.
+    """
+    rng = np.random.default_rng(seed)
+    bf = PFCPReplayBloomFilter(n, fpr, key=(int(rng.integers(2**63)), int(rng.integers(2**63))))
+
+    # Session nonces: even integers from a random odd-stride sequence;
+    # probe nonces are odd, so none of them was inserted.
+    base = np.uint64(rng.integers(2**62)) * np.uint64(2)
+
+    insert_time = 0.0
+    for start in range(0, n, chunk):
+        batch = base + np.uint64(2) * np.arange(start, min(n, start + chunk), dtype=np.uint64)
+        t0 = time.perf_counter()
+        bf.add_many(batch)
+        insert_time += time.perf_counter() - t0
+
+    # Observed FPR on never-inserted nonces
+    false_positives = 0
+    lookup_time = 0.0
+    for start in range(0, probe_count, chunk):
+        probes = base + np.uint64(1) + np.uint64(2) * np.arange(start, min(probe_count, start + chunk), dtype=np.uint64)
+        t0 = time.perf_counter()
+        false_positives += int(np.count_nonzero(bf.contains_many(probes)))
+        lookup_time += time.perf_counter() - t0
+
+    # Sanity: every inserted nonce must be found (no false negatives)
+    sample = base + np.uint64(2) * rng.integers(0, n, size=min(n, 100_000)).astype(np.uint64)
+    assert bf.contains_many(sample).all(), "Bloom filter returned a false negative"
+
+    # Scalar per-message lookup latency (the PFCP processing budget)
+    scalar_probes = [int(x) for x in (base + np.uint64(1) + np.uint64(2) * np.arange(10_000, dtype=np.uint64))]
+    t0 = time.perf_counter()
+    for nonce in scalar_probes:
+        bf.contains(nonce)
+    scalar_lookup_us = (time.perf_counter() - t0) / len(scalar_probes) * 1e6
+
+    return {
+        "sessions": n,
+        "fpr_target": fpr,
+        "memory_mb": bf.memory_bytes / (1024 * 1024),
+        "k_hashes": bf.num_hashes,
+        "inserts_per_sec": n / insert_time,
+        "lookups_per_sec": probe_count / lookup_time,
+        "scalar_lookup_us": scalar_lookup_us,
+        "observed_fpr": false_positives / probe_count,
+        "fill_ratio": bf.fill_ratio(),
+    }
+
+def run_replay_filter_benchmark(session_counts=BENCH_SESSION_COUNTS):
+    print("--- ARC-3 E7b: PFCP Replay Filter Benchmark (measured) ---\n")
+
+    # Functional check: replay detection + expiry through rotation
+    now = [0.0]
+    rf = RotatingReplayFilter(10_000, 1e-6, window_s=4.0, generations=4, clock=lambda: now[0])
+    first = np.arange(1000, dtype=np.uint64)
+    assert not rf.check_and_add_many(first).any()
+    assert rf.check_and_add_many(first).all()
+    now[0] = 4.0
+    rf.advance()
+    assert not rf.contains_many(first).any(), "expired nonces still present"
+    print("Replay detection + windowed expiry: ✅")
+
+    results = []
+    print(f"\n{'Sessions':<14} {'Memory (MB)':<12} {'k':<4} {'Inserts/s':<14} {'Lookups/s':<14} "
+          f"{'Scalar (μs)':<12} {'Observed FPR':<14} {'Target':<8}")
+    print("-" * 100)
+    for n in session_counts:
+        r = benchmark_filter(n)
+        results.append(r)
+        print(f"{n:<14,} {r['memory_mb']:<12.2f} {r['k_hashes']:<4} {r['inserts_per_sec']:<14,.0f} "
+              f"{r['lookups_per_sec']:<14,.0f} {r['scalar_lookup_us']:<12.2f} {r['observed_fpr']:<14.2e} "
+              f"{r['fpr_target']:<8.0e}")
+
+    with open('pfcp_replay_benchmark.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+        writer.writeheader()
+        writer.writerows(results)
+    print("\nSaved pfcp_replay_benchmark.csv")
+
+    # Observed FPR is a binomial estimate; allow 3-sigma over the target
+    ok = all(r['observed_fpr'] <= r['fpr_target'] + 3 * np.sqrt(r['fpr_target'] / BENCH_PROBE_COUNT)
+             for r in results)
+    if ok:
+        print("STATUS: ✅ MEASURED FPR WITHIN TARGET")
+    else:
+        print("STATUS: ❌ OBSERVED FPR EXCEEDS TARGET")
+
+if __name__ == "__main__":
+    run_replay_filter_benchmark()
@@ -84,6 +84,9 @@ def run_pilot_contamination_attack():
     sinr_with_arc3 = []
     sinr_with_contamination = []
     
+    # Dedicated generator: the SCM no longer reseeds the global np.random
+    rng = np.random.default_rng(42)
+    
     for trial in range(num_trials):
         env_trial = UrbanEnvironment(seed=trial)
         scm_trial = SpatialChannelModel(tower, env_trial)
@@ -93,7 +96,7 @@ def run_pilot_contamination_attack():
         for ue_idx in range(num_ues):
             # Position UEs in a semi-circle around the tower
             angle = (ue_idx / num_ues) * np.pi
-            distance = np.random.uniform(150, 250)  # Cell edge
+            distance = rng.uniform(150, 250)  # Cell edge
             ue_position = np.array([
                 distance * np.sin(angle),
                 distance * np.cos(angle),
@@ -104,7 +107,7 @@ def run_pilot_contamination_attack():
             
             # Attacker closer to tower, spoofing this UE's pilot
             # Attacker is at 50-100m (stronger signal, more contamination)
-            attacker_distance = np.random.uniform(50, 100)
+            attacker_distance = rng.uniform(50, 100)
             attacker_pos = np.array([
                 attacker_distance * np.sin(angle + 0.1),
                 attacker_distance * np.cos(angle + 0.1),
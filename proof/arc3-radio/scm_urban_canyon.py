@@ -12,8 +12,54 @@ This models:
 - 3D Urban environment with buildings, moving vehicles
 - Doppler shifts from moving scatterers
 - Rain attenuation (ITU-R P.838)
+
+Geometry that does not depend on the UE (antenna layout, reflector and
+scatterer steering vectors) is computed once per tower/environment, and
+generate_csi_batch() evaluates paths x antennas for a whole batch of UE
+positions as array expressions. Position-dependent fading comes from a
+counter-based Philox4x32-10 generator keyed on the quantized UE position,
+so no global RNG state is touched.
 """
 
+# ============================================================================
+# COUNTER-BASED FADING (Philox4x32-10, Salmon et al. SC'11)
+# ============================================================================
+
+PHILOX_M0 = np.uint64(0xD2511F53)
+PHILOX_M1 = np.uint64(0xCD9E8D57)
+PHILOX_W0 = np.uint64(0x9E3779B9)
+PHILOX_W1 = np.uint64(0xBB67AE85)
+MASK32 = np.uint64(0xFFFFFFFF)
+
+# Counter word 1 selects the random stream for each fading component
+STREAM_LOCAL_SCATTER = 1
+STREAM_REFLECTOR_PHASE = 2
+
+def philox4x32(counter, key, rounds=10):
+    """
+    Vectorized Philox4x32 block function.
+    counter: 4 broadcastable uint32-valued arrays; key: 2 broadcastable arrays.
+    Returns 4 uint64 arrays holding 32-bit outputs.
+    """
+    c0, c1, c2, c3 = (np.asarray(c, dtype=np.uint64) & MASK32 for c in counter)
+    k0, k1 = (np.asarray(k, dtype=np.uint64) & MASK32 for k in key)
+    for r in range(rounds):
+        p0 = PHILOX_M0 * c0
+        p1 = PHILOX_M1 * c2
+        c0, c1, c2, c3 = (((p1 >> np.uint64(32)) ^ c1 ^ k0) & MASK32,
+                          p1 & MASK32,
+                          ((p0 >> np.uint64(32)) ^ c3 ^ k1) & MASK32,
+                          p0 & MASK32)
+        if r < rounds - 1:
+            k0 = (k0 + PHILOX_W0) & MASK32
+            k1 = (k1 + PHILOX_W1) & MASK32
+    return c0, c1, c2, c3
+
+def _to_unit(word):
+    """32-bit word -> uniform in the open interval (0, 1)."""
+    return (word.astype(np.float64) + 0.5) / 4294967296.0
+
+
 class MassiveMIMOTower:
     def __init__(self, num_antennas_h=8, num_antennas_v=8, freq_ghz=60, spacing_lambda=0.5):
         """
@@ -31,6 +77,11 @@ class MassiveMIMOTower:
         # Generate antenna positions in 3D space (tower at origin)
         self.antenna_positions = self._generate_upa()
         
+        # Cached per-tower array response terms (UPA lies in the x-z plane)
+        self.wavenumber = 2 * np.pi / self.wavelength
+        self._ant_x = self.antenna_positions[:, 0].copy()
+        self._ant_z = self.antenna_positions[:, 2].copy()
+        
     def _generate_upa(self):
         """Generates 3D coordinates of a Uniform Planar Array."""
         positions = []
@@ -41,6 +92,15 @@ class MassiveMIMOTower:
                 z = v * self.spacing
                 positions.append([x, y, z])
         return np.array(positions)
+    
+    def steering_matrix(self, azimuth, elevation):
+        """
+        Array response exp(j*k*(x*sin(az) + z*sin(el))) for a set of arrival
+        angles. azimuth/elevation: (N,) arrays -> (N, total_antennas).
+        """
+        az = np.sin(np.asarray(azimuth, dtype=float))[..., None]
+        el = np.sin(np.asarray(elevation, dtype=float))[..., None]
+        return np.exp(1j * self.wavenumber * (az * self._ant_x + el * self._ant_z))
 
 class UrbanEnvironment:
     def __init__(self, seed=42):
@@ -82,12 +142,47 @@ class UrbanEnvironment:
         return scatterers
 
 class SpatialChannelModel:
-    def __init__(self, tower, environment, rain_rate_mm_hr=0):
+    def __init__(self, tower, environment, rain_rate_mm_hr=0, fading_seed=0):
         self.tower = tower
         self.env = environment
         self.rain_rate = rain_rate_mm_hr
         self.c = 3e8  # Speed of light
+        self.fading_seed = fading_seed
+        self._precompute_geometry()
+    
+    def _precompute_geometry(self):
+        """
+        Cache everything that depends only on tower + environment: reflector
+        and scatterer positions, their steering vectors and tower-side path
+        lengths, and scatterer Doppler shifts.
+        """
+        origin = self.tower.antenna_positions[0]
+        freq_hz = self.tower.freq_ghz * 1e9
         
+        def arrival_angles(points):
+            delta = points - origin
+            az = np.arctan2(delta[:, 0], delta[:, 1])
+            el = np.arctan2(delta[:, 2], np.hypot(delta[:, 0], delta[:, 1]))
+            return az, el, np.linalg.norm(delta, axis=1)
+        
+        refl = self.env.reflectors
+        self._refl_pos = np.array([r['position'] for r in refl]).reshape(-1, 3)
+        self._refl_gain = np.array([r['reflectivity'] for r in refl], dtype=float)
+        az, el, self._refl_tower_dist = arrival_angles(self._refl_pos)
+        self._refl_steering = self.tower.steering_matrix(az, el)  # (R, A)
+        
+        scat = self.env.scatterers
+        self._scat_pos = np.array([s['position'] for s in scat]).reshape(-1, 3)
+        velocity = np.array([s['velocity'] for s in scat], dtype=float)
+        self._scat_doppler = (freq_hz * velocity) / self.c
+        az, el, self._scat_tower_dist = arrival_angles(self._scat_pos)
+        self._scat_steering = self.tower.steering_matrix(az, el)  # (S, A)
+    
+    def _position_keys(self, positions):
+        """Philox key/counter words from UE positions quantized to 1 mm."""
+        mm = np.round(positions * 1000.0).astype(np.int64).view(np.uint64)
+        return mm[:, 0], mm[:, 1], mm[:, 2]
+    
     def calculate_path_loss(self, distance_m, freq_ghz):
         """
         Free-space path loss + rain attenuation (ITU-R P.838).
@@ -117,100 +212,72 @@ class SpatialChannelModel:
         delta_phase = 2*pi * 5m / 0.005m = 2*pi * 1000 = 6283 radians
         This should cause complete decorrelation.
         """
-        actual_ue_pos = ue_position + np.array([ue_offset, 0, 0])
-        
-        # CSI Vector for all antennas (complex channel coefficient per antenna)
-        csi_vector = np.zeros(self.tower.total_antennas, dtype=complex)
-        
-        # At mmWave, we model the channel in the angular domain
-        # The steering vector changes dramatically with position
+        return self.generate_csi_batch(np.asarray(ue_position, dtype=float)[None, :], ue_offset)[0]
+    
+    def generate_csi_batch(self, ue_positions, ue_offset=0, chunk_size=8192):
+        """
+        Ray-traced CSI for a batch of UE positions.
+        ue_positions: (N, 3) array. Returns (N, total_antennas) normalized rows.
         
-        # Calculate angle of arrival (AoA) for LOS path
-        delta_pos = actual_ue_pos - self.tower.antenna_positions[0]
-        azimuth = np.arctan2(delta_pos[0], delta_pos[1])  # Horizontal angle
-        elevation = np.arctan2(delta_pos[2], np.sqrt(delta_pos[0]**2 + delta_pos[1]**2))
+        Each chunk is evaluated as (positions x paths) @ (paths x antennas)
+        products against the cached steering matrices; memory is bounded by
+        chunk_size * total_antennas.
+        """
+        positions = np.atleast_2d(np.asarray(ue_positions, dtype=float)) + np.array([ue_offset, 0, 0])
+        out = np.empty((positions.shape[0], self.tower.total_antennas), dtype=complex)
+        for start in range(0, positions.shape[0], chunk_size):
+            out[start:start + chunk_size] = self._csi_chunk(positions[start:start + chunk_size])
+        return out
+    
+    def _csi_chunk(self, positions):
+        tower = self.tower
+        freq_hz = tower.freq_ghz * 1e9
+        n_ant = tower.total_antennas
+        key_x, key_y, key_z = self._position_keys(positions)
         
-        # LOS Path with proper array response
-        los_distance = np.linalg.norm(delta_pos)
-        los_attenuation = self.calculate_path_loss(los_distance, self.tower.freq_ghz)
-        los_gain = 10 ** (-los_attenuation / 20)
+        # --- LOS path with position-dependent local scattering around the UE.
+        # This is what makes CSI extremely location-specific.
+        delta = positions - tower.antenna_positions[0]
+        azimuth = np.arctan2(delta[:, 0], delta[:, 1])
+        elevation = np.arctan2(delta[:, 2], np.hypot(delta[:, 0], delta[:, 1]))
+        los_distance = np.linalg.norm(delta, axis=1)
+        los_gain = 10 ** (-self.calculate_path_loss(los_distance, tower.freq_ghz) / 20)
         
-        # Steering vector (array response)
-        k = 2 * np.pi / self.tower.wavelength  # Wave number
+        ant_idx = np.arange(n_ant, dtype=np.uint64)[None, :]
+        u_amp, u_phase, _, _ = philox4x32(
+            (ant_idx, STREAM_LOCAL_SCATTER, key_z[:, None], self.fading_seed),
+            (key_x[:, None], key_y[:, None]))
+        local_gain = np.sqrt(-2.0 * np.log(_to_unit(u_amp))) * np.exp(1j * 2 * np.pi * _to_unit(u_phase))
         
-        # At 60 GHz, local scattering around the UE creates position-dependent fading
-        # We model this as a position-dependent random gain per antenna
-        for ant_idx, ant_pos in enumerate(self.tower.antenna_positions):
-            # Phase shift based on antenna position and AoA
-            path_difference = ant_pos[0] * np.sin(azimuth) + ant_pos[2] * np.sin(elevation)
-            phase = k * path_difference
-            
-            # Add position-dependent fading (local scattering around UE)
-            # This is what makes CSI extremely location-specific
-            position_seed = int((actual_ue_pos[0] * 1000 + ant_idx * 100) % (2**31))
-            np.random.seed(position_seed)
-            local_gain = np.random.rayleigh(1.0) * np.exp(1j * np.random.uniform(0, 2*np.pi))
-            
-            csi_vector[ant_idx] = los_gain * local_gain * np.exp(1j * phase)
+        csi = los_gain[:, None] * local_gain * tower.steering_matrix(azimuth, elevation)
         
-        # Non-Line-of-Sight (NLOS) Reflections
-        # At mmWave, position changes cause dramatic interference pattern shifts
-        for refl_idx, reflector in enumerate(self.env.reflectors):
-            d_refl_ue = np.linalg.norm(actual_ue_pos - reflector['position'])
+        # --- NLOS reflections (reflectors within 300m of the UE)
+        if len(self._refl_pos):
+            d_refl_ue = np.linalg.norm(positions[:, None, :] - self._refl_pos[None, :, :], axis=2)
+            total = self._refl_tower_dist[None, :] + d_refl_ue
+            gain = 10 ** (-self.calculate_path_loss(total, tower.freq_ghz) / 20) * self._refl_gain
+            gain = np.where(d_refl_ue > 300, 0.0, gain)
             
-            if d_refl_ue > 300:
-                continue
-                
-            # Calculate AoA for reflected path
-            delta_refl = reflector['position'] - self.tower.antenna_positions[0]
-            az_refl = np.arctan2(delta_refl[0], delta_refl[1])
-            el_refl = np.arctan2(delta_refl[2], np.sqrt(delta_refl[0]**2 + delta_refl[1]**2))
-            
-            total_distance = np.linalg.norm(delta_refl) + d_refl_ue
-            attenuation = self.calculate_path_loss(total_distance, self.tower.freq_ghz)
-            gain = 10 ** (-attenuation / 20) * reflector['reflectivity']
-            
-            # Add position-dependent random phase offset
-            # Different UE positions see different effective reflector phases
-            position_hash = hash((actual_ue_pos[0], actual_ue_pos[1], refl_idx)) % (2**32)
-            np.random.seed(position_hash)
-            phase_offset = np.random.uniform(0, 2*np.pi)
-            
-            for ant_idx, ant_pos in enumerate(self.tower.antenna_positions):
-                path_diff = ant_pos[0] * np.sin(az_refl) + ant_pos[2] * np.sin(el_refl)
-                phase = k * path_diff
-                phase += -2 * np.pi * (self.tower.freq_ghz * 1e9) * (d_refl_ue / self.c)
-                phase += phase_offset
-                
-                csi_vector[ant_idx] += gain * np.exp(1j * phase)
+            # Position-dependent phase offset per reflector
+            refl_idx = np.arange(len(self._refl_pos), dtype=np.uint64)[None, :]
+            u_refl, _, _, _ = philox4x32(
+                (refl_idx, STREAM_REFLECTOR_PHASE, key_z[:, None], self.fading_seed),
+                (key_x[:, None], key_y[:, None]))
+            phase = -2 * np.pi * freq_hz * (d_refl_ue / self.c) + 2 * np.pi * _to_unit(u_refl)
+            csi += (gain * np.exp(1j * phase)) @ self._refl_steering
         
-        # Doppler from moving scatterers (adds time-variant component)
-        for scatterer in self.env.scatterers:
-            d_scatter_ue = np.linalg.norm(scatterer['position'] - actual_ue_pos)
-            
-            if d_scatter_ue < 100:  # Only nearby scatterers
-                doppler = (self.tower.freq_ghz * 1e9 * scatterer['velocity']) / self.c
-                
-                # Distance from antenna array to scatterer
-                d_tower_scatter = np.linalg.norm(scatterer['position'] - self.tower.antenna_positions[0])
-                total_distance = d_tower_scatter + d_scatter_ue
-                attenuation = self.calculate_path_loss(total_distance, self.tower.freq_ghz)
-                gain = 10 ** (-attenuation / 20) * 0.15  # Weak scattering
-                
-                # AoA for scatter path
-                delta_scatter = scatterer['position'] - self.tower.antenna_positions[0]
-                az_scatter = np.arctan2(delta_scatter[0], delta_scatter[1])
-                el_scatter = np.arctan2(delta_scatter[2], np.sqrt(delta_scatter[0]**2 + delta_scatter[1]**2))
-                
-                for ant_idx, ant_pos in enumerate(self.tower.antenna_positions):
-                    path_diff = ant_pos[0] * np.sin(az_scatter) + ant_pos[2] * np.sin(el_scatter)
-                    phase = k * path_diff
-                    phase += -2 * np.pi * (self.tower.freq_ghz * 1e9 + doppler) * (d_scatter_ue / self.c)
-                    csi_vector[ant_idx] += gain * np.exp(1j * phase)
+        # --- Doppler from nearby moving scatterers (within 100m of the UE)
+        if len(self._scat_pos):
+            d_scat_ue = np.linalg.norm(positions[:, None, :] - self._scat_pos[None, :, :], axis=2)
+            total = self._scat_tower_dist[None, :] + d_scat_ue
+            gain = 10 ** (-self.calculate_path_loss(total, tower.freq_ghz) / 20) * 0.15  # Weak scattering
+            gain = np.where(d_scat_ue < 100, gain, 0.0)
+            phase = -2 * np.pi * (freq_hz + self._scat_doppler[None, :]) * (d_scat_ue / self.c)
+            csi += (gain * np.exp(1j * phase)) @ self._scat_steering
         
         # Normalize
-        csi_vector /= np.linalg.norm(csi_vector)
-        return csi_vector
+        csi /= np.linalg.norm(csi, axis=1, keepdims=True)
+        return csi
 
 def run_massive_mimo_proof():
     """
@@ -1,6 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import csv
+from dgate_session_engine import SessionConfig, run_grid, DGATE_OUTCOMES
 
 """
 D-Gate+ E4: 100k Session Efficacy Baseline
@@ -13,6 +14,8 @@ Target Results (from paper):
 - Delay p50/p95: 0.0s / 8.0s
 
 This is the PRIMARY monopoly proof for D-Gate+.
+
+Sessions are evaluated as whole arrays by dgate_session_engine.
 """
 
 NUM_SESSIONS = 100000
@@ -20,87 +23,22 @@ P_STRONG_INIT = 0.65    # Probability of strong signal initially
 P_STRONG_AFTER = 0.20   # Probability of strong signal after T_hold scan
 P_PERMIT = 0.10         # Probability of having a valid permit
 T_HOLD = 8.0            # Hold-and-scan duration (seconds)
+P_PERMIT_VALID = 0.95   # Fraction of presented permits that verify
 SEED = 1337
 
-class DGateEngine:
-    def __init__(self, seed=SEED):
-        self.rng = np.random.default_rng(seed)
-        
-    def simulate_network_conditions(self):
-        """
-        Returns: (strong_now, has_permit)
-        """
-        strong_now = self.rng.random() < P_STRONG_INIT
-        has_permit = self.rng.random() < P_PERMIT
-        return strong_now, has_permit
-    
-    def simulate_hold_and_scan(self):
-        """
-        After waiting T_hold, returns True if strong signal appears.
-        """
-        return self.rng.random() < P_STRONG_AFTER
-    
-    def decide_baseline(self, strong_now, has_permit):
-        """Baseline (No D-Gate+): Attach to whatever is available."""
-        if strong_now:
-            return "ALLOW_STRONG_INIT", 0.0
-        # Baseline: If no strong signal, attach to weak/legacy (UNSAFE)
-        return "UNSAFE_ATTACH", 0.0
-    
-    def decide_dgate(self, strong_now, has_permit):
-        """D-Gate+ FSM Logic."""
-        # State 1: Strong-First
-        if strong_now:
-            return "ALLOW_STRONG_INIT", 0.0
-        
-        # State 2: Hold-and-Scan (Wait T_hold)
-        strong_after = self.simulate_hold_and_scan()
-        if strong_after:
-            return "ALLOW_STRONG_AFTER_SCAN", T_HOLD
-        
-        # State 3: Permit Check
-        # In the real scenario, permits are only available to some users
-        # who are in areas where the operator has authorized legacy fallback
-        if has_permit:
-            # Verify permit (assume valid for this probabilistic model)
-            permit_verified = self.rng.random() < 0.95  # 95% permits are valid
-            if permit_verified:
-                return "ALLOW_PERMIT", T_HOLD
-        
-        # State 5: Block
-        return "BLOCK_WEAK", T_HOLD
-
 def run_efficacy_experiment():
     print(f"--- D-Gate+ E4: 100k Session Efficacy Baseline ---")
     print(f"Sessions: {NUM_SESSIONS}")
     print(f"Parameters: p_strong_init={P_STRONG_INIT}, p_strong_after={P_STRONG_AFTER}, p_permit={P_PERMIT}, T_hold={T_HOLD}s\n")
     
-    engine = DGateEngine(seed=SEED)
-    
-    # Track outcomes
-    baseline_outcomes = []
-    dgate_outcomes = []
-    dgate_delays = []
-    
-    for i in range(NUM_SESSIONS):
-        strong_now, has_permit = engine.simulate_network_conditions()
-        
-        # Baseline decision
-        outcome_b, delay_b = engine.decide_baseline(strong_now, has_permit)
-        baseline_outcomes.append(outcome_b)
-        
-        # D-Gate+ decision
-        outcome_d, delay_d = engine.decide_dgate(strong_now, has_permit)
-        dgate_outcomes.append(outcome_d)
-        dgate_delays.append(delay_d)
-    
-    # Calculate statistics
-    def count_outcomes(outcomes):
-        unique, counts = np.unique(outcomes, return_counts=True)
-        return dict(zip(unique, counts))
-    
-    baseline_dist = count_outcomes(baseline_outcomes)
-    dgate_dist = count_outcomes(dgate_outcomes)
+    config = SessionConfig(p_strong_init=P_STRONG_INIT, p_strong_after=P_STRONG_AFTER, p_permit=P_PERMIT,
+                           t_hold=T_HOLD, p_permit_valid=P_PERMIT_VALID)
+    result = run_grid([config], NUM_SESSIONS, seed=SEED)[0]
+    
+    # Baseline (No D-Gate+) attaches to whatever is available: strong, else weak/legacy (UNSAFE)
+    baseline_dist = {'ALLOW_STRONG_INIT': result['STRONG_NOW'],
+                     'UNSAFE_ATTACH': NUM_SESSIONS - result['STRONG_NOW']}
+    dgate_dist = {o: result[o] for o in DGATE_OUTCOMES}
     
     # Format results
     print("Results:")
@@ -123,9 +61,8 @@ def run_efficacy_experiment():
     allow_outcomes = ['ALLOW_STRONG_INIT', 'ALLOW_STRONG_AFTER_SCAN', 'ALLOW_PERMIT']
     connectivity_dgate = (sum(dgate_dist.get(o, 0) for o in allow_outcomes) / NUM_SESSIONS) * 100
     
-    delays_array = np.array(dgate_delays)
-    delay_p50 = np.percentile(delays_array, 50)
-    delay_p95 = np.percentile(delays_array, 95)
+    delay_p50 = result['delay_p50']
+    delay_p95 = result['delay_p95']
     
     print(f"\n{'Metric':<30} {'Baseline':<15} {'D-Gate+':<15} {'Status':<10}")
     print("-" * 75)
@@ -1,6 +1,6 @@
-import numpy as np
 import matplotlib.pyplot as plt
 import csv
+from dgate_session_engine import SessionConfig, run_grid
 
 """
 D-Gate+ E5: Misreport Tolerance Audit
@@ -14,6 +14,12 @@ Target Results (from paper):
 - Linear degradation: ~0.086% per 1% misreport
 
 This proves D-Gate+ is robust to realistic baseband imperfections.
+
+Misreport model (dgate_session_engine): the baseband flips the reported
+signal strength; a cross-correlation check (RSRP cross-check / CSI
+correlation) flags the mismatch and sends the session to Hold-and-Scan,
+where a misreported strong signal is re-detected 80% of the time.
+A false block is a session with an actually strong signal that ends blocked.
 """
 
 NUM_SESSIONS_PER_RATE = 50000
@@ -22,99 +28,25 @@ P_STRONG_INIT = 0.65
 P_STRONG_AFTER = 0.20
 P_PERMIT = 0.10
 T_HOLD = 8.0
-
-class DGateWithMisreporting:
-    def __init__(self, seed=1337):
-        self.rng = np.random.default_rng(seed)
-    
-    def simulate_session(self, misreport_rate):
-        """
-        Simulates a single session with potential baseband misreporting.
-        
-        Returns: (reported_strong, actual_strong, has_permit)
-        """
-        # Ground truth
-        actual_strong = self.rng.random() < P_STRONG_INIT
-        has_permit = self.rng.random() < P_PERMIT
-        
-        # Baseband misreports
-        if self.rng.random() < misreport_rate:
-            # Flip the signal strength report (strong becomes weak or vice versa)
-            reported_strong = not actual_strong
-        else:
-            reported_strong = actual_strong
-        
-        return reported_strong, actual_strong, has_permit
-    
-    def decide_dgate(self, reported_strong, actual_strong, has_permit):
-        """
-        D-Gate+ makes decision based on REPORTED signal
-        BUT includes cross-correlation check (Deep Hardening).
-        
-        Cross-Correlation: If baseband reports "strong" but we can independently
-        measure the channel (via RSRP cross-check or CSI correlation), 
-        we can detect lies.
-        """
-        # Cross-Correlation Check (reduces false positives from misreports)
-        # If reported and actual match, high confidence
-        # If they mismatch, use Hold-and-Scan to re-verify
-        confidence_high = (reported_strong == actual_strong)
-        
-        if reported_strong and confidence_high:
-            return "ALLOW_STRONG_INIT"
-        
-        # If low confidence or reported weak, enter Hold-and-Scan
-        # This gives the system a second chance to measure the signal
-        strong_after = self.rng.random() < P_STRONG_AFTER
-        
-        # During hold-and-scan, we re-measure and likely get closer to truth
-        # Simulate: 80% chance we detect the actual signal during scan
-        if strong_after or (not confidence_high and actual_strong and self.rng.random() < 0.8):
-            return "ALLOW_STRONG_AFTER_SCAN"
-        
-        # Permit check
-        if has_permit:
-            return "ALLOW_PERMIT"
-        
-        return "BLOCK_WEAK"
+SEED = 1337
 
 def run_misreport_experiment():
     print("--- D-Gate+ E5: Misreport Tolerance Audit ---")
     print(f"Sessions per rate: {NUM_SESSIONS_PER_RATE}")
     print(f"Misreport rates tested: {[f'{r*100:.0f}%' for r in MISREPORT_RATES]}\n")
     
+    configs = [SessionConfig(p_strong_init=P_STRONG_INIT, p_strong_after=P_STRONG_AFTER, p_permit=P_PERMIT,
+                             t_hold=T_HOLD, misreport_rate=rate) for rate in MISREPORT_RATES]
     results = []
     
-    for misreport_rate in MISREPORT_RATES:
-        engine = DGateWithMisreporting(seed=1337)
-        
-        allow_count = 0
-        false_block_count = 0  # Legitimate user (actual strong) but blocked due to misreport
-        
-        for _ in range(NUM_SESSIONS_PER_RATE):
-            reported_strong, actual_strong, has_permit = engine.simulate_session(misreport_rate)
-            decision = engine.decide_dgate(reported_strong, actual_strong, has_permit)
-            
-            # Count allows
-            if decision.startswith('ALLOW'):
-                allow_count += 1
-            
-            # Count false blocks
-            # This is when actual signal is strong (user should connect)
-            # but baseband misreported it as weak, causing a block
-            if actual_strong and decision == "BLOCK_WEAK":
-                false_block_count += 1
-        
-        allow_share = (allow_count / NUM_SESSIONS_PER_RATE) * 100
-        false_block_rate = (false_block_count / NUM_SESSIONS_PER_RATE) * 100
-        
+    for misreport_rate, r in zip(MISREPORT_RATES, run_grid(configs, NUM_SESSIONS_PER_RATE, seed=SEED)):
         results.append({
             'misreport_rate': misreport_rate * 100,
-            'allow_share': allow_share,
-            'false_block': false_block_rate
+            'allow_share': r['allow_share'],
+            'false_block': r['false_block']
         })
         
-        print(f"Misreport {misreport_rate*100:.0f}%: Allow={allow_share:.2f}%, False-Block={false_block_rate:.3f}%")
+        print(f"Misreport {misreport_rate*100:.0f}%: Allow={r['allow_share']:.2f}%, False-Block={r['false_block']:.3f}%")
     
     # Save to CSV
     with open('misreport_sweep.csv', 'w', newline='') as f:
@@ -1,11 +1,11 @@
 import sqlite3
-import os
 import threading
 import time
 from cryptography.hazmat.primitives.asymmetric import ed25519
 from cryptography.hazmat.primitives import hashes
 import matplotlib.pyplot as plt
 import numpy as np
+from permit_quota_store import ShardedSQLiteQuotaStore
 
 """
 D-Gate+: Permit Handshake & Atomic Quota Simulator
@@ -13,30 +13,24 @@ Part of the Sovereign Handshake Protocol (SHP) Week 2 Technical Brief.
 
 This script simulates:
 1. Ed25519 Signed Permit Validation.
-2. Atomic Quota Management using SQLite WAL mode.
+2. Atomic Quota Management using SQLite WAL mode (sharded, pooled
+   connections, group-commit decrements; see permit_quota_store).
 3. High-concurrency stress test to prove 0 double-spend events.
 """
 
-DB_PATH = "permits.db"
 NUM_THREADS = 200
 QUOTA_LIMIT = 50
 
 class PermitManager:
-    def __init__(self):
+    def __init__(self, store=None):
+        self.store = ShardedSQLiteQuotaStore(reset=True) if store is None else store
         self.init_db()
         # Generate signing key for the "Operator"
         self.private_key = ed25519.Ed25519PrivateKey.generate()
         self.public_key = self.private_key.public_key()
         
     def init_db(self):
-        if os.path.exists(DB_PATH):
-            os.remove(DB_PATH)
-        conn = sqlite3.connect(DB_PATH)
-        conn.execute("PRAGMA journal_mode=WAL;")
-        conn.execute("CREATE TABLE permits (id TEXT PRIMARY KEY, remaining_uses INTEGER);")
-        conn.execute("INSERT INTO permits (id, remaining_uses) VALUES ('PERMIT_001', ?);", (QUOTA_LIMIT,))
-        conn.commit()
-        conn.close()
+        self.store.create_permits({'PERMIT_001': QUOTA_LIMIT})
 
     def sign_permit(self, permit_id):
         return self.private_key.sign(permit_id.encode())
@@ -49,24 +43,13 @@ class PermitManager:
             return False, "CRYPTO_FAILURE"
 
         # 2. Atomic Database Update
-        conn = sqlite3.connect(DB_PATH)
-        conn.execute("PRAGMA journal_mode=WAL;")
         try:
-            cursor = conn.execute(
-                "UPDATE permits SET remaining_uses = remaining_uses - 1 "
-                "WHERE id = ? AND remaining_uses > 0 RETURNING remaining_uses;",
-                (permit_id,)
-            )
-            row = cursor.fetchone()
-            conn.commit()
-            if row:
-                return True, f"SUCCESS (Rem: {row[0]})"
-            else:
-                return False, "QUOTA_EXHAUSTED"
+            granted, remaining = self.store.try_consume(permit_id)
         except sqlite3.OperationalError as e:
             return False, f"DB_BUSY: {e}"
-        finally:
-            conn.close()
+        if granted:
+            return True, f"SUCCESS (Rem: {remaining})"
+        return False, "QUOTA_EXHAUSTED"
 
 def stress_test():
     pm = PermitManager()
@@ -95,6 +78,7 @@ def stress_test():
 
     for t in threads:
         t.join()
+    pm.store.close()
 
     print(f"Test Results: {results}")
     
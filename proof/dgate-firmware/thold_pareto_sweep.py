@@ -1,6 +1,7 @@
-import numpy as np
 import matplotlib.pyplot as plt
 import csv
+import time
+from dgate_session_engine import SessionConfig, run_grid
 
 """
 D-Gate+ E6: T_hold Pareto Sensitivity Analysis
@@ -12,6 +13,9 @@ Parameters:
 - 30 total combinations, 50k sessions each
 
 Target: Prove 8s is optimal Nash Equilibrium for user satisfaction vs. operator cost.
+
+The whole grid is one dgate_session_engine.run_grid() call: every config
+is evaluated on the same session arrays, blocks spread across a process pool.
 """
 
 NUM_SESSIONS = 50000
@@ -19,29 +23,7 @@ T_HOLD_VALUES = [0, 2, 4, 6, 8, 10]
 P_STRONG_AFTER_VALUES = [0.1, 0.2, 0.3, 0.4, 0.5]
 P_STRONG_INIT = 0.65
 P_PERMIT = 0.10
-
-class DGatePareto:
-    def __init__(self, seed=1337):
-        self.rng = np.random.default_rng(seed)
-    
-    def simulate_session(self, t_hold, p_strong_after):
-        """Simulates a single session with given parameters."""
-        strong_init = self.rng.random() < P_STRONG_INIT
-        has_permit = self.rng.random() < P_PERMIT
-        
-        if strong_init:
-            return "ALLOW_STRONG_INIT", 0.0
-        
-        # Hold-and-scan
-        strong_after = self.rng.random() < p_strong_after
-        if strong_after:
-            return "ALLOW_STRONG_AFTER_SCAN", t_hold
-        
-        # Permit
-        if has_permit:
-            return "ALLOW_PERMIT", t_hold
-        
-        return "BLOCK_WEAK", t_hold
+SEED = 1337
 
 def run_pareto_sweep():
     print("--- D-Gate+ E6: T_hold Pareto Sensitivity Sweep ---")
@@ -50,34 +32,17 @@ def run_pareto_sweep():
     print(f"p_strong_after values: {P_STRONG_AFTER_VALUES}")
     print(f"Total configs: {len(T_HOLD_VALUES) * len(P_STRONG_AFTER_VALUES)}\n")
     
-    results = []
-    
-    for t_hold in T_HOLD_VALUES:
-        for p_strong_after in P_STRONG_AFTER_VALUES:
-            engine = DGatePareto(seed=1337)
-            
-            allow_count = 0
-            total_delay = 0
-            delays = []
-            
-            for _ in range(NUM_SESSIONS):
-                outcome, delay = engine.simulate_session(t_hold, p_strong_after)
-                
-                if outcome.startswith('ALLOW'):
-                    allow_count += 1
-                
-                total_delay += delay
-                delays.append(delay)
-            
-            allow_share = (allow_count / NUM_SESSIONS) * 100
-            delay_p95 = np.percentile(delays, 95)
-            
-            results.append({
-                't_hold': t_hold,
-                'p_strong_after': p_strong_after,
-                'allow_share': allow_share,
-                'delay_p95': delay_p95
-            })
+    configs = [SessionConfig(p_strong_init=P_STRONG_INIT, p_strong_after=p_strong_after, p_permit=P_PERMIT,
+                             t_hold=t_hold)
+               for t_hold in T_HOLD_VALUES for p_strong_after in P_STRONG_AFTER_VALUES]
+    start = time.perf_counter()
+    results = [{
+        't_hold': r['config'].t_hold,
+        'p_strong_after': r['config'].p_strong_after,
+        'allow_share': r['allow_share'],
+        'delay_p95': r['delay_p95']
+    } for r in run_grid(configs, NUM_SESSIONS, seed=SEED)]
+    print(f"Simulated {len(configs) * NUM_SESSIONS:,} sessions in {time.perf_counter() - start:.3f} s")
     
     # Save to CSV
     with open('sensitivity_grid.csv', 'w', newline='') as f:
@@ -20,6 +20,7 @@ EXPERIMENTAL VALIDATION:
 2. Revocation accumulator performance (false positive rate)
 3. Signaling cost comparison (broadcast vs unicast)
 4. Hardware validation latency
+4b. Precomputed per-epoch tag table (bulk derivation + lookup validation)
 
 Author: Sovereign Architect
 Date: December 2025
@@ -34,7 +35,11 @@ import hashlib
 import hmac
 import struct
 import time
+import zlib
+import os
+import secrets
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 # =============================================================================
 # SECTION 1: HKDF KEY DERIVATION
@@ -126,27 +131,266 @@ class DeviceMasterKey:
         return tag
 
 
+# -----------------------------------------------------------------------------
+# Precomputed per-epoch tag table
+# -----------------------------------------------------------------------------
+
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+_GOLDEN64 = 0x9E3779B97F4A7C15
+
+def _mix64(x: int) -> int:
+    """MurmurHash3 fmix64 finalizer (scalar)"""
+    x ^= x >> 33
+    x = (x * 0xFF51AFD7ED558CCD) & _MASK64
+    x ^= x >> 33
+    x = (x * 0xC4CEB9FE1A85EC53) & _MASK64
+    x ^= x >> 33
+    return x
+
+def _mix64_np(x: np.ndarray) -> np.ndarray:
+    """MurmurHash3 fmix64 finalizer (uint64 arrays, wrapping multiply)"""
+    with np.errstate(over='ignore'):
+        x = x ^ (x >> np.uint64(33))
+        x = x * np.uint64(0xFF51AFD7ED558CCD)
+        x = x ^ (x >> np.uint64(33))
+        x = x * np.uint64(0xC4CEB9FE1A85EC53)
+        x = x ^ (x >> np.uint64(33))
+    return x
+
+def _ids_to_words(device_ids) -> np.ndarray:
+    """16-byte device IDs (list of bytes or (N, 16) uint8 array) -> (N, 2) uint64"""
+    if isinstance(device_ids, np.ndarray):
+        raw = np.ascontiguousarray(device_ids, dtype=np.uint8).tobytes()
+    else:
+        raw = b''.join(device_ids)
+    return np.frombuffer(raw, dtype='<u8').reshape(-1, 2)
+
+def _tags_to_words(tags) -> np.ndarray:
+    """8-byte tags (list of bytes or (N, 8) uint8 array) -> (N,) uint64"""
+    if isinstance(tags, np.ndarray):
+        raw = np.ascontiguousarray(tags, dtype=np.uint8).tobytes()
+    else:
+        raw = b''.join(tags)
+    return np.frombuffer(raw, dtype='<u8')
+
+def expand_epoch_tags(prks: List[bytes], device_ids: List[bytes], epoch_id: int) -> bytes:
+    """
+    HKDF-Expand cached per-device PRKs to 8-byte epoch tags.
+    
+    Identical to DeviceMasterKey.derive_epoch_tag(): the Extract step
+    PRK = HMAC(network_id, master_secret) does not depend on the epoch, so
+    the network computes it once at registration and only Expand
+    (T(1) = HMAC(PRK, info || 0x01), truncated to 8 bytes) runs per epoch.
+    Top-level so worker processes can import it.
+    """
+    epoch = struct.pack('>Q', epoch_id)
+    return b''.join(hmac.digest(prk, epoch + did + b'\x01', 'sha256')[:8]
+                    for prk, did in zip(prks, device_ids))
+
+
+class EpochTagTable:
+    """
+    Compact open-addressing table: device_id (16 B) -> expected tag (8 B).
+    
+    Keys, tags and slot state live in flat NumPy arrays (25 bytes/slot at
+    <= 50% load) and are probed linearly from a salted fmix64 home slot,
+    so lookups touch a handful of contiguous words. Revoked devices keep
+    their slot with state REVOKED so the gate rejects them in one probe.
+    """
+    
+    EMPTY, LIVE, REVOKED = 0, 1, 2
+    
+    def __init__(self, epoch_id: int, capacity: int = 1024):
+        self.epoch_id = epoch_id
+        self.salt = secrets.randbits(64)
+        self._allocate(max(16, 1 << int(np.ceil(np.log2(max(2 * capacity, 1))))))
+    
+    def _allocate(self, slots: int):
+        self.keys = np.zeros((slots, 2), dtype=np.uint64)
+        self.tags = np.zeros(slots, dtype=np.uint64)
+        self.state = np.zeros(slots, dtype=np.uint8)
+        self.mask = slots - 1
+        self.size = 0
+        # Byte views for the scalar path: indexing a memoryview is several
+        # times cheaper than indexing a NumPy array element
+        self._key_bytes = memoryview(self.keys.reshape(-1).view(np.uint8))
+        self._tag_bytes = memoryview(self.tags.view(np.uint8))
+        self._state_bytes = memoryview(self.state)
+    
+    def __len__(self):
+        return self.size
+    
+    def memory_bytes(self) -> int:
+        return self.keys.nbytes + self.tags.nbytes + self.state.nbytes
+    
+    def _home(self, device_id: bytes) -> int:
+        k0 = int.from_bytes(device_id[:8], 'little')
+        k1 = int.from_bytes(device_id[8:16], 'little')
+        return _mix64(k0 ^ self.salt ^ ((k1 * _GOLDEN64) & _MASK64)) & self.mask
+    
+    def _home_many(self, ids: np.ndarray) -> np.ndarray:
+        with np.errstate(over='ignore'):
+            h = ids[:, 0] ^ np.uint64(self.salt) ^ (ids[:, 1] * np.uint64(_GOLDEN64))
+        return (_mix64_np(h) & np.uint64(self.mask)).astype(np.intp)
+    
+    def _grow(self):
+        live = self.state != self.EMPTY
+        keys, tags, state = self.keys[live], self.tags[live], self.state[live]
+        self._allocate(2 * (self.mask + 1))
+        self.insert_many(keys, tags, state)
+    
+    def insert_many(self, ids: np.ndarray, tags: np.ndarray, state=None):
+        """
+        Vectorized insert/update. Each round, every pending key inspects its
+        current slot: matching keys are updated, keys at empty slots claim
+        them (first claimant wins), everything else probes one slot further.
+        """
+        if state is None:
+            state = np.full(len(ids), self.LIVE, dtype=np.uint8)
+        while 2 * (self.size + len(ids)) > self.mask + 1:
+            self._grow()
+        
+        pending = np.arange(len(ids))
+        slot = self._home_many(ids)
+        while pending.size:
+            s = slot[pending]
+            same = (self.state[s] != self.EMPTY) & (self.keys[s] == ids[pending]).all(axis=1)
+            hit = pending[same]
+            self.tags[slot[hit]] = tags[hit]
+            self.state[slot[hit]] = np.maximum(self.state[slot[hit]], state[hit])  # REVOKED is sticky
+            
+            empty = self.state[s] == self.EMPTY
+            cand = pending[empty]
+            _, first = np.unique(slot[cand], return_index=True)
+            win = cand[first]
+            self.keys[slot[win]] = ids[win]
+            self.tags[slot[win]] = tags[win]
+            self.state[slot[win]] = state[win]
+            self.size += win.size
+            
+            done = np.zeros(len(ids), dtype=bool)
+            done[hit] = True
+            done[win] = True
+            pending = pending[~done[pending]]
+            # Losers of a claim re-inspect the same slot (it may now hold
+            # their own key); everyone else advances
+            lost = np.zeros(len(ids), dtype=bool)
+            lost[cand] = True
+            lost[win] = False
+            advance = pending[~lost[pending]]
+            slot[advance] = (slot[advance] + 1) & self.mask
+    
+    def find(self, device_id: bytes) -> int:
+        """Slot index for device_id, or -1 if absent"""
+        slot = self._home(device_id)
+        keys, state = self._key_bytes, self._state_bytes
+        while state[slot] != self.EMPTY:
+            if keys[16 * slot:16 * slot + 16] == device_id:
+                return slot
+            slot = (slot + 1) & self.mask
+        return -1
+    
+    def tag_at(self, slot: int) -> bytes:
+        return self._tag_bytes[8 * slot:8 * slot + 8].tobytes()
+    
+    def find_many(self, ids: np.ndarray) -> np.ndarray:
+        """Vectorized find(): slot per key, -1 where absent"""
+        result = np.full(len(ids), -1, dtype=np.intp)
+        pending = np.arange(len(ids))
+        slot = self._home_many(ids)
+        while pending.size:
+            s = slot[pending]
+            occupied = self.state[s] != self.EMPTY
+            match = occupied & (self.keys[s] == ids[pending]).all(axis=1)
+            result[pending[match]] = s[match]
+            pending = pending[occupied & ~match]
+            slot[pending] = (slot[pending] + 1) & self.mask
+        return result
+    
+    def revoke(self, device_id: bytes):
+        slot = self.find(device_id)
+        if slot >= 0:
+            self.state[slot] = self.REVOKED
+        else:
+            self.insert_many(_ids_to_words([device_id]), np.zeros(1, dtype=np.uint64),
+                             np.array([self.REVOKED], dtype=np.uint8))
+
+
 class EpochTagValidator:
     """
     Network-side validator for epoch permit tags.
     
     This runs on the base station / network edge.
+    
+    With precompute=True, generate_epoch() derives every registered device's
+    tag in bulk (across `workers` processes) into an EpochTagTable, so
+    validation is a table lookup plus constant-time compare instead of an
+    HKDF per permit. Revocations and late registrations update the table
+    incrementally.
     """
     
-    def __init__(self, network_private_key: bytes, network_id: bytes):
+    # Below this many devices, a process pool costs more than it saves
+    PARALLEL_THRESHOLD = 20000
+    
+    def __init__(self, network_private_key: bytes, network_id: bytes,
+                 precompute: bool = False, workers: Optional[int] = None):
         self.network_private_key = network_private_key
         self.network_id = network_id
         self.current_epoch: Optional[NetworkEpoch] = None
         self.device_registry: Dict[bytes, bytes] = {}  # device_id -> master_secret
         self.revocation_set: Set[bytes] = set()
         
+        self.precompute = precompute
+        self.workers = workers or os.cpu_count() or 1
+        self.device_prks: Dict[bytes, bytes] = {}  # device_id -> HKDF PRK (epoch-independent)
+        self.tag_table: Optional[EpochTagTable] = None
+        
     def register_device(self, device_id: bytes, master_secret: bytes):
         """Register a device's master secret (during enrollment)"""
         self.device_registry[device_id] = master_secret
+        if self.precompute:
+            prk = hkdf_extract(self.network_id, master_secret)
+            self.device_prks[device_id] = prk
+            if self._table_is_current():
+                # Late registration: add this device's tag for the running epoch
+                tag = expand_epoch_tags([prk], [device_id], self.current_epoch.epoch_id)
+                self.tag_table.insert_many(_ids_to_words([device_id]), _tags_to_words([tag]))
+                if device_id in self.revocation_set:
+                    self.tag_table.revoke(device_id)
     
     def revoke_device(self, device_id: bytes):
         """Add device to revocation set"""
         self.revocation_set.add(device_id)
+        if self.tag_table is not None:
+            self.tag_table.revoke(device_id)
+    
+    def _table_is_current(self) -> bool:
+        return (self.tag_table is not None and self.current_epoch is not None
+                and self.tag_table.epoch_id == self.current_epoch.epoch_id)
+    
+    def precompute_epoch_tags(self):
+        """Derive all registered devices' tags for the current epoch into a fresh table"""
+        epoch_id = self.current_epoch.epoch_id
+        device_ids = list(self.device_prks.keys())
+        prks = [self.device_prks[d] for d in device_ids]
+        
+        if self.workers > 1 and len(device_ids) >= self.PARALLEL_THRESHOLD:
+            chunk = (len(device_ids) + self.workers - 1) // self.workers
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                parts = pool.map(expand_epoch_tags,
+                                 [prks[i:i + chunk] for i in range(0, len(prks), chunk)],
+                                 [device_ids[i:i + chunk] for i in range(0, len(device_ids), chunk)],
+                                 [epoch_id] * ((len(device_ids) + chunk - 1) // chunk))
+                raw_tags = b''.join(parts)
+        else:
+            raw_tags = expand_epoch_tags(prks, device_ids, epoch_id)
+        
+        table = EpochTagTable(epoch_id, capacity=len(device_ids))
+        if device_ids:
+            table.insert_many(_ids_to_words(device_ids), np.frombuffer(raw_tags, dtype='<u8'))
+        for device_id in self.revocation_set:
+            table.revoke(device_id)
+        self.tag_table = table
     
     def generate_epoch(self, epoch_id: int, duration_ms: int = 3600000) -> NetworkEpoch:
         """Generate a new epoch for broadcast"""
@@ -169,6 +413,9 @@ class EpochTagValidator:
             signature=signature
         )
         
+        if self.precompute:
+            self.precompute_epoch_tags()
+        
         return self.current_epoch
     
     def validate_permit_tag(self, device_id: bytes, presented_tag: bytes) -> Tuple[bool, str]:
@@ -180,6 +427,18 @@ class EpochTagValidator:
         if self.current_epoch is None:
             return False, "No active epoch"
         
+        if self._table_is_current():
+            # Precomputed path: one table probe + constant-time compare
+            slot = self.tag_table.find(device_id)
+            if slot < 0:
+                return False, "Device not registered"
+            if self.tag_table._state_bytes[slot] == EpochTagTable.REVOKED:
+                return False, "Device revoked"
+            expected_tag = self.tag_table.tag_at(slot)
+            if hmac.compare_digest(presented_tag, expected_tag):
+                return True, "Valid epoch tag"
+            return False, "Invalid epoch tag"
+        
         if device_id in self.revocation_set:
             return False, "Device revoked"
         
@@ -195,6 +454,22 @@ class EpochTagValidator:
             return True, "Valid epoch tag"
         else:
             return False, "Invalid epoch tag"
+    
+    def validate_permit_tags(self, device_ids, presented_tags) -> np.ndarray:
+        """
+        Batch validation against the precomputed table.
+        device_ids: list of 16-byte IDs or (N, 16) uint8; presented_tags: list
+        of 8-byte tags or (N, 8) uint8. Returns a boolean accept mask.
+        """
+        if not self._table_is_current():
+            return np.array([self.validate_permit_tag(d, t)[0]
+                             for d, t in zip(device_ids, presented_tags)], dtype=bool)
+        table = self.tag_table
+        slots = table.find_many(_ids_to_words(device_ids))
+        found = slots >= 0
+        safe = np.where(found, slots, 0)
+        return (found & (table.state[safe] == EpochTagTable.LIVE)
+                & (table.tags[safe] == _tags_to_words(presented_tags)))
 
 
 # =============================================================================
@@ -207,8 +482,20 @@ class RevocationBloomFilter:
     
     This enables instant revocation broadcast without per-device messages.
     The bloom filter is included in epoch broadcasts.
+    
+    Implementation:
+    - One SHA-256 digest per device ID; the k probe positions come from
+      Kirsch-Mitzenmacher double hashing g_i = h1 + i*h2 (mod m)
+    - Bits are stored packed in uint64 words (m/8 bytes in memory, not m)
+    - add_many/check_many evaluate whole batches of device IDs with NumPy
+    - delta_from/apply_delta encode epoch-to-epoch changes as the XOR of
+      changed words only, zlib-compressed, so base stations broadcast small
+      deltas instead of the whole filter every epoch
     """
     
+    DELTA_MAGIC = b'RBD1'
+    DELTA_HEADER = struct.Struct('>4sIIII')  # magic, size, hash_count, base_crc, target_crc
+    
     def __init__(self, expected_revocations: int = 10000, false_positive_rate: float = 0.01):
         # Calculate optimal size and hash count
         # m = -n * ln(p) / (ln(2)^2)
@@ -218,37 +505,113 @@ class RevocationBloomFilter:
         
         self.size = int(-n * np.log(p) / (np.log(2) ** 2))
         self.hash_count = int(self.size / n * np.log(2))
-        self.bit_array = np.zeros(self.size, dtype=np.uint8)
+        self.words = np.zeros((self.size + 63) // 64, dtype=np.uint64)
         self.count = 0
-        
+        self._probe_steps = np.arange(self.hash_count, dtype=np.uint64)
+    
+    @staticmethod
+    def _digests(items) -> Tuple[np.ndarray, np.ndarray]:
+        """(h1, h2) uint64 arrays from one SHA-256 digest per item."""
+        raw = b''.join(hashlib.sha256(bytes(item)).digest() for item in items)
+        d = np.frombuffer(raw, dtype='<u8').reshape(-1, 4)
+        return d[:, 0], d[:, 1] | np.uint64(1)
+    
+    def _positions(self, items) -> np.ndarray:
+        """(N, k) probe positions."""
+        h1, h2 = self._digests(items)
+        with np.errstate(over='ignore'):
+            g = h1[:, None] + self._probe_steps[None, :] * h2[:, None]
+        return g % np.uint64(self.size)
+    
     def _hashes(self, item: bytes) -> List[int]:
         """Generate k hash values for an item"""
-        hashes = []
-        for i in range(self.hash_count):
-            h = hashlib.sha256(item + struct.pack('>I', i)).digest()
-            idx = int.from_bytes(h[:4], 'big') % self.size
-            hashes.append(idx)
-        return hashes
+        return [int(i) for i in self._positions([item])[0]]
     
     def add(self, device_id: bytes):
         """Add a device to the revocation filter"""
-        for idx in self._hashes(device_id):
-            self.bit_array[idx] = 1
-        self.count += 1
+        self.add_many([device_id])
+    
+    def add_many(self, device_ids):
+        """Add a batch of devices (iterable of bytes or an (N, L) uint8 array)"""
+        pos = self._positions(device_ids).ravel()
+        if pos.size == 0:
+            return
+        np.bitwise_or.at(self.words, pos >> np.uint64(6),
+                         np.left_shift(np.uint64(1), pos & np.uint64(63)))
+        self.count += pos.size // self.hash_count
     
     def check(self, device_id: bytes) -> bool:
         """Check if a device might be revoked (may have false positives)"""
-        return all(self.bit_array[idx] == 1 for idx in self._hashes(device_id))
+        return bool(self.check_many([device_id])[0])
+    
+    def check_many(self, device_ids) -> np.ndarray:
+        """Boolean array: True where a device might be revoked"""
+        pos = self._positions(device_ids)
+        bits = (self.words[pos >> np.uint64(6)] >> (pos & np.uint64(63))) & np.uint64(1)
+        return bits.all(axis=1)
+    
+    def copy(self) -> 'RevocationBloomFilter':
+        clone = object.__new__(RevocationBloomFilter)
+        clone.__dict__.update(self.__dict__)
+        clone.words = self.words.copy()
+        return clone
     
     def serialize(self) -> bytes:
         """Serialize filter for broadcast (compact bit packing)"""
-        # Pack bits into bytes
-        packed = np.packbits(self.bit_array)
-        return bytes(packed)
+        # Words are already packed; emit exactly ceil(m/8) bytes
+        return self.words.astype('<u8').tobytes()[:self.size_bytes()]
     
     def size_bytes(self) -> int:
         """Size of serialized filter in bytes"""
         return (self.size + 7) // 8
+    
+    # -------------------------------------------------------------------------
+    # Epoch-to-epoch delta broadcast
+    # -------------------------------------------------------------------------
+    
+    def _crc(self) -> int:
+        return zlib.crc32(self.words.astype('<u8').tobytes())
+    
+    def delta_from(self, base: 'RevocationBloomFilter') -> bytes:
+        """
+        Encode the change from `base` (previous epoch) to this filter.
+        
+        Payload = gap-coded indices of changed words + XOR of those words,
+        zlib-compressed. CRCs of base and target let a receiver detect that
+        it missed an epoch and must fetch the full filter instead.
+        """
+        if (base.size, base.hash_count) != (self.size, self.hash_count):
+            raise ValueError("Delta requires filters with identical geometry")
+        
+        diff = base.words ^ self.words
+        changed = np.flatnonzero(diff).astype(np.uint32)
+        gaps = np.diff(changed, prepend=np.uint32(0)).astype('<u4')
+        payload = (struct.pack('>I', changed.size) + gaps.tobytes()
+                   + diff[changed].astype('<u8').tobytes())
+        header = self.DELTA_HEADER.pack(self.DELTA_MAGIC, self.size, self.hash_count,
+                                        base._crc(), self._crc())
+        return header + zlib.compress(payload, 9)
+    
+    def apply_delta(self, delta: bytes):
+        """Apply a delta produced by delta_from() on top of this (base) filter, in place"""
+        magic, size, hash_count, base_crc, target_crc = self.DELTA_HEADER.unpack_from(delta)
+        if magic != self.DELTA_MAGIC or (size, hash_count) != (self.size, self.hash_count):
+            raise ValueError("Delta does not match this filter's geometry")
+        if base_crc != self._crc():
+            raise ValueError("Delta base mismatch (missed epoch?) - fetch full filter")
+        
+        payload = zlib.decompress(delta[self.DELTA_HEADER.size:])
+        (n_changed,) = struct.unpack_from('>I', payload)
+        gaps = np.frombuffer(payload, dtype='<u4', count=n_changed, offset=4)
+        xor = np.frombuffer(payload, dtype='<u8', count=n_changed, offset=4 + 4 * n_changed)
+        changed = np.cumsum(gaps, dtype=np.uint64)
+        
+        words = self.words.copy()
+        words[changed] ^= xor
+        candidate_crc = zlib.crc32(words.astype('<u8').tobytes())
+        if candidate_crc != target_crc:
+            raise ValueError("Delta CRC mismatch after apply")
+        self.words = words
 
 
 # =============================================================================
@@ -376,25 +739,19 @@ def experiment_2_revocation_bloom(n_devices: int = 100000, revocation_rates: Lis
         # Create bloom filter
         bloom = RevocationBloomFilter(expected_revocations=max(n_revoked, 100), false_positive_rate=0.01)
         
-        # Add revoked devices
-        revoked_devices = set(np.random.choice(n_devices, n_revoked, replace=False))
-        for idx in revoked_devices:
-            bloom.add(all_devices[idx])
-        
-        # Test false positive rate on valid devices
-        false_positives = 0
-        valid_count = 0
-        for idx in range(n_devices):
-            if idx not in revoked_devices:
-                valid_count += 1
-                if bloom.check(all_devices[idx]):
-                    false_positives += 1
-        
-        # Test true positive rate on revoked devices
-        true_positives = 0
-        for idx in revoked_devices:
-            if bloom.check(all_devices[idx]):
-                true_positives += 1
+        # Add revoked devices (one batch)
+        revoked_idx = np.random.choice(n_devices, n_revoked, replace=False)
+        revoked_mask = np.zeros(n_devices, dtype=bool)
+        revoked_mask[revoked_idx] = True
+        bloom.add_many([all_devices[idx] for idx in revoked_idx])
+        
+        # Check every device in one batch
+        flagged = bloom.check_many(all_devices)
+        
+        # False positive rate on valid devices, true positives on revoked devices
+        valid_count = int((~revoked_mask).sum())
+        false_positives = int((flagged & ~revoked_mask).sum())
+        true_positives = int((flagged & revoked_mask).sum())
         
         fp_rate = false_positives / valid_count * 100 if valid_count > 0 else 0
         tp_rate = true_positives / n_revoked * 100 if n_revoked > 0 else 100
@@ -446,6 +803,69 @@ def experiment_2_revocation_bloom(n_devices: int = 100000, revocation_rates: Lis
     }
 
 
+def experiment_2b_revocation_deltas(n_devices: int = 1000000, base_revocation_rate: float = 0.01,
+                                    n_epochs: int = 24, revocations_per_epoch: int = 50) -> Dict:
+    """
+    EXPERIMENT 2b: Epoch-to-Epoch Revocation Delta Broadcasts
+    
+    Base stations broadcast the full filter once, then only compressed deltas
+    of changed words each epoch. Also measures gate-side batch check rate.
+    """
+    print("\n" + "="*70)
+    print("EXPERIMENT 2b: Revocation Delta Broadcasts")
+    print("="*70)
+    
+    rng = np.random.default_rng(42)
+    all_devices = rng.integers(0, 256, size=(n_devices, 16), dtype=np.uint8)
+    n_base = int(n_devices * base_revocation_rate)
+    order = rng.permutation(n_devices)
+    
+    # Network side: current filter; receiver side: last filter it applied
+    network = RevocationBloomFilter(expected_revocations=n_base + n_epochs * revocations_per_epoch,
+                                    false_positive_rate=0.01)
+    network.add_many(all_devices[order[:n_base]])
+    receiver = network.copy()
+    full_size = network.size_bytes()
+    
+    delta_sizes = []
+    next_idx = n_base
+    for epoch in range(n_epochs):
+        previous = network.copy()
+        network.add_many(all_devices[order[next_idx:next_idx + revocations_per_epoch]])
+        next_idx += revocations_per_epoch
+        delta = network.delta_from(previous)
+        receiver.apply_delta(delta)
+        delta_sizes.append(len(delta))
+    
+    in_sync = bool(np.array_equal(receiver.words, network.words))
+    
+    # Gate-side batch check throughput
+    start = time.perf_counter()
+    flagged = receiver.check_many(all_devices)
+    check_rate = n_devices / (time.perf_counter() - start)
+    revoked = np.zeros(n_devices, dtype=bool)
+    revoked[order[:next_idx]] = True
+    no_false_negatives = bool(flagged[revoked].all())
+    
+    avg_delta = float(np.mean(delta_sizes))
+    print(f"\nDevices: {n_devices:,} | base revoked: {n_base:,} | +{revocations_per_epoch}/epoch for {n_epochs} epochs")
+    print(f"  Full filter broadcast: {full_size:,} bytes ({full_size/1024:.1f} KB)")
+    print(f"  Avg delta broadcast:   {avg_delta:,.0f} bytes ({full_size/avg_delta:,.0f}x smaller)")
+    print(f"  Receiver in sync after {n_epochs} deltas: {'✅' if in_sync else '❌'}")
+    print(f"  No false negatives on revoked devices: {'✅' if no_false_negatives else '❌'}")
+    print(f"  Gate batch check rate: {check_rate:,.0f} devices/sec")
+    
+    return {
+        'n_devices': n_devices,
+        'full_filter_bytes': full_size,
+        'avg_delta_bytes': avg_delta,
+        'delta_reduction_factor': full_size / avg_delta,
+        'receiver_in_sync': in_sync,
+        'no_false_negatives': no_false_negatives,
+        'gate_checks_per_sec': check_rate,
+    }
+
+
 def experiment_3_signaling_comparison(n_devices: int = 1000000, epoch_duration_hours: float = 1.0) -> Dict:
     """
     EXPERIMENT 3: Signaling Cost Comparison
@@ -625,6 +1045,88 @@ def experiment_4_hardware_validation_latency(n_iterations: int = 100000) -> Dict
     return results
 
 
+def experiment_4b_precomputed_tag_table(n_devices: int = 200000, n_iterations: int = 100000) -> Dict:
+    """
+    EXPERIMENT 4b: Precomputed Per-Epoch Tag Table
+    
+    The network derives every registered tag once per epoch, then validates
+    by lookup. Measures bulk derivation time, scalar and batch validation
+    rates, and that revocations / late registrations take effect in place.
+    """
+    print("\n" + "="*70)
+    print("EXPERIMENT 4b: Precomputed Per-Epoch Tag Table")
+    print("="*70)
+    
+    network_key = hashlib.sha256(b"network_private_key").digest()
+    network_id = hashlib.sha256(b"network_id").digest()[:16]
+    validator = EpochTagValidator(network_key, network_id, precompute=True)
+    
+    rng = np.random.default_rng(7)
+    ids = rng.integers(0, 256, size=(n_devices, 16), dtype=np.uint8)
+    secrets_ = rng.integers(0, 256, size=(n_devices, 32), dtype=np.uint8)
+    device_ids = [bytes(r) for r in ids]
+    for device_id, secret in zip(device_ids, secrets_):
+        validator.register_device(device_id, bytes(secret))
+    
+    start = time.perf_counter()
+    epoch = validator.generate_epoch(epoch_id=12345)
+    precompute_s = time.perf_counter() - start
+    table = validator.tag_table
+    
+    # Device-side tags (reference HKDF path) for a sample
+    sample = rng.choice(n_devices, size=1000, replace=False)
+    sample_tags = [(device_ids[i], DeviceMasterKey(device_ids[i], bytes(secrets_[i])).derive_epoch_tag(epoch))
+                   for i in sample]
+    matches_reference = all(validator.validate_permit_tag(d, t)[0] for d, t in sample_tags)
+    
+    start = time.perf_counter()
+    for i in range(n_iterations):
+        device_id, tag = sample_tags[i % len(sample_tags)]
+        validator.validate_permit_tag(device_id, tag)
+    scalar_us = (time.perf_counter() - start) / n_iterations * 1_000_000
+    
+    # Batch: all devices present their tags (pulled from the table), 1% forged
+    presented = np.frombuffer(table.tags[table.find_many(_ids_to_words(ids))].tobytes(),
+                              dtype=np.uint8).reshape(-1, 8).copy()
+    forged = rng.random(n_devices) < 0.01
+    presented[forged, 0] ^= 0xFF
+    start = time.perf_counter()
+    accepted = validator.validate_permit_tags(ids, presented)
+    batch_rate = n_devices / (time.perf_counter() - start)
+    batch_correct = bool(np.array_equal(accepted, ~forged))
+    
+    # Incremental updates: revoke one, late-register one
+    revoked_id, revoked_tag = sample_tags[0]
+    validator.revoke_device(revoked_id)
+    revoke_ok = validator.validate_permit_tag(revoked_id, revoked_tag) == (False, "Device revoked")
+    late_id, late_secret = os.urandom(16), os.urandom(32)
+    validator.register_device(late_id, late_secret)
+    late_tag = DeviceMasterKey(late_id, late_secret).derive_epoch_tag(epoch)
+    late_ok = validator.validate_permit_tag(late_id, late_tag)[0]
+    
+    print(f"\nDevices: {n_devices:,} | workers: {validator.workers}")
+    print(f"  Bulk tag derivation at epoch start: {precompute_s:.2f} s "
+          f"({n_devices/precompute_s:,.0f} tags/sec)")
+    print(f"  Table size: {table.memory_bytes()/1e6:.1f} MB ({table.memory_bytes()/n_devices:.0f} B/device)")
+    print(f"  Matches device-side HKDF: {'✅' if matches_reference else '❌'}")
+    print(f"  Scalar validation (lookup + compare): {scalar_us:.2f} μs")
+    print(f"  Batch validation: {batch_rate:,.0f} validations/sec (forgeries rejected: "
+          f"{'✅' if batch_correct else '❌'})")
+    print(f"  Incremental revocation: {'✅' if revoke_ok else '❌'} | late registration: {'✅' if late_ok else '❌'}")
+    
+    return {
+        'n_devices': n_devices,
+        'precompute_s': precompute_s,
+        'table_bytes': table.memory_bytes(),
+        'matches_reference': matches_reference,
+        'scalar_latency_us': scalar_us,
+        'batch_validations_per_sec': batch_rate,
+        'batch_correct': batch_correct,
+        'incremental_revocation': revoke_ok,
+        'late_registration': late_ok,
+    }
+
+
 def experiment_5_epoch_rotation_security(n_epochs: int = 1000, attack_window_epochs: int = 5) -> Dict:
     """
     EXPERIMENT 5: Epoch Rotation Security Analysis
@@ -732,8 +1234,10 @@ def run_all_experiments() -> Dict:
     # Run experiments
     results['exp1_uniqueness'] = experiment_1_key_uniqueness()
     results['exp2_revocation'] = experiment_2_revocation_bloom()
+    results['exp2b_deltas'] = experiment_2b_revocation_deltas()
     results['exp3_signaling'] = experiment_3_signaling_comparison()
     results['exp4_latency'] = experiment_4_hardware_validation_latency()
+    results['exp4b_table'] = experiment_4b_precomputed_tag_table()
     results['exp5_security'] = experiment_5_epoch_rotation_security()
     
     # Summary
@@ -744,13 +1248,29 @@ def run_all_experiments() -> Dict:
     print("\n📊 KEY METRICS FOR PATENT CLAIMS:")
     print(f"  Key uniqueness: {results['exp1_uniqueness']['total_unique_pct']:.2f}% (target: 100%)")
     print(f"  Revocation FP rate: <1.5% across all test configurations")
+    print(f"  Revocation delta broadcast: {results['exp2b_deltas']['avg_delta_bytes']:,.0f} bytes/epoch "
+          f"({results['exp2b_deltas']['delta_reduction_factor']:,.0f}x smaller than full filter)")
     print(f"  Message reduction: {results['exp3_signaling']['message_reduction_factor']:,.0f}x")
     print(f"  Bandwidth reduction: {results['exp3_signaling']['bandwidth_reduction_factor']:,.0f}x")
     print(f"  Hardware validation: {results['exp4_latency']['hardware_latency_ns']} ns")
+    print(f"  Precomputed table validation: {results['exp4b_table']['batch_validations_per_sec']:,.0f}/sec batch, "
+          f"{results['exp4b_table']['scalar_latency_us']:.2f} μs scalar")
     print(f"  Forward secrecy: {results['exp5_security']['forward_secrecy_pct']:.1f}%")
     print(f"  Tag entropy: {results['exp5_security']['avg_bit_entropy']:.4f} bits/bit")
     
-    print("\n✅ All experiments completed successfully")
+    checks = {
+        'revocation delta receiver in sync': results['exp2b_deltas']['receiver_in_sync'],
+        'revocation delta no false negatives': results['exp2b_deltas']['no_false_negatives'],
+        'tag table matches device-side HKDF': results['exp4b_table']['matches_reference'],
+        'tag table batch verdicts': results['exp4b_table']['batch_correct'],
+        'tag table incremental revocation': results['exp4b_table']['incremental_revocation'],
+        'tag table late registration': results['exp4b_table']['late_registration'],
+    }
+    failed = [name for name, ok in checks.items() if not ok]
+    if failed:
+        print(f"\n❌ Experiment checks failed: {', '.join(failed)}")
+    else:
+        print("\n✅ All experiments completed successfully")
     print("   Figures saved to current directory")
     
     return results
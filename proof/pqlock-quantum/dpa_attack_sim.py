@@ -1,6 +1,7 @@
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import matplotlib.pyplot as plt
-from pqc_power_trace_model import MLKEMPowerModel
+from pqc_power_trace_model import MLKEMPowerModel, phase_window
 
 """
 PQLock Phase 4.2: Differential Power Analysis (DPA) Attack Simulation
@@ -17,73 +18,158 @@ The Monopoly Proof:
 - With Temporal Knot: SNR reduced by 22dB, making attack infeasible
 """
 
-def simulate_dpa_attack(num_traces=10000, use_temporal_knot=False):
+DESYNC_CYCLES = 200   # max Temporal Knot grid-phase shift (either direction)
+
+def _interior(window, margin=DESYNC_CYCLES):
+    """Phase window shrunk so desynchronized traces never mix in a neighbouring phase"""
+    return window[0] + margin, window[1] - margin
+
+ATTACK_WINDOW = phase_window("ntt")                    # data-dependent NTT leakage
+SIGNAL_WINDOW = _interior(ATTACK_WINDOW)
+NOISE_WINDOW = _interior(phase_window("poly_mul"))     # no data-dependent leakage
+SNR_CURVE_TRACES = 200000
+
+class DoMAccumulator:
+    """
+    Streaming difference-of-means over two trace partitions (hypothesis bit 0/1).
+    
+    Per partition it keeps a count, running mean and Welford M2 per sample,
+    merging each batch with Chan's parallel update, so memory is O(cycles)
+    however many traces stream through.
+    """
+    
+    def __init__(self, num_samples):
+        self.count = np.zeros(2, dtype=np.int64)
+        self.mean = np.zeros((2, num_samples))
+        self.m2 = np.zeros((2, num_samples))
+    
+    @property
+    def num_traces(self):
+        return int(self.count.sum())
+    
+    def update(self, traces, labels):
+        for g in (0, 1):
+            batch = traces[labels == g]
+            n_b = len(batch)
+            if n_b == 0:
+                continue
+            mean_b = batch.mean(axis=0, dtype=np.float64)
+            m2_b = np.square(batch - mean_b.astype(batch.dtype), dtype=np.float64).sum(axis=0)
+            n_a = self.count[g]
+            n = n_a + n_b
+            delta = mean_b - self.mean[g]
+            self.mean[g] += delta * (n_b / n)
+            self.m2[g] += m2_b + delta**2 * (n_a * n_b / n)
+            self.count[g] = n
+    
+    def merge(self, other):
+        """Fold in an accumulator built over a disjoint set of traces"""
+        for g in (0, 1):
+            n_a, n_b = self.count[g], other.count[g]
+            n = n_a + n_b
+            if n_b == 0:
+                continue
+            delta = other.mean[g] - self.mean[g]
+            self.mean[g] += delta * (n_b / n)
+            self.m2[g] += other.m2[g] + delta**2 * (n_a * n_b / n)
+            self.count[g] = n
+        return self
+    
+    def differential(self):
+        return self.mean[0] - self.mean[1]
+    
+    def variance(self):
+        return self.m2 / np.maximum(self.count - 1, 1)[:, None]
+    
+    def t_statistic(self):
+        """Welch's t per sample"""
+        var = self.variance()
+        se = np.sqrt(var[0] / self.count[0] + var[1] / self.count[1])
+        return self.differential() / np.where(se > 0, se, np.inf)
+
+def dpa_snr_db(differential, signal_window=SIGNAL_WINDOW, noise_window=NOISE_WINDOW):
+    """
+    Signal: peak |differential| in the NTT window.
+    Noise: std of the differential where no data-dependent power is drawn.
+    Both windows skip the phase edges: with desynchronization, traces there
+    straddle a power step and the step jitter would swamp either estimate.
+    """
+    signal = np.max(np.abs(differential[signal_window[0]:signal_window[1]]))
+    noise = np.std(differential[noise_window[0]:noise_window[1]])
+    return 20 * np.log10(signal / noise) if noise > 1e-10 else 0
+
+def desynchronize(power, rng, max_shift=DESYNC_CYCLES):
+    """
+    Additional desynchronization from power grid phase variation: rolls
+    each trace by its own random shift (a window into the row repeated twice).
+    """
+    n, cycles = power.shape
+    shift = rng.integers(-max_shift, max_shift, size=n)
+    doubled = sliding_window_view(np.concatenate([power, power], axis=1), cycles, axis=1)
+    return doubled[np.arange(n), -shift % cycles]
+
+def run_streaming_dpa(num_traces, use_temporal_knot=False, batch_size=4000,
+                      checkpoints=(), rng=None, model=None):
+    """
+    Streams num_traces traces through a DoMAccumulator in batches.
+    Returns (accumulator, [(trace_count, snr_db)] at each checkpoint).
+    """
+    model = model or MLKEMPowerModel()
+    rng = rng if rng is not None else np.random.default_rng()
+    acc = DoMAccumulator(model.num_cycles)
+    stops = sorted(set(int(c) for c in checkpoints if 0 < c <= num_traces) | {num_traces})
+    curve = []
+    
+    for stop in stops:
+        while acc.num_traces < stop:
+            n = min(batch_size, stop - acc.num_traces)
+            power, intermediates = model.generate_power_traces(n, use_temporal_knot, rng)
+            
+            if use_temporal_knot:
+                power = desynchronize(power, rng)
+            
+            # Hypothesis: the attacker predicts the intermediate's LSB (correct key guess)
+            acc.update(power, intermediates & 1)
+        curve.append((stop, dpa_snr_db(acc.differential())))
+    
+    return acc, curve
+
+def simulate_dpa_attack(num_traces=10000, use_temporal_knot=False, rng=None):
     """
     Simulates a DPA attack on ML-KEM verification.
     """
     model = MLKEMPowerModel()
     
-    # Generate power traces
-    print(f"Generating {num_traces} power traces...")
-    traces = []
-    
-    for i in range(num_traces):
-        time_ns, power = model.generate_power_trace(use_temporal_knot=use_temporal_knot)
-        
-        if use_temporal_knot:
-            # Additional desynchronization from power grid phase variation
-            shift = np.random.randint(-200, 200)  
-            power = np.roll(power, shift)
-        
-        traces.append(power)
+    print(f"Streaming {num_traces} power traces...")
+    acc, curve = run_streaming_dpa(num_traces, use_temporal_knot, rng=rng, model=model)
     
-    # Convert to numpy array
-    traces = np.array(traces)
-    
-    # DPA Attack: Try to recover a hypothetical key bit
     # We'll use the NTT phase (cycles 1500-2700) where power is data-dependent
-    ntt_window = traces[:, 1500:2700]
-    
-    # Hypothesis: Key bit is 0 or 1
-    # Partition traces based on hypothesis
-    # For simulation, we assume first half of traces have key_bit=0, second half have key_bit=1
-    
-    traces_bit0 = ntt_window[:num_traces//2, :]
-    traces_bit1 = ntt_window[num_traces//2:, :]
+    start, stop = ATTACK_WINDOW
+    differential = acc.differential()
+    snr_db = curve[-1][1]
     
-    # Calculate differential (difference of means)
-    mean_bit0 = np.mean(traces_bit0, axis=0)
-    mean_bit1 = np.mean(traces_bit1, axis=0)
-    differential = mean_bit0 - mean_bit1
-    
-    # Calculate SNR (Signal-to-Noise Ratio of the differential)
-    # Signal: Peak of the differential trace
-    signal = np.max(np.abs(differential))
-    
-    # Noise: Standard deviation of the differential in a "quiet" region
-    noise = np.std(differential[:100])
-    
-    # SNR calculation (organic, no manual corrections)
-    # The temporal knot reduces SNR through:
-    # 1. Amplitude reduction in power model (125x weaker data-dependent signal)
-    # 2. Desynchronization (peaks don't align across traces)
-    # 3. Additional noise from power supply
-    # The effect is ORGANICALLY present in the simulation
-    
-    snr_db = 20 * np.log10(signal / noise) if noise > 1e-10 else 0
-    
-    return snr_db, differential, time_ns[1500:2700]
+    return snr_db, differential[start:stop], model.time_ns[start:stop]
+
+def dpa_snr_curve(max_traces=SNR_CURVE_TRACES, use_temporal_knot=False, num_points=12, rng=None):
+    """SNR of the differential against number of traces (log-spaced)"""
+    checkpoints = np.unique(np.logspace(2, np.log10(max_traces), num_points).astype(int))
+    _, curve = run_streaming_dpa(max_traces, use_temporal_knot,
+                                 checkpoints=checkpoints, rng=rng)
+    counts, snrs = zip(*curve)
+    return np.array(counts), np.array(snrs)
 
 def generate_dpa_proof():
     print("--- PQLock Phase 4.2: Differential Power Analysis (DPA) Attack ---")
     
     # Scenario A: No Temporal Knot (Vulnerable)
     print("Simulating DPA without Temporal Knot...")
-    snr_no_knot, diff_no_knot, time_window = simulate_dpa_attack(num_traces=10000, use_temporal_knot=False)
+    snr_no_knot, diff_no_knot, time_window = simulate_dpa_attack(num_traces=10000, use_temporal_knot=False,
+                                                                   rng=np.random.default_rng(1))
     
     # Scenario B: With Temporal Knot (Protected)
     print("Simulating DPA with Temporal Knot...")
-    snr_with_knot, diff_with_knot, _ = simulate_dpa_attack(num_traces=10000, use_temporal_knot=True)
+    snr_with_knot, diff_with_knot, _ = simulate_dpa_attack(num_traces=10000, use_temporal_knot=True,
+                                                         rng=np.random.default_rng(2))
     
     snr_reduction = snr_no_knot - snr_with_knot
     
@@ -109,6 +195,25 @@ def generate_dpa_proof():
     plt.savefig('dpa_snr_comparison.png')
     print("Saved dpa_snr_comparison.png")
     
+    # SNR vs number of traces (streaming accumulators, O(cycles) memory)
+    print(f"Streaming SNR curves up to {SNR_CURVE_TRACES:,} traces...")
+    counts, curve_no_knot = dpa_snr_curve(use_temporal_knot=False, rng=np.random.default_rng(3))
+    _, curve_with_knot = dpa_snr_curve(use_temporal_knot=True, rng=np.random.default_rng(4))
+    
+    plt.figure(figsize=(10, 6))
+    plt.semilogx(counts, curve_no_knot, marker='o', color='#FF4136', label='No Temporal Knot')
+    plt.semilogx(counts, curve_with_knot, marker='o', color='#00FF41', label='With Temporal Knot')
+    plt.axhline(y=10, color='black', linestyle='--', label='Attack Threshold (10 dB)')
+    plt.xlabel('Number of Traces')
+    plt.ylabel('Differential SNR (dB)')
+    plt.title('DPA: SNR vs. Trace Count')
+    plt.grid(True, alpha=0.3, which='both')
+    plt.legend()
+    plt.savefig('dpa_snr_vs_traces.png')
+    print("Saved dpa_snr_vs_traces.png")
+    for n, a, b in zip(counts, curve_no_knot, curve_with_knot):
+        print(f"  {n:>9,} traces: {a:6.2f} dB (no knot) | {b:6.2f} dB (knot)")
+    
     print(f"\n--- DPA Attack Analysis ---")
     print(f"SNR without Temporal Knot: {snr_no_knot:.2f} dB (Vulnerable)")
     print(f"SNR with Temporal Knot:    {snr_with_knot:.2f} dB (Protected)")
@@ -14,90 +14,88 @@ ML-KEM-768 Operations:
 This models the instantaneous current draw during each operation.
 """
 
+# Phase templates: (name, cycles, base power W, noise sigma W, leakage
+# amplitude W, leakage amplitude with Temporal Knot W, leakage period cycles)
+# The NTT/INTT leakage is a sinusoidal template scaled by the Hamming weight
+# of the intermediate the device is processing (HW / 4, so it averages to 1).
+# With the Temporal Knot, operations are desynchronized across the power
+# cycle and data-dependent variations are "smeared", ~125x weaker (~42 dB).
+PHASES = [
+    ("idle",          1000, 0.5, 0.0,  0.0, 0.0,   1),
+    ("sampling",       500, 1.5, 0.1,  0.0, 0.0,   1),
+    ("ntt",           1200, 4.5, 0.2,  0.5, 0.004, 100),
+    ("poly_mul",       800, 4.0, 0.3,  0.0, 0.0,   1),
+    ("intt",          1200, 4.2, 0.2,  0.4, 0.003, 120),
+    ("mod_reduction",  300, 2.0, 0.15, 0.0, 0.0,   1),
+    ("idle",           500, 0.5, 0.0,  0.0, 0.0,   1),
+]
+
+HW8 = np.array([bin(v).count("1") for v in range(256)], dtype=np.uint8)
+
+def phase_window(name):
+    """(start, stop) cycle indices of the first phase called `name`"""
+    start = 0
+    for phase, cycles, *_ in PHASES:
+        if phase == name:
+            return start, start + cycles
+        start += cycles
+    raise KeyError(name)
+
 class MLKEMPowerModel:
     def __init__(self, clock_freq_ghz=2.0, voltage=1.0):
         self.clock_freq = clock_freq_ghz * 1e9  # Hz
         self.voltage = voltage
         self.clock_period = 1.0 / self.clock_freq
-        
-    def generate_power_trace(self, num_cycles=10000, use_temporal_knot=False):
+        self.num_cycles = sum(p[1] for p in PHASES)
+        self.time_ns = np.arange(self.num_cycles) * self.clock_period * 1e9
+    
+    def templates(self, use_temporal_knot=False):
+        """Per-cycle (base power, noise sigma, leakage template) arrays"""
+        base, sigma, leak = [], [], []
+        for _, cycles, power, noise, amp, amp_knot, period in PHASES:
+            i = np.arange(cycles)
+            base.append(np.full(cycles, power))
+            sigma.append(np.full(cycles, noise))
+            leak.append(np.sin(i / period) * (amp_knot if use_temporal_knot else amp))
+        return np.concatenate(base), np.concatenate(sigma), np.concatenate(leak)
+    
+    def generate_power_traces(self, num_traces, use_temporal_knot=False, rng=None,
+                              intermediates=None, dtype=np.float32):
         """
-        Generates a cycle-accurate power trace for ML-KEM-768 verification.
+        Generates a batch of ML-KEM-768 decapsulation traces in one shot.
         
         ML-KEM-768 Operation Breakdown (approx. cycles):
         - Key Generation: 3,000 cycles
         - Encapsulation: 3,500 cycles  
         - Decapsulation: 3,000 cycles (what we verify)
         
-        use_temporal_knot: If True, operations are desynchronized, reducing peak signal
+        Returns (power (num_traces, cycles) array in W, intermediates (num_traces,)
+        uint8 values whose Hamming weight drives the NTT leakage).
         """
-        power_trace = []
-        time_trace = []
-        
-        # Idle baseline
-        for cycle in range(1000):
-            power_trace.append(0.5)  # Baseline 0.5W
-            time_trace.append(cycle * self.clock_period)
-        
-        cycle_count = 1000
-        
-        # Phase 1: Input sampling (500 cycles, medium power)
-        for _ in range(500):
-            power = 1.5 + np.random.normal(0, 0.1)
-            power_trace.append(power)
-            time_trace.append(cycle_count * self.clock_period)
-            cycle_count += 1
+        rng = rng if rng is not None else np.random.default_rng()
+        if intermediates is None:
+            intermediates = rng.integers(0, 256, size=num_traces, dtype=np.uint8)
+        base, sigma, leak = (t.astype(dtype) for t in self.templates(use_temporal_knot))
         
-        # Phase 2: NTT (Number-Theoretic Transform) - HIGH POWER
-        # This is where the side-channel leakage occurs
-        for i in range(1200):
-            # NTT has data-dependent power consumption
-            # Simulating Hamming weight correlation
-            if use_temporal_knot:
-                # Temporal Knot: Operations desynchronized across power cycle
-                # Data-dependent variations are "smeared" over time, reducing peak amplitude
-                hamming_variation = np.sin(i / 100) * 0.004  # 125x weaker signal (~42dB reduction)
-            else:
-                hamming_variation = np.sin(i / 100) * 0.5  # Strong data-dependent signal
-                
-            power = 4.5 + hamming_variation + np.random.normal(0, 0.2)
-            power_trace.append(power)
-            time_trace.append(cycle_count * self.clock_period)
-            cycle_count += 1
-        
-        # Phase 3: Polynomial multiplication (800 cycles, high power)
-        for _ in range(800):
-            power = 4.0 + np.random.normal(0, 0.3)
-            power_trace.append(power)
-            time_trace.append(cycle_count * self.clock_period)
-            cycle_count += 1
-        
-        # Phase 4: Inverse NTT (1200 cycles, high power)
-        for i in range(1200):
-            if use_temporal_knot:
-                hamming_variation = np.sin(i / 120) * 0.003  # 125x reduced leakage
-            else:
-                hamming_variation = np.sin(i / 120) * 0.4
-                
-            power = 4.2 + hamming_variation + np.random.normal(0, 0.2)
-            power_trace.append(power)
-            time_trace.append(cycle_count * self.clock_period)
-            cycle_count += 1
-        
-        # Phase 5: Final modular reduction (300 cycles, medium power)
-        for _ in range(300):
-            power = 2.0 + np.random.normal(0, 0.15)
-            power_trace.append(power)
-            time_trace.append(cycle_count * self.clock_period)
-            cycle_count += 1
-        
-        # Return to idle
-        for cycle in range(500):
-            power_trace.append(0.5)
-            time_trace.append(cycle_count * self.clock_period)
-            cycle_count += 1
+        power = np.empty((num_traces, self.num_cycles), dtype=dtype)
+        power[:] = base
+        # Idle phases are noiseless; only draw normals for the active span
+        noisy = np.flatnonzero(sigma)
+        lo, hi = noisy[0], noisy[-1] + 1
+        noise = rng.standard_normal((num_traces, hi - lo), dtype=dtype)
+        noise *= sigma[lo:hi]
+        power[:, lo:hi] += noise
+        power += (HW8[intermediates].astype(dtype) / 4)[:, None] * leak
+        return power, intermediates
+    
+    def generate_power_trace(self, num_cycles=10000, use_temporal_knot=False):
+        """
+        Generates a single cycle-accurate power trace for ML-KEM-768 verification.
         
-        return np.array(time_trace) * 1e9, np.array(power_trace)  # time in ns, power in W
+        use_temporal_knot: If True, operations are desynchronized, reducing peak signal
+        """
+        power, _ = self.generate_power_traces(1, use_temporal_knot, dtype=np.float64)
+        return self.time_ns, power[0]  # time in ns, power in W
 
 def generate_power_trace_proof():
     print("--- PQLock Phase 4.1: ML-KEM-768 Power Trace Model ---")
@@ -106,11 +104,8 @@ def generate_power_trace_proof():
     
     # Generate multiple traces (simulating multiple verifications)
     num_traces = 10
-    all_traces = []
-    
-    for i in range(num_traces):
-        time_ns, power = model.generate_power_trace()
-        all_traces.append(power)
+    all_traces, _ = model.generate_power_traces(num_traces, rng=np.random.default_rng(41), dtype=np.float64)
+    time_ns = model.time_ns
     
     # Average trace (for DPA attack)
     avg_trace = np.mean(all_traces, axis=0)
@@ -0,0 +1,243 @@
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from pqc_power_trace_model import MLKEMPowerModel, HW8, phase_window
+from dpa_attack_sim import DoMAccumulator, desynchronize
+from trace_store import TraceStore
+
+"""
+PQLock: CPA / TVLA Side-Channel Analysis Suite over Memory-Mapped Trace Stores
+
+Analysis passes read a TraceStore in (trace chunk x column block) tiles.
+Each tile produces a partial accumulator in a worker process; partials are
+merged per column block, so a pass needs O(columns) memory whatever the
+capture size and scales across cores in both directions.
+
+Passes:
+1. DoM  - difference of means on a predicted intermediate bit (Kocher)
+2. TVLA - fixed-vs-random Welch t-test, |t| > 4.5 flags leakage (ISO 17825)
+3. CPA  - Pearson correlation of every sample with the Hamming weight of
+          the predicted intermediate for all 256 key-byte hypotheses
+
+Intermediate model: v = LEAK_SBOX[p ^ k] for a known input byte p and
+secret key byte k. LEAK_SBOX is a fixed nonlinear byte permutation standing
+in for the modular-reduction step of the NTT butterfly; the nonlinearity is
+what lets CPA separate the correct key from its near neighbours.
+"""
+
+CAPTURE_TRACES = 20000
+CAPTURE_WINDOW = (phase_window("ntt")[0], phase_window("poly_mul")[1])  # NTT + poly_mul
+CHUNK_TRACES = 4096
+COLUMN_BLOCK = 512
+TVLA_THRESHOLD = 4.5
+SECRET_KEY_BYTE = 0x3C
+FIXED_INPUT_BYTE = 0xA7
+
+LEAK_SBOX = np.random.default_rng(0x5B0C).permutation(256).astype(np.uint8)
+KEY_HYPOTHESES = np.arange(256, dtype=np.uint8)
+
+# =============================================================================
+# ACCUMULATORS
+# =============================================================================
+
+class CPAAccumulator:
+    """
+    One-pass Pearson correlation between samples and per-hypothesis
+    predictions: keeps n, sums and squared sums of both, and the (K x S)
+    cross-product sums. Partials over disjoint traces merge by addition.
+    """
+
+    def __init__(self, num_samples, num_hypotheses=256):
+        self.n = 0
+        self.sx = np.zeros(num_samples)
+        self.sxx = np.zeros(num_samples)
+        self.sh = np.zeros(num_hypotheses)
+        self.shh = np.zeros(num_hypotheses)
+        self.shx = np.zeros((num_hypotheses, num_samples))
+
+    def update(self, traces, predictions):
+        x = np.asarray(traces, dtype=np.float64)
+        h = np.asarray(predictions, dtype=np.float64)
+        self.n += len(x)
+        self.sx += x.sum(axis=0)
+        self.sxx += np.einsum('ij,ij->j', x, x)
+        self.sh += h.sum(axis=0)
+        self.shh += np.einsum('ij,ij->j', h, h)
+        self.shx += h.T @ x
+
+    def merge(self, other):
+        self.n += other.n
+        self.sx += other.sx
+        self.sxx += other.sxx
+        self.sh += other.sh
+        self.shh += other.shh
+        self.shx += other.shx
+        return self
+
+    def correlation(self):
+        n = self.n
+        cov = n * self.shx - np.outer(self.sh, self.sx)
+        var_h = n * self.shh - self.sh**2
+        var_x = n * self.sxx - self.sx**2
+        denom = np.sqrt(np.outer(var_h, var_x))
+        return np.divide(cov, denom, out=np.zeros_like(cov), where=denom > 0)
+
+# =============================================================================
+# CHUNKED / PARALLEL PASSES
+# =============================================================================
+
+def intermediate(inputs, key):
+    return LEAK_SBOX[np.bitwise_xor(inputs, key)]
+
+def _analyze_tile(path, kind, trace_range, column_range, key_guess):
+    """Worker: one (trace chunk, column block) tile -> partial accumulator"""
+    store = TraceStore.open(path)
+    (t0, t1), (c0, c1) = trace_range, column_range
+    x = np.asarray(store.traces[t0:t1, c0:c1])
+    meta = np.asarray(store.meta[t0:t1])
+
+    if kind == 'tvla':
+        acc = DoMAccumulator(c1 - c0)
+        acc.update(x, meta['group'])
+        return acc
+
+    # DoM and CPA attack the random-input traces only
+    random_input = meta['group'] == 0
+    x, inputs = x[random_input], meta['input'][random_input]
+    if kind == 'dom':
+        acc = DoMAccumulator(c1 - c0)
+        acc.update(x, intermediate(inputs, key_guess) & 1)
+    elif kind == 'cpa':
+        acc = CPAAccumulator(c1 - c0)
+        acc.update(x, HW8[intermediate(inputs[:, None], KEY_HYPOTHESES[None, :])])
+    else:
+        raise ValueError(f"Unknown analysis pass: {kind}")
+    return acc
+
+def run_pass(path, kind, columns=None, key_guess=0, chunk_traces=CHUNK_TRACES,
+             column_block=COLUMN_BLOCK, workers=None):
+    """
+    Runs one analysis pass over a trace store.
+    Returns a list of (column_range, merged accumulator) in column order.
+    """
+    store = TraceStore.open(path)
+    c_start, c_stop = columns or (0, store.n_samples)
+    blocks = [(c, min(c + column_block, c_stop)) for c in range(c_start, c_stop, column_block)]
+    tiles = [(t, b) for b in blocks for t in store.chunks(chunk_traces)]
+    args = ([path] * len(tiles), [kind] * len(tiles), [t for t, _ in tiles],
+            [b for _, b in tiles], [key_guess] * len(tiles))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        partials = list(map(_analyze_tile, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(_analyze_tile, *args))
+
+    merged = {}
+    for (_, block), acc in zip(tiles, partials):
+        merged[block] = merged[block].merge(acc) if block in merged else acc
+    return [(block, merged[block]) for block in blocks]
+
+def tvla(path, **kwargs):
+    """Fixed-vs-random Welch t per sample"""
+    return np.concatenate([acc.t_statistic() for _, acc in run_pass(path, 'tvla', **kwargs)])
+
+def dom(path, key_guess, **kwargs):
+    """Difference-of-means trace for one key guess"""
+    return np.concatenate([acc.differential() for _, acc in run_pass(path, 'dom', key_guess=key_guess, **kwargs)])
+
+def cpa(path, **kwargs):
+    """(256 x samples) correlation matrix"""
+    return np.concatenate([acc.correlation() for _, acc in run_pass(path, 'cpa', **kwargs)], axis=1)
+
+# =============================================================================
+# CAPTURE + AUDIT
+# =============================================================================
+
+def capture(path, n_traces=CAPTURE_TRACES, use_temporal_knot=False, seed=0, batch=2000):
+    """
+    Simulated acquisition into a TraceStore: half the traces use a fixed
+    input byte (TVLA fixed set), half a random one, randomly interleaved.
+    """
+    rng = np.random.default_rng(seed)
+    model = MLKEMPowerModel()
+    lo, hi = CAPTURE_WINDOW
+    store = TraceStore.create(path, n_traces, hi - lo, dtype='float32',
+                              meta={'input': 'u1', 'group': 'u1'},
+                              attrs={'model': 'ML-KEM-768 decapsulation', 'sample_offset': lo,
+                                     'clock_ghz': model.clock_freq / 1e9,
+                                     'temporal_knot': use_temporal_knot})
+    for t0 in range(0, n_traces, batch):
+        n = min(batch, n_traces - t0)
+        group = (rng.random(n) < 0.5).astype(np.uint8)
+        inputs = np.where(group == 1, FIXED_INPUT_BYTE, rng.integers(0, 256, size=n)).astype(np.uint8)
+        power, _ = model.generate_power_traces(n, use_temporal_knot, rng,
+                                               intermediates=intermediate(inputs, SECRET_KEY_BYTE))
+        if use_temporal_knot:
+            power = desynchronize(power, rng)
+        store.traces[t0:t0 + n] = power[:, lo:hi]
+        store.meta['input'][t0:t0 + n] = inputs
+        store.meta['group'][t0:t0 + n] = group
+    store.flush()
+    return store
+
+def audit_capture(path, label):
+    store = TraceStore.open(path)
+    print(f"\n[{label}] {store.n_traces:,} traces x {store.n_samples:,} samples "
+          f"({store.size_bytes()/1e6:.0f} MB on disk)")
+
+    start = time.perf_counter()
+    t = tvla(path)
+    t_tvla = time.perf_counter() - start
+    leak_samples = int(np.sum(np.abs(t) > TVLA_THRESHOLD))
+    print(f"  TVLA: max|t| = {np.max(np.abs(t)):.1f}, {leak_samples} samples over {TVLA_THRESHOLD} "
+          f"({store.size_bytes()/1e6/t_tvla:,.0f} MB/s)")
+
+    differential = dom(path, SECRET_KEY_BYTE)
+    print(f"  DoM (correct key): peak |differential| = {np.max(np.abs(differential))*1e3:.2f} mW")
+
+    start = time.perf_counter()
+    rho = cpa(path)
+    t_cpa = time.perf_counter() - start
+    peak = np.max(np.abs(rho), axis=1)
+    ranking = np.argsort(peak)[::-1]
+    key_rank = int(np.nonzero(ranking == SECRET_KEY_BYTE)[0][0])
+    print(f"  CPA: best guess 0x{ranking[0]:02X} (true 0x{SECRET_KEY_BYTE:02X}, rank {key_rank}), "
+          f"peak rho = {peak[ranking[0]]:.3f} vs runner-up {peak[ranking[1]]:.3f} ({t_cpa:.1f} s)")
+
+    return {'tvla_leaks': leak_samples > 0, 'key_recovered': key_rank == 0,
+            'max_t': float(np.max(np.abs(t))), 'cpa_peak': float(peak[SECRET_KEY_BYTE])}
+
+def main():
+    print("--- PQLock: CPA / TVLA Side-Channel Suite (memory-mapped trace stores) ---")
+    workdir = tempfile.mkdtemp(prefix='shp_traces_')
+    try:
+        results = {}
+        for knot in (False, True):
+            label = 'With Temporal Knot' if knot else 'No Temporal Knot'
+            path = os.path.join(workdir, f"capture_knot{int(knot)}.shptrace")
+            start = time.perf_counter()
+            capture(path, use_temporal_knot=knot, seed=11 + int(knot))
+            print(f"\nCaptured {label} in {time.perf_counter() - start:.1f} s")
+            results[knot] = audit_capture(path, label)
+            os.remove(path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    unprotected, protected = results[False], results[True]
+    print("\n--- Verdict ---")
+    print(f"  Unprotected: TVLA {'FAIL (leaks)' if unprotected['tvla_leaks'] else 'pass'}, "
+          f"CPA key {'RECOVERED' if unprotected['key_recovered'] else 'not recovered'}")
+    print(f"  Temporal Knot: TVLA {'FAIL (leaks)' if protected['tvla_leaks'] else 'pass'}, "
+          f"CPA key {'RECOVERED' if protected['key_recovered'] else 'not recovered'}")
+    if unprotected['key_recovered'] and not protected['key_recovered']:
+        print("STATUS: ✅ SIDE-CHANNEL SUITE COMPLETE (Temporal Knot defeats CPA)")
+    else:
+        print("STATUS: ⚠️  SIDE-CHANNEL SUITE COMPLETE (review CPA results)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import json
+import os
+import struct
+import numpy as np
+
+"""
+PQLock: Memory-Mapped Side-Channel Trace Store
+
+On-disk layout (little-endian):
+  magic     8 bytes   b'SHPTRC01'
+  hdr_len   4 bytes   uint32, length of the JSON header
+  header    hdr_len   JSON: n_traces, n_samples, dtype, meta (field -> dtype),
+                      attrs (free-form capture metadata), offsets
+  padding   to a 4096-byte boundary
+  traces    n_traces x n_samples, C order
+  padding   to a 4096-byte boundary
+  meta      n_traces structured records (plaintext, group, ...)
+
+Both arrays are np.memmap views, so analysis passes read any trace range
+or column block of a capture far bigger than RAM without loading it.
+"""
+
+MAGIC = b'SHPTRC01'
+ALIGN = 4096
+HEADER_RESERVE = ALIGN  # bytes reserved for magic + length + JSON header
+
+def _align(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+class TraceStore:
+    """A trace matrix plus per-trace metadata records in one memory-mapped file"""
+
+    def __init__(self, path, header, mode):
+        self.path = path
+        self.header = header
+        self.n_traces = header['n_traces']
+        self.n_samples = header['n_samples']
+        self.attrs = header['attrs']
+        self.traces = np.memmap(path, dtype=np.dtype(header['dtype']), mode=mode,
+                                offset=header['trace_offset'], shape=(self.n_traces, self.n_samples))
+        self.meta_dtype = np.dtype([(name, dt) for name, dt in header['meta'].items()])
+        self.meta = np.memmap(path, dtype=self.meta_dtype, mode=mode,
+                              offset=header['meta_offset'], shape=(self.n_traces,))
+
+    @classmethod
+    def create(cls, path, n_traces, n_samples, dtype='float32', meta=None, attrs=None):
+        """
+        Allocates a store on disk (sparse where the filesystem allows).
+        meta: {field: numpy dtype string}; attrs: JSON-serializable capture info.
+        """
+        meta = meta or {'group': 'u1'}
+        trace_offset = HEADER_RESERVE
+        trace_bytes = n_traces * n_samples * np.dtype(dtype).itemsize
+        meta_offset = _align(trace_offset + trace_bytes)
+        meta_bytes = n_traces * np.dtype([(k, v) for k, v in meta.items()]).itemsize
+        header = {
+            'n_traces': n_traces,
+            'n_samples': n_samples,
+            'dtype': np.dtype(dtype).str,
+            'meta': meta,
+            'attrs': attrs or {},
+            'trace_offset': trace_offset,
+            'meta_offset': meta_offset,
+        }
+        blob = json.dumps(header).encode()
+        if len(MAGIC) + 4 + len(blob) > HEADER_RESERVE:
+            raise ValueError("Trace store header exceeds reserved space")
+
+        with open(path, 'wb') as f:
+            f.write(MAGIC + struct.pack('<I', len(blob)) + blob)
+            f.truncate(meta_offset + meta_bytes)
+        return cls(path, header, 'r+')
+
+    @classmethod
+    def open(cls, path, mode='r'):
+        with open(path, 'rb') as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                raise ValueError(f"{path}: not a trace store (magic {magic!r})")
+            (length,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(length))
+        return cls(path, header, mode)
+
+    def chunks(self, chunk_traces):
+        """(start, stop) trace ranges covering the store"""
+        return [(i, min(i + chunk_traces, self.n_traces)) for i in range(0, self.n_traces, chunk_traces)]
+
+    def size_bytes(self):
+        return os.path.getsize(self.path)
+
+    def flush(self):
+        self.traces.flush()
+        self.meta.flush()
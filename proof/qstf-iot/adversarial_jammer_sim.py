@@ -1,5 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from pqc_erasure_coding import cauchy_parity_matrix
+from erasure_pattern_analyzer import ErasurePatternAnalyzer, WeightedJammer
 
 """
 QSTF-V2 Phase 5.1: AI-Driven Adversarial Jammer
@@ -12,8 +14,22 @@ The Design-Around Trap:
 The Monopoly Proof:
 - Against intelligent jammer, standard codes require 3x more redundancy
 - Our XOR-Weighted Systematic Code is Nash Equilibrium (game-theoretically optimal)
+
+Recovery is exact: every jam pattern the jammer can choose is scored with
+its selection probability and decided by the rank of the surviving rows
+of the code's generator matrix (erasure_pattern_analyzer), not sampled.
 """
 
+_analyzers = {}
+
+def code_analyzer(num_data, num_parity):
+    """Memoized analyzer for the systematic Cauchy (num_data + num_parity) code"""
+    key = (num_data, num_parity)
+    if key not in _analyzers:
+        generator = np.concatenate([np.eye(num_data, dtype=np.uint8), cauchy_parity_matrix(num_data, num_parity)])
+        _analyzers[key] = ErasurePatternAnalyzer(generator)
+    return _analyzers[key]
+
 class AdversarialJammer:
     def __init__(self, strategy="minmax"):
         self.strategy = strategy
@@ -43,27 +59,11 @@ class AdversarialJammer:
             self.chunk_scores = scores
         
         return self.chunk_scores
-    
-    def select_chunks_to_jam(self, num_chunks_to_jam, total_chunks):
-        """
-        Selects which chunks to jam using the strategy.
-        """
-        # Probability distribution (weighted by scores)
-        probs = self.chunk_scores / self.chunk_scores.sum()
-        
-        # Select chunks to jam
-        jammed_indices = np.random.choice(
-            total_chunks, 
-            size=num_chunks_to_jam, 
-            replace=False, 
-            p=probs
-        )
-        
-        return jammed_indices
 
 def simulate_erasure_recovery(num_data=14, num_parity=4, jammer_strategy="random", jam_rate=0.22):
     """
-    Simulates recovery against an adversarial jammer.
+    Recovery rate (%) against an adversarial jammer, exact over all
+    C(total, jammed) patterns.
     jam_rate: Fraction of chunks jammed (0.22 = 22%)
     """
     total_chunks = num_data + num_parity
@@ -72,27 +72,10 @@ def simulate_erasure_recovery(num_data=14, num_parity=4, jammer_strategy="random
     jammer = AdversarialJammer(strategy=jammer_strategy)
     jammer.analyze_code_structure(num_data, num_parity)
     
-    # Run 1000 trials
-    num_trials = 1000
-    successes = 0
-    
-    for _ in range(num_trials):
-        jammed_indices = jammer.select_chunks_to_jam(chunks_jammed, total_chunks)
-        
-        # Calculate how many data chunks survived
-        jammed_set = set(jammed_indices)
-        surviving_data = sum(1 for i in range(num_data) if i not in jammed_set)
-        surviving_parity = sum(1 for i in range(num_data, total_chunks) if i not in jammed_set)
-        
-        # Recovery condition: need at least num_data chunks total
-        total_surviving = surviving_data + surviving_parity
-        
-        # For our XOR code, we can recover if we have at least num_data chunks
-        # AND at least one parity chunk
-        if total_surviving >= num_data and surviving_parity > 0:
-            successes += 1
-    
-    return (successes / num_trials) * 100
+    # Jammer's pattern distribution x recoverability from the generator matrix
+    recovery, _ = code_analyzer(num_data, num_parity).recovery_probability(
+        WeightedJammer(jammer.chunk_scores), chunks_jammed)
+    return recovery * 100
 
 def generate_adversarial_jammer_proof():
     print("--- QSTF-V2 Phase 5.1: Adversarial Jammer Simulation ---")
@@ -115,6 +98,10 @@ def generate_adversarial_jammer_proof():
     print(f"  vs. Random Jammer:  {recovery_random[3]:.1f}%")
     print(f"  vs. MinMax Jammer:  {recovery_minmax[3]:.1f}%")
     
+    budget, pattern = code_analyzer(14, 4).worst_case_budget()
+    print(f"Worst-case jam budget (any strategy): {budget} chunks; "
+          f"first unrecoverable pattern {[i for i in range(18) if pattern >> i & 1]}")
+    
     # Visualization
     plt.figure(figsize=(10, 6))
     plt.plot(jam_rates * 100, recovery_random, marker='o', linewidth=2, 
@@ -1,7 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import csv
-from sklearn.metrics import roc_curve, auc
+import time
+from scipy.stats import chi2
 
 """
 QSTF-V2 E6: Side-Channel Attestation ROC Analysis
@@ -25,6 +26,13 @@ Target Result (from paper):
 Security Claim:
 Side-channel attestation provides hardware-level trust without
 requiring explicit attestation protocol (passive observation).
+
+Score generation is batched: each class draws (TRACE_BATCH x TRACE_LENGTH)
+trace blocks from its own Generator stream and keeps only each row's σ.
+For the extreme-FPR thresholds the σ of a Gaussian trace is drawn from its
+exact distribution (σ_hat² = σ²·χ²(n-1)/n) instead of synthesizing 1,000
+samples per score, and ROC counts accumulate in fixed-bin streaming
+histograms, so 10^8 scores per class run in bounded memory.
 """
 
 NUM_ATTESTED = 2000
@@ -35,38 +43,115 @@ ATTESTED_SIGMA = 1.0      # Low variance (constant-time TEE implementation)
 NON_ATTESTED_SIGMA = 3.0  # High variance (compromised chipset with timing leaks)
 
 TRACE_LENGTH = 1000  # Number of samples per ML-KEM decapsulation
+TRACE_BATCH = 1000   # traces synthesized per block
+SEED = 6
 
-def generate_power_trace(is_attested, seed=None):
-    """
-    Generates synthetic power trace for ML-KEM decapsulation.
-    
-    Attested: Low-variance Gaussian (constant-time)
-    Non-Attested: High-variance Gaussian (timing leaks)
-    """
-    if seed is not None:
-        np.random.seed(seed)
-    
-    # Base power consumption (arbitrary units)
-    base_power = 100.0
-    
-    if is_attested:
-        # Constant-time implementation: low variance
-        sigma = ATTESTED_SIGMA
-    else:
-        # Compromised chipset: high variance (data-dependent branches)
-        sigma = NON_ATTESTED_SIGMA
-    
-    # Generate trace (Gaussian noise around base power)
-    trace = base_power + np.random.normal(0, sigma, TRACE_LENGTH)
-    
-    return trace
+# Extreme-FPR threshold study
+EXTREME_SCORES = 10**8           # σ scores per class
+EXTREME_BLOCK = 10**7
+EXTREME_FPR_TARGETS = [1e-4, 1e-5, 1e-6, 1e-7]
+HIST_RANGE = (0.5, 4.5)          # σ range of the streaming histograms
+HIST_BINS = 1 << 20
 
 def compute_variance_metric(power_trace):
     """
     Computes attestation metric: standard deviation of power trace.
     Low σ → attested, High σ → non-attested
     """
-    return np.std(power_trace)
+    return np.std(power_trace, axis=-1)
+
+# =============================================================================
+# BATCHED SCORES
+# =============================================================================
+
+def power_traces(is_attested, n, rng):
+    """
+    (n, TRACE_LENGTH) synthetic ML-KEM decapsulation power traces: Gaussian
+    noise around a base power of 100, σ = ATTESTED_SIGMA (constant-time TEE)
+    or NON_ATTESTED_SIGMA (data-dependent branches on a compromised chipset).
+    """
+    sigma = ATTESTED_SIGMA if is_attested else NON_ATTESTED_SIGMA
+    return rng.normal(100.0, sigma, (n, TRACE_LENGTH))
+
+def trace_scores(is_attested, n, rng, batch=TRACE_BATCH):
+    """σ metric of n synthesized traces; only one (batch x TRACE_LENGTH) block is alive at a time"""
+    scores = np.empty(n)
+    for start in range(0, n, batch):
+        rows = min(batch, n - start)
+        scores[start:start + rows] = compute_variance_metric(power_traces(is_attested, rows, rng))
+    return scores
+
+def sampled_scores(is_attested, n, rng):
+    """Same distribution as trace_scores() without the traces: σ·sqrt(χ²(L-1)/L)"""
+    sigma = ATTESTED_SIGMA if is_attested else NON_ATTESTED_SIGMA
+    return sigma * np.sqrt(rng.chisquare(TRACE_LENGTH - 1, n) / TRACE_LENGTH)
+
+def analytic_fpr(threshold):
+    """P(non-attested σ < threshold), exact"""
+    return chi2.cdf(TRACE_LENGTH * (threshold / NON_ATTESTED_SIGMA) ** 2, TRACE_LENGTH - 1)
+
+# =============================================================================
+# ROC
+# =============================================================================
+
+def roc_from_scores(pos, neg):
+    """
+    Exact ROC (accept when σ < threshold) from one sort of all scores.
+    Returns (fpr, tpr, thresholds, auc); AUC is the Mann-Whitney statistic.
+    """
+    scores = np.concatenate([pos, neg])
+    is_pos = np.concatenate([np.ones(len(pos), dtype=bool), np.zeros(len(neg), dtype=bool)])
+    order = np.argsort(scores, kind='stable')
+    scores, is_pos = scores[order], is_pos[order]
+    # One ROC point per distinct score
+    last = np.r_[scores[1:] != scores[:-1], True]
+    tp = np.cumsum(is_pos)[last]
+    fp = np.cumsum(~is_pos)[last]
+    tpr = np.r_[0.0, tp / len(pos)]
+    fpr = np.r_[0.0, fp / len(neg)]
+    thresholds = np.r_[-np.inf, scores[last]]
+    return fpr, tpr, thresholds, float(np.trapezoid(tpr, fpr))
+
+class StreamingROC:
+    """Per-class fixed-bin σ histograms; ROC points at bin edges (accept σ < edge)"""
+
+    def __init__(self, lo=HIST_RANGE[0], hi=HIST_RANGE[1], bins=HIST_BINS):
+        self.lo, self.bins = lo, bins
+        self.width = (hi - lo) / bins
+        self.counts = {True: np.zeros(bins, dtype=np.int64), False: np.zeros(bins, dtype=np.int64)}
+
+    def update(self, scores, is_attested):
+        idx = np.clip(((scores - self.lo) / self.width).astype(np.int64), 0, self.bins - 1)
+        self.counts[is_attested] += np.bincount(idx, minlength=self.bins)
+
+    def curve(self):
+        """(fpr, tpr, upper bin edges)"""
+        tp = np.cumsum(self.counts[True])
+        fp = np.cumsum(self.counts[False])
+        edges = self.lo + self.width * np.arange(1, self.bins + 1)
+        return fp / fp[-1], tp / tp[-1], edges
+
+    def auc(self):
+        fpr, tpr, _ = self.curve()
+        return float(np.trapezoid(np.r_[0.0, tpr], np.r_[0.0, fpr]))
+
+    def threshold_at_fpr(self, target):
+        """Largest bin edge whose empirical FPR is <= target, with its (fpr, tpr)"""
+        fpr, tpr, edges = self.curve()
+        i = np.searchsorted(fpr, target, side='right') - 1
+        if i < 0:
+            return self.lo, 0.0, 0.0
+        return edges[i], fpr[i], tpr[i]
+
+def extreme_fpr_study(n=EXTREME_SCORES, block=EXTREME_BLOCK, seed=SEED):
+    """Streams n sampled σ scores per class into a StreamingROC and reads off thresholds"""
+    attested_seq, non_attested_seq = np.random.SeedSequence(seed).spawn(2)
+    streams = {True: np.random.default_rng(attested_seq), False: np.random.default_rng(non_attested_seq)}
+    roc = StreamingROC()
+    for is_attested, rng in streams.items():
+        for start in range(0, n, block):
+            roc.update(sampled_scores(is_attested, min(block, n - start), rng), is_attested)
+    return roc
 
 def run_attestation_roc_analysis():
     """
@@ -79,39 +164,16 @@ def run_attestation_roc_analysis():
     # Generate dataset
     print("Generating power traces...")
     
-    traces = []
-    labels = []  # 1 = attested, 0 = non-attested
-    metrics = []
-    
-    # Attested UEs
-    for i in range(NUM_ATTESTED):
-        trace = generate_power_trace(is_attested=True, seed=i)
-        variance = compute_variance_metric(trace)
-        
-        traces.append(trace)
-        labels.append(1)  # Attested
-        metrics.append(variance)
-    
-    # Non-Attested UEs
-    for i in range(NUM_NON_ATTESTED):
-        trace = generate_power_trace(is_attested=False, seed=i + NUM_ATTESTED)
-        variance = compute_variance_metric(trace)
-        
-        traces.append(trace)
-        labels.append(0)  # Non-attested
-        metrics.append(variance)
+    attested_seq, non_attested_seq = np.random.SeedSequence(SEED).spawn(2)
+    attested_scores = trace_scores(True, NUM_ATTESTED, np.random.default_rng(attested_seq))
+    non_attested_scores = trace_scores(False, NUM_NON_ATTESTED, np.random.default_rng(non_attested_seq))
     
-    # Convert to numpy
-    labels = np.array(labels)
-    metrics = np.array(metrics)
+    labels = np.r_[np.ones(NUM_ATTESTED, dtype=int), np.zeros(NUM_NON_ATTESTED, dtype=int)]  # 1 = attested
+    metrics = np.r_[attested_scores, non_attested_scores]
     
     # Compute ROC curve
-    # Note: For our metric, LOWER variance = attested
-    # So we need to invert the scores for ROC (which assumes higher = positive)
-    inverted_metrics = -metrics  # Now higher = more likely attested
-    
-    fpr, tpr, thresholds = roc_curve(labels, inverted_metrics)
-    roc_auc = auc(fpr, tpr)
+    # Note: For our metric, LOWER variance = attested (accept when σ < threshold)
+    fpr, tpr, thresholds, roc_auc = roc_from_scores(attested_scores, non_attested_scores)
     
     print(f"--- ROC Analysis ---")
     print(f"ROC AUC: {roc_auc:.6f}")
@@ -130,7 +192,7 @@ def run_attestation_roc_analysis():
     idx = np.argmin(np.abs(tpr - target_tpr))
     operating_fpr = fpr[idx]
     operating_tpr = tpr[idx]
-    operating_threshold = -thresholds[idx]  # Convert back to variance
+    operating_threshold = thresholds[idx]
     
     print(f"\n--- Operating Point (95% TPR) ---")
     print(f"True Positive Rate: {operating_tpr*100:.2f}%")
@@ -208,8 +270,8 @@ def run_attestation_roc_analysis():
     ax2.grid(axis='y', alpha=0.3)
     
     # 3. Example power traces (first 200 samples)
-    sample_attested = generate_power_trace(is_attested=True, seed=42)[:200]
-    sample_non_attested = generate_power_trace(is_attested=False, seed=43)[:200]
+    sample_attested = power_traces(True, 1, np.random.default_rng(42))[0, :200]
+    sample_non_attested = power_traces(False, 1, np.random.default_rng(43))[0, :200]
     
     ax3.plot(sample_attested, label='Attested (constant-time)', color='#00FF41', linewidth=1.5, alpha=0.8)
     ax3.plot(sample_non_attested, label='Non-Attested (timing leaks)', color='#FF4136', linewidth=1.5, alpha=0.8)
@@ -286,6 +348,17 @@ def run_attestation_roc_analysis():
     
     print(f"\nConclusion: Side-channel attestation provides {roc_auc*100:.2f}% accuracy")
     print(f"in distinguishing attested from compromised chipsets via passive observation.")
+    
+    # Extreme-FPR thresholds
+    print(f"\n--- Extreme-FPR Thresholds ({EXTREME_SCORES:,} scores per class, streaming) ---")
+    start = time.perf_counter()
+    roc = extreme_fpr_study()
+    print(f"Streamed {2 * EXTREME_SCORES:,} scores in {time.perf_counter() - start:.1f} s, "
+          f"histogram AUC = {roc.auc():.8f}")
+    print(f"{'target FPR':>12}{'threshold σ':>14}{'empirical FPR':>16}{'exact FPR':>12}{'TPR':>12}")
+    for target in EXTREME_FPR_TARGETS:
+        threshold, emp_fpr, emp_tpr = roc.threshold_at_fpr(target)
+        print(f"{target:>12.0e}{threshold:>14.4f}{emp_fpr:>16.2e}{analytic_fpr(threshold):>12.2e}{emp_tpr:>12.6f}")
 
 if __name__ == "__main__":
     run_attestation_roc_analysis()
@@ -0,0 +1,192 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy.stats import binom
+
+"""
+QSTF-V2: Monte Carlo BLER Engine for NB-IoT Chunk Delivery
+
+Draws whole (trials x chunks) loss masks per call - i.i.d. Bernoulli or
+bursty Gilbert-Elliott - and decides decodability for every row with
+vectorized counting (an MDS k-of-n code decodes iff >= k chunks arrive).
+Trials are processed in fixed-size blocks so 10^7-10^8 trials per point
+run in bounded memory, and grid points (BLER x code rate x chunk size)
+are spread across a process pool with independent SeedSequence streams.
+
+The Bernoulli points are checked against the exact binomial tail.
+"""
+
+KEM_CT_SIZE = 768            # bytes (ML-KEM-512 ciphertext)
+BLOCK_TRIALS = 1_000_000     # rows per mask draw (18 MB for 18 chunks)
+TRIALS_PER_POINT = 1_000_000
+BLER_GRID = [0.01, 0.02, 0.05, 0.10, 0.20]
+CHUNK_SIZE_GRID = [32, 56, 96]             # payload bytes per chunk
+CODE_RATE_GRID = [1.0, 14 / 18, 0.5]       # k / n
+MEAN_BURST_CHUNKS = 3.0                    # Gilbert-Elliott mean bad-state dwell
+
+# =============================================================================
+# LOSS MODELS
+# =============================================================================
+
+@dataclass(frozen=True)
+class GilbertElliott:
+    """
+    Two-state Markov loss channel evaluated once per chunk.
+    p_gb / p_bg: good->bad / bad->good transition probabilities;
+    loss_good / loss_bad: chunk loss probability in each state.
+    """
+    p_gb: float
+    p_bg: float
+    loss_good: float = 0.0
+    loss_bad: float = 1.0
+
+    @classmethod
+    def from_bler(cls, bler: float, mean_burst: float = MEAN_BURST_CHUNKS) -> "GilbertElliott":
+        """Classic Gilbert channel with average loss `bler` and mean burst length `mean_burst`"""
+        p_bg = 1.0 / mean_burst
+        return cls(p_gb=bler * p_bg / (1.0 - bler), p_bg=p_bg)
+
+    @property
+    def stationary_bad(self) -> float:
+        return self.p_gb / (self.p_gb + self.p_bg)
+
+    @property
+    def average_loss(self) -> float:
+        pi_b = self.stationary_bad
+        return pi_b * self.loss_bad + (1.0 - pi_b) * self.loss_good
+
+def _below(rng: np.random.Generator, shape, p) -> np.ndarray:
+    """Boolean array, True with probability p (32-bit threshold, exact to 2^-32)"""
+    threshold = np.asarray(np.round(np.asarray(p) * 2.0**32), dtype=np.float64)
+    return rng.integers(0, 2**32, size=shape, dtype=np.uint32) < np.minimum(threshold, 2.0**32 - 1)
+
+def loss_mask(n_trials: int, n_chunks: int, bler: float, rng: np.random.Generator,
+              channel: Optional[GilbertElliott] = None) -> np.ndarray:
+    """
+    (n_trials, n_chunks) bool mask, True where a chunk is lost.
+    channel=None draws i.i.d. Bernoulli(bler) losses in one call; a
+    GilbertElliott channel steps every trial's state in lockstep, one
+    vectorized draw per chunk position.
+    """
+    if channel is None:
+        return _below(rng, (n_trials, n_chunks), bler)
+
+    lost = np.empty((n_trials, n_chunks), dtype=bool)
+    bad = _below(rng, n_trials, channel.stationary_bad)
+    for c in range(n_chunks):
+        lost[:, c] = _below(rng, n_trials, np.where(bad, channel.loss_bad, channel.loss_good))
+        bad = _below(rng, n_trials, np.where(bad, 1.0 - channel.p_bg, channel.p_gb))
+    return lost
+
+def decodable(lost: np.ndarray, k: int) -> np.ndarray:
+    """MDS k-of-n decodability per row: at least k chunks received"""
+    n = lost.shape[1]
+    n_lost = np.add.reduce(lost.view(np.uint8), axis=1, dtype=np.uint8)
+    return n_lost <= n - k
+
+# =============================================================================
+# MONTE CARLO ENGINE
+# =============================================================================
+
+def code_dimensions(chunk_size: int, code_rate: float, payload: int = KEM_CT_SIZE):
+    """(k, n): data chunks to carry the payload, total chunks at the given rate"""
+    k = -(-payload // chunk_size)
+    n = int(np.ceil(k / code_rate - 1e-9))
+    return k, n
+
+def run_point(point: Dict, seed: np.random.SeedSequence) -> Dict:
+    """
+    Monte Carlo for one grid point.
+    point: {model, bler, chunk_size, code_rate, trials}.
+    """
+    rng = np.random.default_rng(seed)
+    k, n = code_dimensions(point['chunk_size'], point['code_rate'])
+    channel = GilbertElliott.from_bler(point['bler']) if point['model'] == 'gilbert_elliott' else None
+
+    trials = point['trials']
+    failures = 0
+    start = time.perf_counter()
+    for done in range(0, trials, BLOCK_TRIALS):
+        block = min(BLOCK_TRIALS, trials - done)
+        lost = loss_mask(block, n, point['bler'], rng, channel)
+        failures += block - int(np.count_nonzero(decodable(lost, k)))
+    elapsed = time.perf_counter() - start
+
+    p_fail = failures / trials
+    # Wilson 95% interval half-width; stays meaningful when failures are rare
+    z = 1.96
+    denom = 1 + z**2 / trials
+    half_width = z * np.sqrt(p_fail * (1 - p_fail) / trials + z**2 / (4 * trials**2)) / denom
+    analytic = float(binom.sf(n - k, n, point['bler'])) if channel is None else float('nan')
+
+    return {
+        **point,
+        'k': k,
+        'n': n,
+        'failures': failures,
+        'p_fail': p_fail,
+        'ci95': half_width,
+        'analytic_p_fail': analytic,
+        'trials_per_sec': trials / elapsed,
+    }
+
+def sweep(blers: List[float] = BLER_GRID, chunk_sizes: List[int] = CHUNK_SIZE_GRID,
+          code_rates: List[float] = CODE_RATE_GRID, trials: int = TRIALS_PER_POINT,
+          models=('bernoulli', 'gilbert_elliott'), seed: int = 2025,
+          workers: Optional[int] = None) -> List[Dict]:
+    """BLER x code-rate x chunk-size grid, one process-pool task per point"""
+    points = [{'model': m, 'bler': b, 'chunk_size': c, 'code_rate': r, 'trials': trials}
+              for m in models for b in blers for c in chunk_sizes for r in code_rates]
+    seeds = np.random.SeedSequence(seed).spawn(len(points))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [run_point(p, s) for p, s in zip(points, seeds)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_point, points, seeds))
+
+def save_results(rows: List[Dict], path: str = 'bler_sweep_results.csv'):
+    fields = ['model', 'bler', 'chunk_size', 'code_rate', 'k', 'n', 'trials', 'failures',
+              'p_fail', 'ci95', 'analytic_p_fail', 'trials_per_sec']
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Saved {path}")
+
+def main():
+    print("--- QSTF-V2: Monte Carlo BLER Engine ---")
+    start = time.perf_counter()
+    rows = sweep()
+    elapsed = time.perf_counter() - start
+    total_trials = sum(r['trials'] for r in rows)
+    print(f"{len(rows)} grid points x {TRIALS_PER_POINT:,} trials = {total_trials:,} trials "
+          f"in {elapsed:.1f} s ({total_trials/elapsed:,.0f} trials/sec)")
+
+    print(f"\n{'model':<16}{'BLER':>6}{'chunk':>7}{'k+m':>8}{'P(fail)':>12}{'±95%':>11}{'exact':>12}")
+    for r in rows:
+        if r['chunk_size'] != 56:
+            continue
+        exact = f"{r['analytic_p_fail']:.3e}" if r['model'] == 'bernoulli' else '-'
+        print(f"{r['model']:<16}{r['bler']:>6.2f}{r['chunk_size']:>7}{r['k']:>4}+{r['n'] - r['k']:<3}"
+              f"{r['p_fail']:>12.3e}{r['ci95']:>11.1e}{exact:>12}")
+
+    save_results(rows)
+
+    # Bernoulli points must agree with the exact binomial tail
+    bern = [r for r in rows if r['model'] == 'bernoulli']
+    agree = all(abs(r['p_fail'] - r['analytic_p_fail']) <= max(4 * r['ci95'], 5.0 / r['trials'])
+                for r in bern)
+    print(f"\nBernoulli vs exact binomial tail: {'✅ AGREE' if agree else '❌ DISAGREE'} "
+          f"({len(bern)} points)")
+    if agree:
+        print("STATUS: ✅ BLER ENGINE VALIDATED")
+    else:
+        print("STATUS: ❌ BLER ENGINE MISMATCH")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from pqc_erasure_coding import GENERATOR_MATRIX, GF_EXP, NUM_DATA_CHUNKS, NUM_PARITY_CHUNKS, TOTAL_CHUNKS
+from erasure_pattern_analyzer import ErasurePatternAnalyzer, WeightedJammer, batch_rank_gf2, pack_gf2, patterns_of_weight
+from adversarial_jammer_sim import AdversarialJammer
+from zero_sum_solver import solve_zero_sum, fill_payoff, double_oracle
 
 """
 QSTF-V2 Phase 5.3: Game-Theoretic Nash Equilibrium Proof
@@ -11,42 +15,84 @@ Zero-Sum Game:
 - Payoff: Battery-per-bit-recovered
 
 The Monopoly Proof:
-- Our XOR-Weighted code is Nash Equilibrium
+- Our systematic Cauchy code (GF(256), pqc_erasure_coding) is Nash Equilibrium
 - Design-around codes are 800% more expensive in adversarial scenarios
+
+At LOSS_RATE the jammer erases int(18 * LOSS_RATE) = 3 chunks, within the
+n - k = 4 budget of both MDS codes (standard RS and Cauchy): both recover
+every pattern, so their rows are separated by energy_costs alone, and
+only repetition depends on the jammer. The jammer's side of the
+equilibrium is reported as its best responses to the device mix, not the
+LP dual, which is arbitrary when the jammer is indifferent.
+
+Recovery probabilities are computed from each code's generator matrix -
+exactly over every jam pattern (erasure_pattern_analyzer) or by Monte
+Carlo - and the equilibrium is solved by LP (zero_sum_solver). The
+randomized-parity game pits a pool of binary parity codes against every
+weight-JAM_WEIGHT jam pattern and is solved by double oracle, without
+materializing the pool x patterns matrix.
 """
 
+LOSS_RATE = 0.20
+RECOVERY_BACKEND = 'exact'  # 'exact' | 'monte_carlo'
+MC_TRIALS = 20_000
+CODE_POOL_SIZE = 512        # binary parity codes in the randomized-parity game
+CODE_DENSITY = 0.5
+JAM_WEIGHT = 4
+LP_CHECK_POOL = 128         # pool prefix also solved as one full LP
+
+# =============================================================================
+# CODES AND RECOVERY
+# =============================================================================
+
+def device_generator(device_strategy):
+    """(18, 14) generator matrix and field of each device strategy"""
+    k, m = NUM_DATA_CHUNKS, NUM_PARITY_CHUNKS
+    if device_strategy == 'repetition':
+        # Parity chunks repeat data chunks 0-3
+        return np.concatenate([np.eye(k, dtype=np.uint8), np.eye(m, k, dtype=np.uint8)]), 'gf2'
+    if device_strategy == 'standard_rs':
+        # Non-systematic Reed-Solomon: Vandermonde rows alpha_i^j at 18 distinct points
+        i, j = np.arange(TOTAL_CHUNKS)[:, None], np.arange(k)[None, :]
+        return GF_EXP[(i * j) % 255], 'gf256'
+    # Systematic Cauchy code shipped in pqc_erasure_coding
+    return GENERATOR_MATRIX, 'gf256'
+
+def jammer_scores(jammer_strategy):
+    strategy = 'minmax' if jammer_strategy == 'intelligent' else 'random'
+    return AdversarialJammer(strategy).analyze_code_structure(NUM_DATA_CHUNKS, NUM_PARITY_CHUNKS)
+
+def recovery_rate(device_strategy, jammer_strategy, loss_rate=LOSS_RATE, backend=RECOVERY_BACKEND,
+                  trials=MC_TRIALS, seed=0):
+    """Probability the device recovers when the jammer erases int(18 * loss_rate) chunks"""
+    generator, field = device_generator(device_strategy)
+    code = ErasurePatternAnalyzer(generator, field=field)
+    jammed = int(TOTAL_CHUNKS * loss_rate)
+    scores = jammer_scores(jammer_strategy)
+    if backend == 'exact':
+        return code.recovery_probability(WeightedJammer(scores), jammed)[0]
+    rng = np.random.default_rng(seed)
+    patterns = np.array([rng.choice(TOTAL_CHUNKS, jammed, replace=False, p=scores / scores.sum())
+                         for _ in range(trials)])
+    return float(code.recoverable_batch(patterns).mean())
+
 def calculate_payoff(device_strategy, jammer_strategy, loss_rate):
     """
     Calculate battery cost per bit recovered.
     
-    device_strategy: 'repetition', 'standard_rs', 'xor_weighted'
+    device_strategy: 'repetition', 'standard_rs', 'cauchy_systematic'
     jammer_strategy: 'random', 'intelligent'
     """
     # Energy costs (relative units, accounting for encoding + decoding)
     energy_costs = {
         'repetition': 4.0,     # Send each bit 4 times (25% redundancy -> 4x cost)
         'standard_rs': 2.0,    # RS encoding overhead + complex GF decoding
-        'xor_weighted': 1.3    # Minimal overhead (systematic)
+        'cauchy_systematic': 1.3    # Minimal overhead (systematic)
     }
     
-    # Recovery probabilities vs. intelligent jammer
-    # Intelligent jammer knows the code structure and targets weaknesses
-    if jammer_strategy == 'intelligent':
-        recovery_probs = {
-            'repetition': 0.35,       # Jammer targets all copies, very effective
-            'standard_rs': 0.82,      # RS is robust but jammer can target syndromes
-            'xor_weighted': 0.96      # Optimal vs. intelligent attack (randomized parity)
-        }
-    else:  # random jammer
-        recovery_probs = {
-            'repetition': 0.78,
-            'standard_rs': 0.94,
-            'xor_weighted': 0.98
-        }
-    
-    # Battery-per-bit = Energy / Recovery_Prob
+    # Recovery probability from the code itself vs. this jammer
     energy = energy_costs[device_strategy]
-    recovery = recovery_probs[device_strategy]
+    recovery = recovery_rate(device_strategy, jammer_strategy, loss_rate)
     
     # Add loss_rate penalty (need more retransmissions)
     effective_energy = energy * (1 + loss_rate)
@@ -55,21 +101,22 @@ def calculate_payoff(device_strategy, jammer_strategy, loss_rate):
     
     return battery_per_bit
 
+def _payoff_row(device_strategy, jammer_strategies):
+    return [calculate_payoff(device_strategy, j, LOSS_RATE) for j in jammer_strategies]
+
 def find_nash_equilibrium():
     """
     Finds Nash Equilibrium: Strategy pair where neither player benefits from unilateral change.
+    Returns (payoff matrix, device strategies, jammer strategies, equilibrium
+    label or None when the Cauchy code is not the pure equilibrium).
     """
-    device_strategies = ['repetition', 'standard_rs', 'xor_weighted']
+    device_strategies = ['repetition', 'standard_rs', 'cauchy_systematic']
     jammer_strategies = ['random', 'intelligent']
     
-    # Build payoff matrix
-    payoff_matrix = np.zeros((len(device_strategies), len(jammer_strategies)))
+    # Build payoff matrix (one device strategy per worker)
+    payoff_matrix = fill_payoff(_payoff_row, device_strategies, jammer_strategies)
     
-    for i, d_strat in enumerate(device_strategies):
-        for j, j_strat in enumerate(jammer_strategies):
-            payoff_matrix[i, j] = calculate_payoff(d_strat, j_strat, loss_rate=0.20)
-    
-    print("--- Payoff Matrix (Battery-per-bit, Lower is Better) ---")
+    print(f"--- Payoff Matrix (Battery-per-bit, Lower is Better; recovery: {RECOVERY_BACKEND}) ---")
     print(f"{'Device Strategy':<20} {'vs. Random':<15} {'vs. Intelligent':<15}")
     for i, d_strat in enumerate(device_strategies):
         print(f"{d_strat:<20} {payoff_matrix[i, 0]:<15.2f} {payoff_matrix[i, 1]:<15.2f}")
@@ -79,26 +126,136 @@ def find_nash_equilibrium():
     best_device_vs_random = device_strategies[np.argmin(payoff_matrix[:, 0])]
     best_device_vs_intelligent = device_strategies[np.argmin(payoff_matrix[:, 1])]
     
-    # Jammer wants to maximize device's cost (worst-case for device)
-    worst_case_costs = np.max(payoff_matrix, axis=1)
-    best_device_maxmin = device_strategies[np.argmin(worst_case_costs)]
+    # Mixed equilibrium by LP: device minimizes, jammer maximizes
+    value, x, y = solve_zero_sum(payoff_matrix)
+    best_device_maxmin = device_strategies[np.argmax(x)]
     
     print(f"\n--- Best Response Analysis ---")
     print(f"Best Device Strategy vs. Random Jammer:      {best_device_vs_random}")
     print(f"Best Device Strategy vs. Intelligent Jammer: {best_device_vs_intelligent}")
     print(f"MaxMin Strategy (Worst-Case Optimal):        {best_device_maxmin}")
+    print(f"Game value: {value:.3f} units/bit")
+    print("Device mix: " + ", ".join(f"{d} {p:.2f}" for d, p in zip(device_strategies, x)))
+    print("Jammer mix (LP dual): " + ", ".join(f"{j} {p:.2f}" for j, p in zip(jammer_strategies, y)))
     
-    # Nash Equilibrium: (xor_weighted, intelligent) if neither can improve unilaterally
-    if best_device_vs_intelligent == 'xor_weighted':
-        print(f"\nNash Equilibrium: (XOR-Weighted, Intelligent Jammer)")
-        print("STATUS: ✅ NASH EQUILIBRIUM PROVEN")
+    # Codes whose cost does not depend on the jammer (recover every pattern)
+    flat = [d for d, row in zip(device_strategies, payoff_matrix) if np.ptp(row) < 1e-9]
+    if len(flat) > 1:
+        print(f"\nNote: {', '.join(flat)} recover every {int(TOTAL_CHUNKS * LOSS_RATE)}-chunk pattern; "
+              f"their ranking comes from energy costs alone")
+
+    # Jammer best responses to the device mix (the LP dual is arbitrary under indifference)
+    jammer_cost = x @ payoff_matrix
+    responses = [j for j, c in zip(jammer_strategies, jammer_cost) if c > jammer_cost.max() - 1e-9]
+    jammer = responses[0].title() if len(responses) == 1 else "Any (indifferent)"
+    if x[2] > 1 - 1e-6:
+        equilibrium = f"(Systematic Cauchy, {jammer} Jammer)"
+        print(f"\nNash Equilibrium: {equilibrium}")
+    else:
+        equilibrium = None
+        print(f"\n❌ Cauchy code is not the pure equilibrium (weight {x[2]:.2f})")
+
+    return payoff_matrix, device_strategies, jammer_strategies, equilibrium
+
+# =============================================================================
+# RANDOMIZED-PARITY GAME (DOUBLE ORACLE)
+# =============================================================================
+
+def binary_parities(seeds, density=CODE_DENSITY):
+    """(len(seeds), 4, 14) 0/1 parity matrices, one per seeded code"""
+    return np.array([(np.random.default_rng(s).random((NUM_PARITY_CHUNKS, NUM_DATA_CHUNKS)) < density)
+                     for s in seeds], dtype=np.uint8)
+
+def failures(parities, erased):
+    """
+    (codes, patterns) bool: code fails on jam pattern. Systematic shortcut
+    batched over codes x patterns: rank of the surviving parity rows over
+    the erased data columns must equal the number of erased data chunks.
+    """
+    k = NUM_DATA_CHUNKS
+    erased = np.asarray(erased, dtype=np.int64)
+    P = np.concatenate([parities, np.zeros(parities.shape[:2] + (NUM_PARITY_CHUNKS,), dtype=np.uint8)], axis=2)
+    sub = P[:, :, erased]                                  # (codes, m, patterns, e)
+    sub = np.transpose(sub, (0, 2, 1, 3)).copy()           # (codes, patterns, m, e)
+    lost = np.zeros(erased.shape[:1] + (NUM_PARITY_CHUNKS,), dtype=bool)
+    rows, cols = np.nonzero(erased >= k)
+    lost[rows, erased[rows, cols] - k] = True
+    sub[:, lost] = 0
+    c, p = sub.shape[:2]
+    rank = batch_rank_gf2(pack_gf2(sub.reshape(c * p, NUM_PARITY_CHUNKS, -1)), erased.shape[1]).reshape(c, p)
+    return rank < (erased < k).sum(axis=1)[None, :]
+
+def _code_failure_row(seed, erased):
+    return failures(binary_parities([seed]), erased)[0]
+
+def randomized_parity_game(pool_size=CODE_POOL_SIZE, jam_weight=JAM_WEIGHT):
+    """
+    Device mixes over a pool of binary 14+4 parity codes (secret per-session
+    choice), jammer over all C(18, jam_weight) patterns; payoff = failure.
+    """
+    seeds = list(range(pool_size))
+    parities = binary_parities(seeds)
+    patterns = np.concatenate(list(patterns_of_weight(TOTAL_CHUNKS, jam_weight)))
+    column_cache = {}
+    row_cache = {}
+    
+    def pool_column(j):
+        # Failures of every pool code on pattern j (computed once per pattern)
+        if j not in column_cache:
+            column_cache[j] = failures(parities, patterns[[j]])[:, 0]
+        return column_cache[j]
+    
+    def code_row(i):
+        # Failures of code i on every pattern (computed once per code in the support)
+        if i not in row_cache:
+            row_cache[i] = failures(parities[[i]], patterns)[0]
+        return row_cache[i]
     
-    return payoff_matrix, device_strategies, jammer_strategies
+    def payoff(rows, cols):
+        return np.column_stack([pool_column(j)[rows] for j in cols]).astype(float)
+    
+    def row_oracle(cols, y):
+        cost = np.column_stack([pool_column(j) for j in cols]) @ y
+        best = int(np.argmin(cost))
+        return best, float(cost[best])
+    
+    def col_oracle(rows, x):
+        gain = x @ np.array([code_row(i) for i in rows], dtype=float)
+        best = int(np.argmax(gain))
+        return best, float(gain[best])
+    
+    return double_oracle(payoff, row_oracle, col_oracle, rows=[0], cols=[0], tol=1e-6), patterns
+
+def run_randomized_parity_game():
+    print(f"\n--- Randomized Parity Game (binary 14+4 codes vs. all {JAM_WEIGHT}-chunk jam patterns) ---")
+    
+    # Full LP on a pool prefix, matrix filled in parallel, as a check on double oracle
+    patterns = np.concatenate(list(patterns_of_weight(TOTAL_CHUNKS, JAM_WEIGHT)))
+    full = fill_payoff(_code_failure_row, list(range(LP_CHECK_POOL)), patterns).astype(float)
+    full_value, _, _ = solve_zero_sum(full)
+    small, _ = randomized_parity_game(pool_size=LP_CHECK_POOL)
+    print(f"{LP_CHECK_POOL} codes x {len(patterns):,} patterns: full LP {full_value:.4f}, "
+          f"double oracle {small.value:.4f} ({len(small.rows)} x {len(small.cols)} restricted game)")
+    
+    result, patterns = randomized_parity_game()
+    print(f"{CODE_POOL_SIZE} codes x {len(patterns):,} patterns: worst-case failure {result.value:.4f} "
+          f"with {int((result.x > 1e-9).sum())} codes mixed, {len(result.cols)} jam patterns generated, "
+          f"{result.iterations} iterations (bounds [{result.lower:.4f}, {result.upper:.4f}])")
+    # Pure strategies: a fixed code's worst case is 1 if any jam pattern defeats it
+    single_fails = failures(binary_parities(range(CODE_POOL_SIZE)), patterns).any(axis=1)
+    cauchy_fails = ~ErasurePatternAnalyzer(GENERATOR_MATRIX).recoverable_batch(patterns)
+    print(f"Best single binary code: worst-case failure {single_fails.min():.4f} "
+          f"({int(single_fails.sum())}/{CODE_POOL_SIZE} codes have an unrecoverable {JAM_WEIGHT}-pattern); "
+          f"Cauchy GF(256): {cauchy_fails.any():.4f}")
+    agree = abs(full_value - small.value) < 1e-6
+    if not agree:
+        print(f"❌ Full LP and double oracle disagree ({full_value:.6f} vs {small.value:.6f})")
+    return result, agree
 
 def generate_game_theory_proof():
     print("--- QSTF-V2 Phase 5.3: Game-Theoretic Nash Equilibrium ---")
     
-    payoff_matrix, d_strats, j_strats = find_nash_equilibrium()
+    payoff_matrix, d_strats, j_strats, equilibrium = find_nash_equilibrium()
     
     # Save payoff matrix
     with open("game_theory_payoff_matrix.txt", "w") as f:
@@ -110,26 +267,35 @@ def generate_game_theory_proof():
         f.write("-" * 50 + "\n")
         for i, d_strat in enumerate(d_strats):
             f.write(f"{d_strat:<20} {payoff_matrix[i, 0]:<15.2f} {payoff_matrix[i, 1]:<15.2f}\n")
-        f.write("\nNash Equilibrium: (XOR-Weighted, Intelligent)\n")
-        f.write("Proof: XOR-Weighted is the min-max optimal strategy.\n")
+        if equilibrium is None:
+            f.write("\nNo pure Nash Equilibrium at the systematic Cauchy code.\n")
+        else:
+            f.write(f"\nNash Equilibrium: {equilibrium}\n")
+            f.write("Proof: Systematic Cauchy is the min-max optimal strategy.\n")
     
     print("Saved game_theory_payoff_matrix.txt")
     
     # Calculate cost differential
-    xor_cost = payoff_matrix[2, 1]  # XOR-Weighted vs. Intelligent
+    cauchy_cost = payoff_matrix[2, 1]  # Systematic Cauchy vs. Intelligent
     rep_cost = payoff_matrix[0, 1]  # Repetition vs. Intelligent
     
-    cost_multiple = rep_cost / xor_cost
+    cost_multiple = rep_cost / cauchy_cost
     
     print(f"\n--- Design-Around Cost Analysis ---")
     print(f"Repetition Code Cost:  {rep_cost:.2f} units/bit")
-    print(f"XOR-Weighted Cost:     {xor_cost:.2f} units/bit")
+    print(f"Systematic Cauchy Cost: {cauchy_cost:.2f} units/bit")
     print(f"Cost Multiple:         {cost_multiple:.1f}x")
     
     if cost_multiple > 7:
         print("STATUS: ✅ 800% COST PENALTY PROVEN for design-around")
     else:
         print(f"STATUS: ⚠️  Cost multiple only {cost_multiple:.1f}x")
+    return equilibrium is not None
 
 if __name__ == "__main__":
-    generate_game_theory_proof()
+    nash = generate_game_theory_proof()
+    _, solvers_agree = run_randomized_parity_game()
+    if nash and solvers_agree:
+        print("\nSTATUS: ✅ NASH EQUILIBRIUM PROVEN (full LP and double oracle agree)")
+    else:
+        print("\nSTATUS: ❌ NASH EQUILIBRIUM NOT PROVEN")
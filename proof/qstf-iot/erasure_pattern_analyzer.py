@@ -0,0 +1,295 @@
+import time
+from itertools import combinations, islice
+from math import comb
+import numpy as np
+from pqc_erasure_coding import GF_MUL, GF_INV, cauchy_parity_matrix, GENERATOR_MATRIX, NUM_DATA_CHUNKS
+
+"""
+QSTF-V2: Exact Erasure-Pattern Analyzer
+
+Decides recoverability from the code's generator matrix G (n x k, over
+GF(2) or GF(256)): an erasure pattern E is recoverable iff the surviving
+rows G[~E] have rank k. Patterns of each weight e are enumerated as index
+arrays (and addressed as n-bit masks) and ranked in batches:
+
+- systematic codes G = [I; P]: rank(G[~E]) = k - |D| + rank(P[Q, D]) with
+  D the erased data chunks and Q the surviving parity rows, so only an
+  (m x e) submatrix is eliminated per pattern
+- GF(256): batched Gauss-Jordan over all patterns at once (product table)
+- GF(2): rows packed into uint64 words, elimination is XOR of whole rows
+
+Weights with fewer than k survivors are unrecoverable by counting. Weights
+with more than MAX_PATTERNS patterns are left open unless the code is
+declared MDS (e.g. Cauchy parity, where every square submatrix of P is
+nonsingular); i.i.d. results then come back as exact [lower, upper]
+bounds. Any jammer distribution over fixed-weight patterns can be scored
+exactly via recovery_probability(); WeightedJammer reproduces
+np.random.choice(..., replace=False, p=scores) pattern probabilities.
+"""
+
+MAX_PATTERNS = 2_000_000   # per weight
+BATCH = 100_000            # patterns ranked per elimination pass
+
+# =============================================================================
+# BATCHED RANK
+# =============================================================================
+
+def batch_rank_gf256(mats):
+    """Ranks of a (B, r, c) stack of GF(256) matrices"""
+    mats = np.array(mats, dtype=np.uint8)
+    B, r, c = mats.shape
+    rank = np.zeros(B, dtype=np.int32)
+    used = np.zeros((B, r), dtype=bool)
+    ar = np.arange(B)
+    for col in range(c):
+        cand = (mats[:, :, col] != 0) & ~used
+        has = cand.any(axis=1)
+        piv = cand.argmax(axis=1)
+        pivrow = mats[ar, piv]
+        pivrow = GF_MUL[GF_INV[pivrow[:, col]][:, None], pivrow]
+        factors = mats[:, :, col].copy()
+        factors[ar, piv] = 0
+        factors[~has] = 0
+        mats ^= GF_MUL[factors[:, :, None], pivrow[:, None, :]]
+        used[ar[has], piv[has]] = True
+        rank += has
+    return rank
+
+def pack_gf2(mats):
+    """(B, r, c <= 64) 0/1 matrices -> (B, r) uint64 rows (bit j = column j)"""
+    mats = np.asarray(mats, dtype=np.uint64)
+    if mats.shape[-1] > 64:
+        raise ValueError("GF(2) rows wider than 64 columns")
+    weights = np.uint64(1) << np.arange(mats.shape[-1], dtype=np.uint64)
+    return (mats * weights).sum(axis=-1, dtype=np.uint64)
+
+def batch_rank_gf2(rows, c):
+    """Ranks of a (B, r) stack of bit-packed GF(2) matrices with c columns"""
+    rows = np.array(rows, dtype=np.uint64)
+    B, r = rows.shape
+    rank = np.zeros(B, dtype=np.int32)
+    used = np.zeros((B, r), dtype=bool)
+    ar = np.arange(B)
+    zero = np.uint64(0)
+    for col in range(c):
+        bit = np.uint64(1) << np.uint64(col)
+        hit = (rows & bit) != zero
+        cand = hit & ~used
+        has = cand.any(axis=1)
+        piv = cand.argmax(axis=1)
+        pivrow = rows[ar, piv]
+        hit[ar, piv] = False
+        hit[~has] = False
+        rows ^= np.where(hit, pivrow[:, None], zero)
+        used[ar[has], piv[has]] = True
+        rank += has
+    return rank
+
+# =============================================================================
+# ANALYZER
+# =============================================================================
+
+def patterns_of_weight(n, e, batch=BATCH):
+    """Yields (B, e) int arrays of erased indices covering all C(n, e) patterns"""
+    it = combinations(range(n), e)
+    while True:
+        block = list(islice(it, batch))
+        if not block:
+            return
+        yield np.array(block, dtype=np.int64).reshape(len(block), e)
+
+def pattern_masks(erased):
+    """(B, e) erased indices -> list of n-bit Python int masks"""
+    return [sum(1 << i for i in row) for row in erased.tolist()]
+
+class ErasurePatternAnalyzer:
+    """Exact recoverability of erasure patterns for a linear (n, k) code"""
+
+    def __init__(self, generator, field='gf256', mds=False, max_patterns=MAX_PATTERNS):
+        self.G = np.asarray(generator, dtype=np.uint8)
+        self.n, self.k = self.G.shape
+        self.field = field
+        self.mds = mds
+        self.max_patterns = max_patterns
+        self.systematic = np.array_equal(self.G[:self.k], np.eye(self.k, dtype=np.uint8))
+        if self.systematic:
+            # Parity rows over all n columns; parity columns stay zero
+            self._parity = np.zeros((self.n - self.k, self.n), dtype=np.uint8)
+            self._parity[:, :self.k] = self.G[self.k:]
+        self._table = {}
+        self._memo = {}
+
+    def _rank(self, mats):
+        if self.field == 'gf2':
+            return batch_rank_gf2(pack_gf2(mats), mats.shape[-1])
+        return batch_rank_gf256(mats)
+
+    def recoverable_batch(self, erased):
+        """(B, e) erased chunk indices -> (B,) bool"""
+        erased = np.asarray(erased, dtype=np.int64)
+        B, e = erased.shape
+        if self.n - e < self.k:
+            return np.zeros(B, dtype=bool)
+        if e == 0:
+            return np.ones(B, dtype=bool)
+        if self.systematic:
+            m = self.n - self.k
+            sub = np.transpose(self._parity[:, erased], (1, 0, 2))             # (B, m, e)
+            lost_parity = np.zeros((B, m), dtype=bool)
+            p_rows, p_cols = np.nonzero(erased >= self.k)
+            lost_parity[p_rows, erased[p_rows, p_cols] - self.k] = True
+            sub[lost_parity] = 0
+            return self._rank(sub) == (erased < self.k).sum(axis=1)
+        keep = np.ones((B, self.n), dtype=bool)
+        keep[np.repeat(np.arange(B), e), erased.ravel()] = False
+        survivors = np.nonzero(keep)[1].reshape(B, self.n - e)
+        return self._rank(self.G[survivors]) == self.k
+
+    def recoverable(self, mask):
+        """Single pattern as an n-bit mask of erased chunks (memoized)"""
+        if mask not in self._memo:
+            erased = np.array([[i for i in range(self.n) if mask >> i & 1]], dtype=np.int64)
+            self._memo[mask] = bool(self.recoverable_batch(erased)[0])
+        return self._memo[mask]
+
+    def weight_table(self, e):
+        """
+        (patterns, recoverable patterns, first unrecoverable mask or None)
+        for erasure weight e; recoverable is None if left open. Enumerated
+        weights are memoized.
+        """
+        if e in self._table:
+            return self._table[e]
+        total = comb(self.n, e)
+        if self.n - e < self.k:
+            row = (total, 0, (1 << e) - 1)
+        elif e == 0:
+            row = (total, total, None)
+        elif total > self.max_patterns:
+            return (total, total, None) if self.mds else (total, None, None)
+        else:
+            ok, first_bad = 0, None
+            for erased in patterns_of_weight(self.n, e):
+                rec = self.recoverable_batch(erased)
+                ok += int(rec.sum())
+                if first_bad is None and not rec.all():
+                    first_bad = pattern_masks(erased[[np.argmin(rec)]])[0]
+            row = (total, ok, first_bad)
+        self._table[e] = row
+        return row
+
+    def worst_case_budget(self):
+        """
+        Largest e such that every pattern of weight <= e is recoverable
+        (minimum distance - 1), and a weight-(e+1) pattern that is not.
+        """
+        for e in range(self.n + 1):
+            total, ok, first_bad = self.weight_table(e)
+            if ok is None:
+                raise ValueError(f"Weight {e} has {total:,} patterns (> max_patterns) and the code is not declared MDS")
+            if ok < total:
+                return e - 1, first_bad
+        return self.n, None
+
+    def iid_recovery(self, p):
+        """Exact recovery probability under i.i.d. chunk loss p, as (lower, upper) bounds"""
+        lower = upper = 0.0
+        for e in range(self.n + 1):
+            total, ok, _ = self.weight_table(e)
+            mass = p ** e * (1 - p) ** (self.n - e)
+            upper += mass * (total if ok is None else ok)
+            lower += mass * (0 if ok is None else ok)
+        return lower, upper
+
+    def recovery_probability(self, pattern_prob, e):
+        """
+        Exact recovery probability against a jammer that erases exactly e
+        chunks, pattern_prob((B, e) erased) -> (B,) probabilities.
+        Returns (probability, worst case over patterns it can pick).
+        """
+        if comb(self.n, e) > self.max_patterns:
+            raise ValueError(f"C({self.n}, {e}) patterns exceed max_patterns")
+        prob, worst = 0.0, 1.0
+        for erased in patterns_of_weight(self.n, e):
+            p = pattern_prob(erased)
+            rec = self.recoverable_batch(erased)
+            prob += float(p[rec].sum())
+            if (p[~rec] > 0).any():
+                worst = 0.0
+        return prob, worst
+
+class WeightedJammer:
+    """
+    Erases e chunks by successive draws without replacement, each draw
+    proportional to score (np.random.choice(n, e, replace=False, p=...)).
+    """
+
+    def __init__(self, scores):
+        self.scores = np.asarray(scores, dtype=float)
+
+    def __call__(self, erased):
+        """Exact pattern probabilities by DP over the orderings of each pattern"""
+        w = self.scores[erased]                      # (B, e)
+        total = self.scores.sum()
+        B, e = w.shape
+        f = np.zeros((1 << e, B))
+        f[0] = 1.0
+        sub_weight = np.zeros((1 << e, B))
+        for sub in range(1, 1 << e):
+            low = (sub & -sub).bit_length() - 1
+            sub_weight[sub] = sub_weight[sub & (sub - 1)] + w[:, low]
+            for j in range(e):
+                if sub >> j & 1:
+                    prev = sub ^ (1 << j)
+                    f[sub] += f[prev] * w[:, j] / (total - sub_weight[prev])
+        return f[-1]
+
+# =============================================================================
+# DEMO
+# =============================================================================
+
+def main():
+    print("--- QSTF-V2: Exact Erasure-Pattern Analysis ---")
+    start = time.perf_counter()
+    code = ErasurePatternAnalyzer(GENERATOR_MATRIX)
+    budget, bad = code.worst_case_budget()
+    all_patterns = sum(code.weight_table(e)[0] for e in range(code.n + 1))
+    # Weights 1..n-k within max_patterns are rank-checked; the rest are decided by counting
+    ranked = sum(t for t in (code.weight_table(e)[0] for e in range(1, code.n - code.k + 1))
+                 if t <= code.max_patterns)
+    print(f"14+4 Cauchy/GF(256): {all_patterns:,} patterns classified in {time.perf_counter() - start:.2f} s "
+          f"({ranked:,} rank-checked, {all_patterns - ranked:,} decided by counting)")
+    print(f"  Worst-case jam budget: {budget} chunks (first failing pattern {bad:#07x})")
+    for p in [0.05, 0.10, 0.20]:
+        lower, _ = code.iid_recovery(p)
+        print(f"  i.i.d. loss {p:.0%}: recovery {lower:.6%}")
+
+    # Same 14+4 shape with a GF(2) parity (XOR of data chunks mod 4, plus overall XOR)
+    xor_parity = np.zeros((4, NUM_DATA_CHUNKS), dtype=np.uint8)
+    for j in range(NUM_DATA_CHUNKS):
+        xor_parity[j % 3, j] = 1
+    xor_parity[3] = 1
+    xor_code = ErasurePatternAnalyzer(np.concatenate([np.eye(NUM_DATA_CHUNKS, dtype=np.uint8), xor_parity]), field='gf2')
+    xor_budget, _ = xor_code.worst_case_budget()
+    print(f"14+4 XOR/GF(2) comparison: worst-case jam budget {xor_budget}, "
+          f"i.i.d. 10% recovery {xor_code.iid_recovery(0.10)[0]:.6%}")
+
+    start = time.perf_counter()
+    big = ErasurePatternAnalyzer(np.concatenate([np.eye(64, dtype=np.uint8), cauchy_parity_matrix(64, 16)]))
+    checked = [e for e in range(1, 17) if big.weight_table(e)[1] is not None]
+    open_lo, open_hi = big.iid_recovery(0.05)
+    print(f"64+16 Cauchy/GF(256): weights 1-{max(checked)} exhaustive "
+          f"({sum(big.weight_table(e)[0] for e in checked):,} patterns, {time.perf_counter() - start:.1f} s), "
+          f"all recoverable: {all(big.weight_table(e)[1] == big.weight_table(e)[0] for e in checked)}")
+    big.mds = True
+    mds_lo, mds_hi = big.iid_recovery(0.05)
+    print(f"  i.i.d. 5% loss: [{open_lo:.6%}, {open_hi:.6%}] unproven weights open, "
+          f"{mds_lo:.6%} with Cauchy MDS")
+
+    if budget == code.n - code.k:
+        print("STATUS: ✅ EXACT ERASURE ANALYSIS (14+4 code is MDS: any 4 erasures recoverable)")
+    else:
+        print("STATUS: ❌ CODE IS NOT MDS")
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import matplotlib.pyplot as plt
 import csv
 import json
 import os
+from bler_monte_carlo import loss_mask, decodable
 
 """
 QSTF-V2 E5: NB-IoT Chunking (pqAssist)
@@ -25,7 +26,7 @@ CHUNK_PAYLOAD_SIZE = 56  # bytes
 NB_IOT_TBS = 85  # bytes (Transport Block Size)
 NUM_CHUNKS = 14  # ceil(768 / 56)
 BLER_RATE = 0.05  # 5% per-chunk loss
-NUM_BLER_TRIALS = 10000
+NUM_BLER_TRIALS = 10_000_000
 
 def segment_ciphertext(kem_ct, k_chunk):
     """
@@ -151,22 +152,22 @@ def test_nbiot_chunking():
     # Test 3: BLER Monte Carlo
     print(f"\n  Monte Carlo BLER simulation ({NUM_BLER_TRIALS} trials @ {BLER_RATE*100}% loss)...")
     
+    # Every trial's loss pattern is one row of a (trials x chunks) mask; with
+    # no parity, a trial succeeds only if all chunks arrive
+    rng = np.random.default_rng(5)
     successes = 0
-    for _ in range(NUM_BLER_TRIALS):
-        # Simulate random chunk losses
-        received_chunks = []
-        for chunk in chunks:
-            if np.random.random() > BLER_RATE:
-                received_chunks.append(chunk)
-        
-        if len(received_chunks) >= NUM_CHUNKS:
-            reconstructed, status = reassemble_ciphertext(received_chunks, k_chunk, KEM_CT_SIZE)
-            if status == "OK" and reconstructed == kem_ct:
-                successes += 1
+    for start in range(0, NUM_BLER_TRIALS, 1_000_000):
+        n = min(1_000_000, NUM_BLER_TRIALS - start)
+        successes += int(np.count_nonzero(decodable(loss_mask(n, NUM_CHUNKS, BLER_RATE, rng), NUM_CHUNKS)))
+    
+    # The delivered chunks still have to pass fail-closed reassembly
+    reconstructed, status = reassemble_ciphertext(chunks, k_chunk, KEM_CT_SIZE)
+    if status != "OK" or reconstructed != kem_ct:
+        successes = 0
     
     success_rate = (successes / NUM_BLER_TRIALS) * 100
     
-    print(f"  Success rate: {success_rate:.1f}%")
+    print(f"  Success rate: {success_rate:.2f}% (exact: {(1 - BLER_RATE) ** NUM_CHUNKS * 100:.2f}%)")
     print(f"  Paper target: >45%")
     print(f"  Status: {'✅ PASS' if success_rate > 45 else '❌ FAIL'}")
     
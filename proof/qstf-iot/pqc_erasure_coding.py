@@ -1,6 +1,10 @@
 import os
+import time
+from functools import lru_cache
+from itertools import combinations
 import numpy as np
 import matplotlib.pyplot as plt
+from bler_monte_carlo import loss_mask
 
 """
 QSTF-V2: PQC Erasure Coding & Loss-Tolerant Reassembly
@@ -17,105 +21,163 @@ NUM_DATA_CHUNKS = 14   # 14 * 56 = 784 bytes
 NUM_PARITY_CHUNKS = 4  # Erasure coding parity
 TOTAL_CHUNKS = NUM_DATA_CHUNKS + NUM_PARITY_CHUNKS
 
+# GF(2^8) arithmetic (Reed-Solomon field, primitive polynomial x^8+x^4+x^3+x^2+1)
+GF_POLY = 0x11D
+
+def _build_gf_tables():
+    exp = np.zeros(512, dtype=np.uint8)
+    log = np.zeros(256, dtype=np.int32)
+    x = 1
+    for i in range(255):
+        exp[i] = x
+        log[x] = i
+        x <<= 1
+        if x & 0x100:
+            x ^= GF_POLY
+    exp[255:510] = exp[:255]
+    # Full 256x256 product table: one fancy-index per multiply over whole arrays
+    mul = exp[(log[:, None] + log[None, :]) % 255].astype(np.uint8)
+    mul[0, :] = 0
+    mul[:, 0] = 0
+    inv = np.zeros(256, dtype=np.uint8)
+    inv[1:] = exp[(255 - log[1:]) % 255]
+    return exp, log, mul, inv
+
+GF_EXP, GF_LOG, GF_MUL, GF_INV = _build_gf_tables()
+GF_MUL_FLAT = GF_MUL.ravel()
+
+def gf_matmul(matrix, data):
+    """
+    GF(256) product matrix @ data.
+    matrix: (..., r, k) uint8; data: (..., k, L) uint8 -> (..., r, L) uint8,
+    with leading dimensions broadcast (one matrix for all, or one per row).
+    Loops over the k inner terms only; each term is one lookup into the
+    flattened product table (index = a << 8 | b) over the whole
+    (batch, r, L) block followed by an XOR accumulate.
+    """
+    rows = np.asarray(matrix, dtype=np.uint16) << 8
+    batch = np.broadcast_shapes(rows.shape[:-2], data.shape[:-2])
+    out = np.zeros(batch + (rows.shape[-2], data.shape[-1]), dtype=np.uint8)
+    for j in range(rows.shape[-1]):
+        out ^= np.take(GF_MUL_FLAT, rows[..., :, j, None] | data[..., None, j, :])
+    return out
+
+def gf_invert(matrix):
+    """Gauss-Jordan inverse of a square GF(256) matrix; raises ValueError if singular"""
+    n = matrix.shape[0]
+    aug = np.concatenate([np.asarray(matrix, dtype=np.uint8), np.eye(n, dtype=np.uint8)], axis=1)
+    for col in range(n):
+        pivots = np.nonzero(aug[col:, col])[0]
+        if pivots.size == 0:
+            raise ValueError("Singular matrix over GF(256)")
+        pivot = col + pivots[0]
+        aug[[col, pivot]] = aug[[pivot, col]]
+        aug[col] = GF_MUL[GF_INV[aug[col, col]], aug[col]]
+        factors = aug[:, col].copy()
+        factors[col] = 0
+        aug ^= GF_MUL[factors[:, None], aug[col][None, :]]
+    return aug[:, n:]
+
+def cauchy_parity_matrix(k=NUM_DATA_CHUNKS, m=NUM_PARITY_CHUNKS):
+    """
+    (m, k) Cauchy matrix C[i, j] = 1 / (x_i + y_j) with x_i = k + i, y_j = j.
+    Every square submatrix of a Cauchy matrix is nonsingular, so [I; C] is
+    MDS: any k of the k + m chunks determine the data.
+    """
+    x = np.arange(k, k + m, dtype=np.uint8)
+    y = np.arange(k, dtype=np.uint8)
+    return GF_INV[x[:, None] ^ y[None, :]]
+
+PARITY_MATRIX = cauchy_parity_matrix()
+GENERATOR_MATRIX = np.concatenate([np.eye(NUM_DATA_CHUNKS, dtype=np.uint8), PARITY_MATRIX])
+
+@lru_cache(maxsize=None)
+def decode_matrix(received_rows):
+    """
+    Inverse of the generator rows that were received (first k of them),
+    cached per loss pattern. There are only C(18, 14) = 3060 patterns.
+    """
+    return gf_invert(GENERATOR_MATRIX[list(received_rows)])
+
+def _pad_keys(keys):
+    padded = np.zeros((keys.shape[0], NUM_DATA_CHUNKS * CHUNK_SIZE), dtype=np.uint8)
+    padded[:, :keys.shape[1]] = keys
+    return padded.reshape(-1, NUM_DATA_CHUNKS, CHUNK_SIZE)
+
 class PQCFragmenter:
-    def __init__(self):
-        # Simple systematic erasure code
-        # We store the original data for verification in this proof-of-concept
-        self.last_original = None
-        
+    """
+    Systematic 14+4 MDS erasure code over GF(256).
+    Chunks 0-13 carry the key verbatim; chunks 14-17 are Cauchy parity.
+    Any 14 received chunks recover the key.
+    """
+    
     def fragment_key(self, key_data):
         """
         Fragments a PQC key into NB-IoT-sized chunks with erasure coding.
-        Uses XOR-based systematic encoding.
         """
-        # Store for recovery verification
-        self.last_original = key_data
-        
-        # Pad to align
-        padded_size = NUM_DATA_CHUNKS * CHUNK_SIZE
-        if len(key_data) < padded_size:
-            key_data = key_data + b'\x00' * (padded_size - len(key_data))
-        
-        # Split into data chunks
-        data_chunks = []
-        for i in range(0, len(key_data), CHUNK_SIZE):
-            data_chunks.append(key_data[i:i+CHUNK_SIZE])
-        
-        # Generate parity chunks using systematic XOR patterns
-        # Parity P0 = D0 XOR D1 XOR ... XOR D13
-        # Parity P1 = D0 XOR D2 XOR D4 XOR ... (even indices)
-        # Parity P2 = D1 XOR D3 XOR D5 XOR ... (odd indices)
-        # Parity P3 = (D0*1) XOR (D1*2) XOR ... (weighted)
-        parity_chunks = []
-        
-        # P0: XOR of all
-        p0 = bytearray(CHUNK_SIZE)
-        for chunk in data_chunks:
-            for j in range(CHUNK_SIZE):
-                p0[j] ^= chunk[j]
-        parity_chunks.append(bytes(p0))
-        
-        # P1: XOR of even indices
-        p1 = bytearray(CHUNK_SIZE)
-        for i in range(0, len(data_chunks), 2):
-            for j in range(CHUNK_SIZE):
-                p1[j] ^= data_chunks[i][j]
-        parity_chunks.append(bytes(p1))
-        
-        # P2: XOR of odd indices
-        p2 = bytearray(CHUNK_SIZE)
-        for i in range(1, len(data_chunks), 2):
-            for j in range(CHUNK_SIZE):
-                p2[j] ^= data_chunks[i][j]
-        parity_chunks.append(bytes(p2))
-        
-        # P3: Weighted XOR
-        p3 = bytearray(CHUNK_SIZE)
-        for i, chunk in enumerate(data_chunks):
-            weight = (i + 1) % 256
-            for j in range(CHUNK_SIZE):
-                p3[j] ^= (chunk[j] * weight) % 256
-        parity_chunks.append(bytes(p3))
-        
-        return data_chunks + parity_chunks
+        key = np.frombuffer(key_data, dtype=np.uint8)[None, :]
+        return [bytes(chunk) for chunk in self.encode_batch(key)[0]]
+    
+    def encode_batch(self, keys):
+        """
+        keys: (B, key_size) uint8 with key_size <= 784.
+        Returns (B, 18, 56) uint8 chunk array.
+        """
+        data = _pad_keys(np.asarray(keys, dtype=np.uint8))
+        return np.concatenate([data, gf_matmul(PARITY_MATRIX, data)], axis=1)
     
     def reassemble_key(self, received_chunks, original_size):
         """
-        Reassembles the key from received chunks.
-        This demonstrates the CONCEPT - with N data + K parity chunks,
-        we can recover from up to K losses if we receive at least N chunks total.
+        Reassembles the key from (index, chunk) pairs.
+        Returns None if fewer than NUM_DATA_CHUNKS distinct chunks arrived.
         """
-        # Check if we have enough chunks
-        if len(received_chunks) < NUM_DATA_CHUNKS:
-            return None
-        
-        # Separate data and parity
-        data_chunks = {}
-        parity_chunks = {}
-        
+        chunks = np.zeros((1, TOTAL_CHUNKS, CHUNK_SIZE), dtype=np.uint8)
+        received = np.zeros((1, TOTAL_CHUNKS), dtype=bool)
         for idx, chunk in received_chunks:
-            if idx < NUM_DATA_CHUNKS:
-                data_chunks[idx] = chunk
-            else:
-                parity_chunks[idx - NUM_DATA_CHUNKS] = chunk
+            chunks[0, idx] = np.frombuffer(chunk, dtype=np.uint8)
+            received[0, idx] = True
+        keys, ok = self.decode_batch(chunks, received, original_size)
+        return keys[0].tobytes() if ok[0] else None
+    
+    def decode_batch(self, chunks, received, original_size):
+        """
+        chunks: (B, 18, 56) uint8 (contents of lost chunks are ignored);
+        received: (B, 18) bool mask.
+        Returns (keys (B, original_size) uint8, ok (B,) bool).
         
-        # If we have all data chunks, assemble directly
-        if len(data_chunks) == NUM_DATA_CHUNKS:
-            result = b''.join([data_chunks[i] for i in range(NUM_DATA_CHUNKS)])
-            return result[:original_size]
+        Each distinct loss pattern costs one cached inverse; the recovery
+        itself is a single batched GF matmul over all transmissions.
+        """
+        received = np.asarray(received, dtype=bool)
+        data = chunks[:, :NUM_DATA_CHUNKS].copy()
+        ok = received.sum(axis=1) >= NUM_DATA_CHUNKS
+        need = ok & ~received[:, :NUM_DATA_CHUNKS].all(axis=1)
         
-        # Otherwise, demonstrate recovery (conceptual proof)
-        # In real RS code, we'd use matrix inversion
-        # For this proof, we show the recovery is possible if total chunks >= NUM_DATA_CHUNKS
-        missing_data = NUM_DATA_CHUNKS - len(data_chunks)
-        if missing_data <= len(parity_chunks) and missing_data <= NUM_PARITY_CHUNKS:
-            # Recovery is theoretically possible
-            # For the proof-of-concept, return the original (simulating perfect recovery)
-            if self.last_original:
-                padded = self.last_original + b'\x00' * (NUM_DATA_CHUNKS * CHUNK_SIZE - len(self.last_original))
-                return padded[:original_size]
+        if need.any():
+            rows = np.nonzero(need)[0]
+            sub = received[rows]
+            codes = sub.astype(np.uint32) @ (np.uint32(1) << np.arange(TOTAL_CHUNKS, dtype=np.uint32))
+            _, first, pattern_of = np.unique(codes, return_index=True, return_inverse=True)
+            masks = sub[first]
+            
+            # Per pattern: first 14 received chunk indices, missing data indices,
+            # and the rows of the cached inverse that rebuild those data chunks
+            have = np.argsort(~masks, axis=1, kind='stable')[:, :NUM_DATA_CHUNKS]
+            missing = np.argsort(masks[:, :NUM_DATA_CHUNKS], axis=1, kind='stable')[:, :NUM_PARITY_CHUNKS]
+            n_missing = (~masks[:, :NUM_DATA_CHUNKS]).sum(axis=1)
+            recover = np.zeros((len(masks), NUM_PARITY_CHUNKS, NUM_DATA_CHUNKS), dtype=np.uint8)
+            for p in range(len(masks)):
+                inv = decode_matrix(tuple(have[p].tolist()))
+                recover[p, :n_missing[p]] = inv[missing[p, :n_missing[p]]]
+            
+            # One batched matmul for every transmission, whatever its pattern
+            gathered = np.take_along_axis(chunks[rows], have[pattern_of][:, :, None], axis=1)
+            rebuilt = gf_matmul(recover[pattern_of], gathered)
+            r, slot = np.nonzero(np.arange(NUM_PARITY_CHUNKS) < n_missing[pattern_of][:, None])
+            data[rows[r], missing[pattern_of][r, slot]] = rebuilt[r, slot]
         
-        return None
+        keys = data.reshape(len(data), -1)[:, :original_size]
+        return keys, ok
 
 def simulate_lossy_transmission(loss_rate):
     """
@@ -141,19 +203,44 @@ def simulate_lossy_transmission(loss_rate):
     success = (recovered_key == original_key) if recovered_key is not None else False
     return success, len(received_chunks)
 
-def generate_loss_robustness_curve():
+def simulate_lossy_transmissions(loss_rate, n_trials, rng=None, batch_size=8192, channel=None):
+    """
+    Batched simulate_lossy_transmission(): n_trials independent keys are
+    encoded, erased at loss_rate (i.i.d., or bursty if a GilbertElliott
+    channel is given) and decoded for real, batch_size at a time.
+    Returns (successes, received_counts) arrays.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    fragmenter = PQCFragmenter()
+    successes = np.zeros(n_trials, dtype=bool)
+    received_counts = np.zeros(n_trials, dtype=np.int32)
+    
+    for start in range(0, n_trials, batch_size):
+        n = min(batch_size, n_trials - start)
+        keys = rng.integers(0, 256, size=(n, ML_KEM_512_SIZE), dtype=np.uint8)
+        chunks = fragmenter.encode_batch(keys)
+        received = ~loss_mask(n, TOTAL_CHUNKS, loss_rate, rng, channel)
+        # Lost chunks never reach the decoder
+        chunks[~received] = 0
+        recovered, ok = fragmenter.decode_batch(chunks, received, ML_KEM_512_SIZE)
+        successes[start:start + n] = ok & (recovered == keys).all(axis=1)
+        received_counts[start:start + n] = received.sum(axis=1)
+    
+    return successes, received_counts
+
+def generate_loss_robustness_curve(trials=20000):
     """
     Generates the recovery curve showing success rate vs. packet loss.
     """
     print("Generating PQC Loss Robustness Curve...")
     
+    rng = np.random.default_rng(5)
     loss_rates = np.linspace(0, 0.50, 10)
     success_rates = []
     
     for loss_rate in loss_rates:
-        trials = 100
-        successes = sum(simulate_lossy_transmission(loss_rate)[0] for _ in range(trials))
-        success_rates.append((successes / trials) * 100)
+        successes, _ = simulate_lossy_transmissions(loss_rate, trials, rng)
+        success_rates.append(successes.mean() * 100)
     
     plt.figure(figsize=(10, 6))
     plt.plot(loss_rates * 100, success_rates, linewidth=2, color='#00FF41', marker='o')
@@ -207,6 +294,52 @@ def generate_battery_projection():
     print(f"Energy (QSTF-V2):  {energy_qstf:.2f} units")
     print(f"Savings: {savings:.1f}%")
 
+def audit_all_loss_patterns(fragmenter, n_keys=4):
+    """
+    Decodes every erasure pattern with <= NUM_PARITY_CHUNKS losses
+    (sum of C(18, e) for e <= 4 = 4048 patterns) for several keys, and
+    checks that every 5-loss pattern is reported as undecodable.
+    """
+    rng = np.random.default_rng(11)
+    keys = rng.integers(0, 256, size=(n_keys, ML_KEM_512_SIZE), dtype=np.uint8)
+    chunks = fragmenter.encode_batch(keys)
+    
+    masks = []
+    for losses in range(NUM_PARITY_CHUNKS + 2):
+        for lost in combinations(range(TOTAL_CHUNKS), losses):
+            mask = np.ones(TOTAL_CHUNKS, dtype=bool)
+            mask[list(lost)] = False
+            masks.append(mask)
+    masks = np.array(masks)
+    decodable = (~masks).sum(axis=1) <= NUM_PARITY_CHUNKS
+    
+    received = np.repeat(masks, n_keys, axis=0)
+    key_idx = np.tile(np.arange(n_keys), len(masks))
+    trial_chunks = chunks[key_idx]
+    trial_chunks[~received] = 0
+    recovered, ok = fragmenter.decode_batch(trial_chunks, received, ML_KEM_512_SIZE)
+    correct = ok & (recovered == keys[key_idx]).all(axis=1)
+    
+    expected = np.repeat(decodable, n_keys)
+    passed = bool(np.array_equal(correct, expected))
+    print(f"\n--- Exhaustive Loss-Pattern Audit ---")
+    print(f"Patterns with <= {NUM_PARITY_CHUNKS} losses: {int(decodable.sum())} x {n_keys} keys, "
+          f"recovered: {int(correct[expected].sum())}/{int(expected.sum())}")
+    print(f"Patterns with {NUM_PARITY_CHUNKS + 1} losses reported undecodable: "
+          f"{int((~ok[~expected]).sum())}/{int((~expected).sum())}")
+    print(f"MDS property: {'✅ VERIFIED' if passed else '❌ VIOLATED'}")
+    return passed
+
+def benchmark_decoder(fragmenter, n_trials=200000, loss_rate=0.15):
+    """Batch encode/decode throughput on random i.i.d. erasures"""
+    rng = np.random.default_rng(3)
+    start = time.perf_counter()
+    successes, _ = simulate_lossy_transmissions(loss_rate, n_trials, rng)
+    elapsed = time.perf_counter() - start
+    print(f"\n--- Batch Codec Throughput ---")
+    print(f"{n_trials:,} transmissions at {loss_rate:.0%} loss: {elapsed:.2f} s "
+          f"({n_trials/elapsed:,.0f} keys/sec encode+decode), recovered {successes.mean():.4%}")
+
 def main():
     print("Starting QSTF-V2 IoT Resilience Audit...")
     
@@ -228,14 +361,20 @@ def main():
     recovered = fragmenter.reassemble_key(received, ML_KEM_512_SIZE)
     
     if recovered == test_key:
-        print("Status: ✅ ERASURE RECOVERY PROVEN (4 chunks lost, key recovered)")
+        print("Spot check: 4 chunks lost, key recovered")
     else:
-        print("Status: ❌ ERASURE RECOVERY FAILED")
+        print("Spot check: ❌ key not recovered with 4 chunks lost")
+    
+    audit_passed = audit_all_loss_patterns(fragmenter)
+    benchmark_decoder(fragmenter)
     
     generate_loss_robustness_curve()
     generate_battery_projection()
     
-    print("\nSTATUS: ✅ QSTF-V2 IoT RESILIENCE PROVEN")
+    if recovered == test_key and audit_passed:
+        print("\nSTATUS: ✅ ERASURE RECOVERY PROVEN (spot check and exhaustive loss-pattern audit pass)")
+    else:
+        print("\nSTATUS: ❌ ERASURE RECOVERY FAILED")
 
 def erasure_with_pqlock_acceleration(data_chunks, pqlock_shared_secret=None):
     """
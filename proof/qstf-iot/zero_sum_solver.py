@@ -0,0 +1,118 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+from scipy.optimize import linprog
+
+"""
+QSTF-V2: Zero-Sum Game Solver (LP + Double Oracle)
+
+Convention: the row player (device) minimizes the payoff, the column
+player (jammer) maximizes it.
+
+- solve_zero_sum(A): one LP,  min v  s.t.  x^T A[:, j] <= v for all j,
+  sum(x) = 1, x >= 0. The jammer's equilibrium mix is the dual of the
+  column constraints, so one linprog call returns both strategies.
+- fill_payoff(): payoff matrix from a row function (exact analyzer or
+  Monte Carlo backend), rows spread across a process pool.
+- double_oracle(): for strategy spaces too large to materialize. Solves
+  the game restricted to the strategies found so far, asks each player's
+  best-response oracle for a better pure strategy against the opponent's
+  current mix, adds it and repeats. The best-response values bracket the
+  game value; it stops when they meet.
+"""
+
+TOLERANCE = 1e-9
+MAX_ITERATIONS = 500
+
+# =============================================================================
+# LP SOLVER
+# =============================================================================
+
+def solve_zero_sum(A):
+    """
+    Mixed equilibrium of the zero-sum game with payoff A (rows minimize).
+    Returns (value, row mix x, column mix y).
+    """
+    A = np.asarray(A, dtype=float)
+    r, c = A.shape
+    # Variables [x_1..x_r, v]; minimize v
+    cost = np.zeros(r + 1)
+    cost[-1] = 1.0
+    A_ub = np.hstack([A.T, -np.ones((c, 1))])
+    A_eq = np.zeros((1, r + 1))
+    A_eq[0, :r] = 1.0
+    bounds = [(0, None)] * r + [(None, None)]
+    res = linprog(cost, A_ub=A_ub, b_ub=np.zeros(c), A_eq=A_eq, b_eq=[1.0], bounds=bounds, method='highs')
+    if res.status != 0:
+        raise RuntimeError(f"linprog failed: {res.message}")
+    x = np.clip(res.x[:r], 0, None)
+    y = np.clip(-res.ineqlin.marginals, 0, None)
+    return float(res.x[-1]), x / x.sum(), y / y.sum() if y.sum() > 0 else np.full(c, 1.0 / c)
+
+# =============================================================================
+# PAYOFF FILL
+# =============================================================================
+
+def _fill_row(args):
+    row_fn, row, cols = args
+    return np.asarray(row_fn(row, cols), dtype=float)
+
+def fill_payoff(row_fn, rows, cols, workers=None):
+    """
+    Matrix[i, j] = row_fn(rows[i], cols)[j]. row_fn must be a top-level
+    function (it is pickled to the workers).
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = [(row_fn, row, cols) for row in rows]
+    if workers == 1 or len(rows) == 1:
+        return np.array([_fill_row(t) for t in tasks])
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return np.array(list(pool.map(_fill_row, tasks)))
+
+# =============================================================================
+# DOUBLE ORACLE
+# =============================================================================
+
+@dataclass
+class DoubleOracleResult:
+    value: float
+    rows: List
+    x: np.ndarray
+    cols: List
+    y: np.ndarray
+    lower: float
+    upper: float
+    iterations: int
+
+def double_oracle(payoff, row_oracle, col_oracle, rows, cols, tol=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """
+    payoff(rows, cols) -> matrix block for the given strategies
+    row_oracle(cols, y) -> (row, cost): device best response to the jammer mix
+    col_oracle(rows, x) -> (col, gain): jammer best response to the device mix
+    rows / cols: initial (non-empty) strategy lists; strategies must be hashable.
+    """
+    rows, cols = list(rows), list(cols)
+    M = np.asarray(payoff(rows, cols), dtype=float)
+    lower, upper = -np.inf, np.inf
+    for iteration in range(1, max_iterations + 1):
+        value, x, y = solve_zero_sum(M)
+        row, cost = row_oracle(cols, y)
+        col, gain = col_oracle(rows, x)
+        lower, upper = max(lower, cost), min(upper, gain)
+        if upper - lower <= tol:
+            break
+        added = False
+        if cost < value - tol and row not in rows:
+            M = np.vstack([M, payoff([row], cols)])
+            rows.append(row)
+            added = True
+        if gain > value + tol and col not in cols:
+            M = np.hstack([M, payoff(rows, [col])])
+            cols.append(col)
+            added = True
+        if not added:
+            break
+    return DoubleOracleResult(value, rows, x, cols, y, lower, upper, iteration)
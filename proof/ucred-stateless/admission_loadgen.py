@@ -0,0 +1,254 @@
+import asyncio
+import multiprocessing as mp
+import os
+import queue
+import time
+import numpy as np
+import cbor2
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from cpu_verification_bench import build_claims
+from binder_codec import encode_binder
+from admission_service import (MSG_FULL, MSG_BINDER, MSG_STATS, ADMIT, RESPONSE_HEADER, STATS_BODY,
+                               HOST, PORT, encode_full, encode_binder_request, frame, run_server)
+
+"""
+U-CRED: Load Generator for the Stateless Admission Service
+
+Starts admission_service in its own process on localhost and drives it
+over real TCP sockets:
+- closed loop: CONNECTIONS clients, one outstanding request each
+- open loop: Poisson arrivals at a fixed rate; latency runs from each
+  request's scheduled send time, so queueing under overload is counted
+
+Workloads: full path only, binder path only (TRW cache primed) and the
+20% full / 80% binder mix behind the "51% CPU reduction" claim. Server CPU
+per session comes from MSG_STATS deltas, so client cost is excluded even
+when both share a core; latency includes sockets, framing, the event loop
+and executor scheduling.
+"""
+
+NUM_UES = 1000
+CONNECTIONS = 16
+CLOSED_LOOP_SECONDS = 2.0
+OPEN_LOOP_SECONDS = 2.0
+OPEN_LOOP_LOAD = [0.5, 0.9]   # fraction of measured closed-loop binder capacity
+FULL_FRACTION = 0.2           # mix used in the CPU-reduction claim
+SERVER_WORKERS = 0 if (os.cpu_count() or 1) == 1 else None   # 0 = verify on the event loop
+HIST_EDGES_MS = [0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100]
+
+# =============================================================================
+# REQUESTS
+# =============================================================================
+
+def make_sessions(issuer_sk, n_ues=NUM_UES):
+    """Per UE: a full-path request body and a binder request body (pre-signed)"""
+    full, binder = [], []
+    for _ in range(n_ues):
+        ue_sk = ed25519.Ed25519PrivateKey.generate()
+        ue_public = ue_sk.public_key().public_bytes_raw()
+        claims = build_claims(ue_sk.public_key())
+        payload = cbor2.dumps(claims, canonical=True)
+        challenge = os.urandom(16)
+        full.append(encode_full(payload, issuer_sk.sign(payload), ue_public, challenge,
+                                ue_sk.sign(challenge + payload[:32])))
+        wire = encode_binder(ue_public[:16], bytes.fromhex(claims["policy_fp"]), claims["cti"])
+        challenge = os.urandom(16)
+        binder.append(encode_binder_request(wire, ue_public, challenge, ue_sk.sign(challenge + wire[:32])))
+    return full, binder
+
+def workload(full, binder, full_fraction, rng):
+    """Endless (type, body) stream with the given share of full-path requests"""
+    while True:
+        if rng.random() < full_fraction:
+            yield MSG_FULL, full[rng.integers(len(full))]
+        else:
+            yield MSG_BINDER, binder[rng.integers(len(binder))]
+
+# =============================================================================
+# CLIENT
+# =============================================================================
+
+class Connection:
+    """One pipelined TCP connection; responses are matched by req_id"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.pending = {}
+        self.next_id = 0
+        self._reader_task = asyncio.create_task(self._read())
+
+    @classmethod
+    async def open(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    def send(self, msg_type, body=b''):
+        req_id = self.next_id
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending[req_id] = future
+        self.writer.write(frame(msg_type, req_id, body))
+        return future
+
+    async def _read(self):
+        try:
+            while True:
+                req_id, verdict, length = RESPONSE_HEADER.unpack(await self.reader.readexactly(RESPONSE_HEADER.size))
+                body = await self.reader.readexactly(length) if length else b''
+                self.pending.pop(req_id).set_result((verdict, body))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            # Connection gone: fail whatever is still outstanding instead of hanging
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Admission service closed the connection"))
+            self.pending.clear()
+
+    async def close(self):
+        self.writer.close()
+        self._reader_task.cancel()
+
+async def server_stats(conn):
+    _, body = await conn.send(MSG_STATS)
+    return STATS_BODY.unpack(body)
+
+async def closed_loop(conns, stream, seconds):
+    latencies, admitted = [], 0
+    deadline = time.perf_counter() + seconds
+
+    async def client(conn):
+        nonlocal admitted
+        while time.perf_counter() < deadline:
+            msg_type, body = next(stream)
+            start = time.perf_counter()
+            verdict, _ = await conn.send(msg_type, body)
+            latencies.append(time.perf_counter() - start)
+            admitted += verdict == ADMIT
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in conns))
+    return latencies, admitted, time.perf_counter() - start
+
+async def open_loop(conns, stream, rate, seconds, rng):
+    """Poisson arrivals; sends that fall behind schedule go out in a burst"""
+    schedule = np.cumsum(rng.exponential(1.0 / rate, int(rate * seconds * 1.2) + 1))
+    schedule = schedule[schedule < seconds]
+    latencies, futures = [], []
+    start = time.perf_counter()
+    for i, offset in enumerate(schedule.tolist()):
+        delay = start + offset - time.perf_counter()
+        if delay > 0.0005:
+            await asyncio.sleep(delay)
+        msg_type, body = next(stream)
+        scheduled = start + offset
+        future = conns[i % len(conns)].send(msg_type, body)
+        future.add_done_callback(lambda f, s=scheduled: latencies.append(time.perf_counter() - s))
+        futures.append(future)
+    results = await asyncio.gather(*futures)
+    elapsed = time.perf_counter() - start
+    return latencies, sum(v == ADMIT for v, _ in results), elapsed
+
+# =============================================================================
+# REPORTING
+# =============================================================================
+
+def summarize(label, latencies, admitted, elapsed, cpu=None, sessions=None):
+    lat_ms = np.array(latencies) * 1000
+    row = {
+        'label': label,
+        'throughput': len(lat_ms) / elapsed,
+        'p50_ms': float(np.percentile(lat_ms, 50)),
+        'p99_ms': float(np.percentile(lat_ms, 99)),
+        'p999_ms': float(np.percentile(lat_ms, 99.9)),
+        'admit_rate': admitted / max(1, len(lat_ms)),
+        'cpu_us_per_session': cpu / sessions * 1e6 if sessions else float('nan'),
+        'histogram': np.histogram(lat_ms, [0] + HIST_EDGES_MS + [np.inf])[0],
+    }
+    print(f"  {label:<26}{row['throughput']:>9,.0f}/s  p50 {row['p50_ms']:6.2f}  p99 {row['p99_ms']:6.2f}  "
+          f"p999 {row['p999_ms']:7.2f} ms  admit {row['admit_rate']:6.1%}  "
+          f"CPU {row['cpu_us_per_session']:6.0f} us/session")
+    return row
+
+def print_histograms(rows):
+    edges = ['<' + str(HIST_EDGES_MS[0])] + [f"<{e}" for e in HIST_EDGES_MS[1:]] + [f">={HIST_EDGES_MS[-1]}"]
+    print(f"\nLatency histograms (ms, share of requests):")
+    print(f"  {'':<26}" + "".join(f"{e:>7}" for e in edges))
+    for row in rows:
+        share = row['histogram'] / max(1, row['histogram'].sum())
+        print(f"  {row['label']:<26}" + "".join(f"{s:>7.1%}" if s else f"{'.':>7}" for s in share))
+
+async def measure(conns, label, stream, runner):
+    stats_conn = conns[0]
+    cpu0, n0 = await server_stats(stats_conn)
+    latencies, admitted, elapsed = await runner(stream)
+    cpu1, n1 = await server_stats(stats_conn)
+    return summarize(label, latencies, admitted, elapsed, cpu1 - cpu0, n1 - n0)
+
+async def drive(full, binder, port):
+    rng = np.random.default_rng(17)
+    conns = [await Connection.open(HOST, port) for _ in range(CONNECTIONS)]
+    rows = []
+
+    # Prime the TRW cache: every UE completes one full-path admission
+    primed = await asyncio.gather(*(conns[i % CONNECTIONS].send(MSG_FULL, body) for i, body in enumerate(full)))
+    primed_ok = all(v == ADMIT for v, _ in primed)
+
+    print(f"\nClosed loop ({CONNECTIONS} connections, {CLOSED_LOOP_SECONDS} s each):")
+    for label, share in [("full path", 1.0), ("binder path", 0.0),
+                         (f"mix {FULL_FRACTION:.0%} full/{1 - FULL_FRACTION:.0%} binder", FULL_FRACTION)]:
+        stream = workload(full, binder, share, rng)
+        rows.append(await measure(conns, label, stream,
+                                  lambda s: closed_loop(conns, s, CLOSED_LOOP_SECONDS)))
+
+    capacity = rows[1]['throughput']
+    print(f"\nOpen loop (binder path, Poisson arrivals, {OPEN_LOOP_SECONDS} s each):")
+    for load in OPEN_LOOP_LOAD:
+        rate = load * capacity
+        stream = workload(full, binder, 0.0, rng)
+        rows.append(await measure(conns, f"binder @ {rate:,.0f}/s ({load:.0%})", stream,
+                                  lambda s: open_loop(conns, s, rate, OPEN_LOOP_SECONDS, rng)))
+
+    for c in conns:
+        await c.close()
+    return rows, primed_ok
+
+def main():
+    print("--- U-CRED: Stateless Admission Service under Socket Load ---")
+    issuer_sk = ed25519.Ed25519PrivateKey.generate()
+    issuer_public = issuer_sk.public_key().public_bytes_raw()
+    full, binder = make_sessions(issuer_sk)
+
+    ready = mp.Queue()
+    server = mp.Process(target=run_server, args=(issuer_public, HOST, PORT, SERVER_WORKERS, ready), daemon=True)
+    server.start()
+    try:
+        port = ready.get(timeout=10)
+    except queue.Empty:
+        server.terminate()
+        raise RuntimeError("Admission service did not start")
+    workers = 'event loop' if SERVER_WORKERS == 0 else f"{SERVER_WORKERS or os.cpu_count()} process(es)"
+    print(f"Service on {HOST}:{port} (verification on {workers}), {len(full):,} UEs, "
+          f"{os.cpu_count()} core(s) shared with the load generator")
+    try:
+        rows, primed_ok = asyncio.run(drive(full, binder, port))
+    finally:
+        server.terminate()
+        server.join()
+
+    print_histograms(rows)
+    full_cpu, binder_cpu, mix_cpu = (rows[i]['cpu_us_per_session'] for i in range(3))
+    per_session = 1 - binder_cpu / full_cpu
+    mix_reduction = 1 - mix_cpu / full_cpu
+    print(f"\nServer CPU per session: full {full_cpu:.0f} us, binder {binder_cpu:.0f} us "
+          f"({per_session:.0%} less per session)")
+    print(f"Mixed workload vs all-full baseline: {mix_reduction:.0%} CPU reduction (paper: 51%)")
+    all_admitted = primed_ok and all(r['admit_rate'] == 1.0 for r in rows)
+    if all_admitted and mix_reduction > 0:
+        print("STATUS: ✅ ADMISSION SERVICE MEASURED (CPU reduction holds under socket load)")
+    else:
+        print("STATUS: ❌ ADMISSION SERVICE CHECK FAILED")
+
+if __name__ == "__main__":
+    main()
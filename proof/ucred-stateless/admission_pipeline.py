@@ -0,0 +1,293 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import cbor2
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from cpu_verification_bench import build_claims
+from trw_cache import ShardedTRWCache, TRW_CACHE_BYTES
+
+"""
+U-CRED: Batched Full-Path Admission Pipeline
+
+Admission requests (COSE payload + issuer signature + UE key + PoP
+signature) enter a queue. A batcher thread cuts micro-batches when either
+BATCH_SIZE requests are waiting or the oldest has waited MAX_BATCH_DELAY_MS,
+and a process pool verifies each batch: issuer Ed25519 verify, one CBOR
+decode, jkt/expiry checks against the decoded claims, PoP Ed25519 verify.
+Admitted UEs are written to the TRW cache from the decoded claims - the
+payload is never parsed twice - and expire with min(exp, exp_smf).
+
+Batch size and delay trade p99 latency for throughput; the benchmark
+measures sessions/sec/core at saturation and latency under open-loop load.
+"""
+
+BATCH_SIZE = 64
+MAX_BATCH_DELAY_MS = 2.0
+NUM_UES = 2000               # distinct pre-signed requests replayed by the load generator
+SATURATION_REQUESTS = 10000
+OFFERED_RATES = [10000, 30000, 100000]   # admissions/sec
+OPEN_LOOP_SECONDS = 0.25
+BATCH_SIZE_SWEEP = [1, 16, 64, 256]
+
+# =============================================================================
+# WORKER SIDE
+# =============================================================================
+
+_issuer_pk = None
+
+def _init_worker(issuer_public_bytes):
+    global _issuer_pk
+    _issuer_pk = ed25519.Ed25519PublicKey.from_public_bytes(issuer_public_bytes)
+
+def verify_admission(request, issuer_pk, now):
+    """
+    Full-path verification of one request.
+    request: (payload, issuer_sig, ue_public_bytes, pop_challenge, pop_sig)
+    Returns (admitted, jkt, policy_fp, binding_expiry).
+    """
+    payload, issuer_sig, ue_public, pop_challenge, pop_sig = request
+    try:
+        # Step 1: Issuer signature verification (COSE_verify1)
+        issuer_pk.verify(issuer_sig, payload)
+
+        # Single decode; every later check reads these claims
+        claims = cbor2.loads(payload)
+        jkt = claims["cnf"]["jkt"]
+        if ue_public.hex()[:32] != jkt or claims["exp"] <= now:
+            return False, None, None, 0
+
+        # Step 2: UE PoP signature over challenge || payload prefix
+        ed25519.Ed25519PublicKey.from_public_bytes(ue_public).verify(pop_sig, pop_challenge + payload[:32])
+    except (InvalidSignature, ValueError, KeyError, TypeError, cbor2.CBORDecodeError):
+        return False, None, None, 0
+
+    return True, bytes.fromhex(jkt), bytes.fromhex(claims["policy_fp"]), min(claims["exp"], claims["nat"]["exp_smf"])
+
+def verify_admission_batch(requests, issuer_public_bytes=None):
+    """Worker entry point: verify a micro-batch"""
+    issuer_pk = _issuer_pk
+    if issuer_public_bytes is not None:
+        issuer_pk = ed25519.Ed25519PublicKey.from_public_bytes(issuer_public_bytes)
+    now = int(time.time())
+    return [verify_admission(r, issuer_pk, now) for r in requests]
+
+# =============================================================================
+# PIPELINE
+# =============================================================================
+
+_STOP = object()
+
+class AdmissionPipeline:
+    """
+    Queue -> micro-batcher -> process pool -> TRW cache.
+
+    workers=0 verifies in the batcher thread itself (single-core baseline).
+    At most 2 x workers batches are in flight, so a saturated pool applies
+    back-pressure to the queue instead of buffering without bound.
+    """
+
+    def __init__(self, issuer_public_bytes, batch_size=BATCH_SIZE, max_delay_ms=MAX_BATCH_DELAY_MS,
+                 workers=None, trw_cache=None):
+        self.issuer_public_bytes = issuer_public_bytes
+        self.batch_size = batch_size
+        self.max_delay = max_delay_ms / 1000.0
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.trw_cache = trw_cache if trw_cache is not None else ShardedTRWCache(TRW_CACHE_BYTES)
+
+        self.admitted = 0
+        self.rejected = 0
+        self.batches = 0
+        self.latencies = []
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._inflight = threading.BoundedSemaphore(max(1, 2 * self.workers))
+        self._pool = None
+        if self.workers > 0:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(issuer_public_bytes,))
+        self._thread = threading.Thread(target=self._batcher, daemon=True)
+        self._thread.start()
+
+    def submit(self, request, arrival=None):
+        """Enqueue one request; latency is measured from `arrival` (default: now)"""
+        self._queue.put((time.perf_counter() if arrival is None else arrival, request))
+
+    def close(self):
+        """Flush the queue, wait for in-flight batches and stop the workers"""
+        self._queue.put(_STOP)
+        self._thread.join()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+    def _batcher(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = item[0] + self.max_delay
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        arrivals = [a for a, _ in batch]
+        requests = [r for _, r in batch]
+        if self._pool is None:
+            try:
+                results = verify_admission_batch(requests, self.issuer_public_bytes)
+            except Exception:
+                results = None
+            self._complete(arrivals, results)
+            return
+        self._inflight.acquire()
+        try:
+            future = self._pool.submit(verify_admission_batch, requests)
+        except Exception:
+            self._inflight.release()
+            self._complete(arrivals, None)
+            return
+        future.add_done_callback(lambda f: self._on_done(arrivals, f))
+
+    def _on_done(self, arrivals, future):
+        try:
+            try:
+                results = future.result()
+            except Exception:
+                results = None  # worker died (e.g. BrokenProcessPool): reject the batch
+            self._complete(arrivals, results)
+        finally:
+            self._inflight.release()
+
+    def _complete(self, arrivals, results):
+        """results=None rejects the whole batch"""
+        done = time.perf_counter()
+        if results is None:
+            results = [(False, None, None, None)] * len(arrivals)
+        admitted = [(jkt, policy_fp, expiry) for ok, jkt, policy_fp, expiry in results if ok]
+        # ShardedTRWCache locks per shard; keep it outside the counters lock
+        for jkt, policy_fp, expiry in admitted:
+            self.trw_cache.put(jkt, policy_fp, expiry)
+        with self._lock:
+            self.latencies.extend(done - arrival for arrival in arrivals)
+            self.admitted += len(admitted)
+            self.rejected += len(arrivals) - len(admitted)
+            self.batches += 1
+
+# =============================================================================
+# LOAD GENERATION + BENCHMARK
+# =============================================================================
+
+def make_requests(issuer_sk, n_ues=NUM_UES):
+    """Pre-signed admission requests from n_ues distinct UEs (UE-side cost kept off the clock)"""
+    requests = []
+    for i in range(n_ues):
+        ue_sk = ed25519.Ed25519PrivateKey.generate()
+        ue_public = ue_sk.public_key().public_bytes_raw()
+        payload = cbor2.dumps(build_claims(ue_sk.public_key()), canonical=True)
+        challenge = os.urandom(16)
+        requests.append((payload, issuer_sk.sign(payload), ue_public, challenge,
+                         ue_sk.sign(challenge + payload[:32])))
+    return requests
+
+def run_saturation(issuer_public, requests, n_requests, batch_size, workers):
+    """Closed burst: enqueue everything at once, measure drain rate"""
+    pipeline = AdmissionPipeline(issuer_public, batch_size=batch_size, workers=workers)
+    start = time.perf_counter()
+    for i in range(n_requests):
+        pipeline.submit(requests[i % len(requests)], start)
+    pipeline.close()
+    elapsed = time.perf_counter() - start
+    return n_requests / elapsed, pipeline
+
+def run_open_loop(issuer_public, requests, rate, seconds, batch_size, workers, tick=0.001):
+    """
+    Open-loop arrivals at `rate`/s, submitted in 1 ms ticks. Latency runs
+    from each request's scheduled arrival, so queueing under overload counts.
+    """
+    pipeline = AdmissionPipeline(issuer_public, batch_size=batch_size, workers=workers)
+    per_tick = rate * tick
+    start = time.perf_counter()
+    sent = 0
+    for t in range(int(seconds / tick)):
+        scheduled = start + t * tick
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        target = int((t + 1) * per_tick)
+        while sent < target:
+            pipeline.submit(requests[sent % len(requests)], scheduled)
+            sent += 1
+    pipeline.close()
+    elapsed = time.perf_counter() - start
+    lat_ms = np.array(pipeline.latencies) * 1000
+    return {
+        'offered': rate,
+        'achieved': sent / elapsed,
+        'p50_ms': float(np.percentile(lat_ms, 50)),
+        'p99_ms': float(np.percentile(lat_ms, 99)),
+        'admitted': pipeline.admitted,
+    }
+
+def main():
+    print("--- U-CRED: Batched Full-Path Admission Pipeline ---")
+    issuer_sk = ed25519.Ed25519PrivateKey.generate()
+    issuer_public = issuer_sk.public_key().public_bytes_raw()
+    requests = make_requests(issuer_sk)
+    workers = os.cpu_count() or 1
+    print(f"{len(requests):,} distinct UEs, {workers} worker process(es)")
+
+    # Correctness: forged PoP and wrong issuer are rejected
+    forged = list(requests[0])
+    forged[4] = bytes(64)
+    bad_issuer = list(requests[1])
+    bad_issuer[1] = ed25519.Ed25519PrivateKey.generate().sign(bad_issuer[0])
+    checks = verify_admission_batch([requests[2], tuple(forged), tuple(bad_issuer)], issuer_public)
+    correct = [c[0] for c in checks] == [True, False, False]
+    print(f"Valid admitted, forged PoP / foreign issuer rejected: {'✅' if correct else '❌'}")
+
+    # Sessions/sec/core at saturation, per batch size
+    print(f"\nSaturation ({SATURATION_REQUESTS:,} queued admissions):")
+    print(f"{'batch':>6}{'sessions/s':>14}{'per core':>12}{'p99 (ms)':>11}")
+    per_core = {}
+    for batch_size in BATCH_SIZE_SWEEP:
+        rate, pipeline = run_saturation(issuer_public, requests, SATURATION_REQUESTS, batch_size, workers)
+        per_core[batch_size] = rate / workers
+        p99 = np.percentile(np.array(pipeline.latencies) * 1000, 99)
+        print(f"{batch_size:>6}{rate:>14,.0f}{rate / workers:>12,.0f}{p99:>11.1f}")
+        assert pipeline.admitted == SATURATION_REQUESTS
+    cache_entries = len(pipeline.trw_cache)
+    cache_stats = pipeline.trw_cache.stats()
+
+    # Open-loop latency at target admission rates
+    print(f"\nOpen loop (batch {BATCH_SIZE}, max delay {MAX_BATCH_DELAY_MS} ms, {OPEN_LOOP_SECONDS} s per rate):")
+    print(f"{'offered/s':>10}{'achieved/s':>12}{'p50 (ms)':>10}{'p99 (ms)':>10}{'cores needed':>14}")
+    best = max(per_core.values())
+    for rate in OFFERED_RATES:
+        r = run_open_loop(issuer_public, requests, rate, OPEN_LOOP_SECONDS, BATCH_SIZE, workers)
+        print(f"{r['offered']:>10,}{r['achieved']:>12,.0f}{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}"
+              f"{int(np.ceil(rate / best)):>14}")
+
+    print(f"\nTRW cache filled from decoded claims: {cache_entries:,} UEs "
+          f"({cache_stats['inserts']:,} writes, {cache_stats['evictions']:,} evictions)")
+    print(f"Best measured throughput: {best:,.0f} full-path sessions/sec/core")
+    if correct:
+        print("STATUS: ✅ BATCHED ADMISSION PIPELINE MEASURED")
+    else:
+        print("STATUS: ❌ ADMISSION VERIFICATION INCORRECT")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import asyncio
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from admission_pipeline import verify_admission
+from binder_codec import BinderRecord, decode_binder
+from trw_cache import TRWCache, TRW_CACHE_BYTES
+
+"""
+U-CRED: Stateless Admission Microservice (asyncio, TCP)
+
+Wire protocol (network byte order, pipelined per connection):
+  request   type u8 | req_id u32 | body_len u16 | body
+  response  req_id u32 | verdict u8 | body_len u16 | body
+
+  MSG_FULL    body = payload_len u16 | payload | issuer_sig 64 | ue_pk 32
+                     | challenge 16 | pop_sig 64
+              -> COSE verify + PoP verify; admitted UEs enter the TRW cache
+  MSG_BINDER  body = binder_len u8 | binder | ue_pk 32 | challenge 16 | pop_sig 64
+              -> binder decode + TRW cache lookup on the event loop, then
+                 PoP verify only (the binder path)
+  MSG_STATS   body empty -> body = cpu_seconds f64 | sessions u64
+
+Signature checks run on an executor: the event loop groups whatever
+requests are waiting into one batch per executor call, so IPC is paid per
+batch, not per request. workers=0 verifies on the event loop thread.
+MSG_STATS reports server CPU (event loop process + pool workers), which
+the load generator turns into CPU per admitted session. Malformed bodies
+and failed verification batches are answered with REJECT, never dropped.
+"""
+
+MSG_FULL = 1
+MSG_BINDER = 2
+MSG_STATS = 3
+REJECT, ADMIT = 0, 1
+
+REQUEST_HEADER = struct.Struct('!BIH')
+RESPONSE_HEADER = struct.Struct('!IBH')
+STATS_BODY = struct.Struct('!dQ')
+_U16 = struct.Struct('!H')
+
+SIG_BYTES = 64
+KEY_BYTES = 32
+CHALLENGE_BYTES = 16
+MAX_BATCH = 64
+HOST = '127.0.0.1'
+PORT = 0    # ephemeral; the bound port is reported through `ready`
+
+# =============================================================================
+# FRAMING
+# =============================================================================
+
+def encode_full(payload, issuer_sig, ue_public, challenge, pop_sig):
+    return _U16.pack(len(payload)) + payload + issuer_sig + ue_public + challenge + pop_sig
+
+def decode_full(body):
+    if len(body) < _U16.size:
+        raise ValueError("Truncated full-path request")
+    (n,) = _U16.unpack_from(body)
+    end = 2 + n
+    payload = bytes(body[2:end])
+    issuer_sig = bytes(body[end:end + SIG_BYTES])
+    end += SIG_BYTES
+    ue_public = bytes(body[end:end + KEY_BYTES])
+    end += KEY_BYTES
+    challenge = bytes(body[end:end + CHALLENGE_BYTES])
+    pop_sig = bytes(body[end + CHALLENGE_BYTES:end + CHALLENGE_BYTES + SIG_BYTES])
+    if len(pop_sig) != SIG_BYTES:
+        raise ValueError("Truncated full-path request")
+    return payload, issuer_sig, ue_public, challenge, pop_sig
+
+def encode_binder_request(binder, ue_public, challenge, pop_sig):
+    return bytes([len(binder)]) + binder + ue_public + challenge + pop_sig
+
+def decode_binder_request(body):
+    if not body:
+        raise ValueError("Empty binder request")
+    view = memoryview(body)
+    end = 1 + view[0]
+    binder = view[1:end]
+    ue_public = bytes(view[end:end + KEY_BYTES])
+    challenge = view[end + KEY_BYTES:end + KEY_BYTES + CHALLENGE_BYTES]
+    pop_sig = bytes(view[end + KEY_BYTES + CHALLENGE_BYTES:])
+    if len(pop_sig) != SIG_BYTES:
+        raise ValueError("Truncated binder request")
+    return binder, ue_public, challenge, pop_sig
+
+def frame(msg_type, req_id, body=b''):
+    return REQUEST_HEADER.pack(msg_type, req_id, len(body)) + body
+
+# =============================================================================
+# VERIFICATION (executor side)
+# =============================================================================
+
+_issuer_pk = None
+
+def _init_worker(issuer_public_bytes):
+    global _issuer_pk
+    _issuer_pk = ed25519.Ed25519PublicKey.from_public_bytes(issuer_public_bytes)
+
+def verify_batch(items):
+    """
+    items: [(MSG_FULL, request tuple) | (MSG_BINDER, (ue_public, pop_sig, pop_message))]
+    Returns ([(admitted, jkt, policy_fp, expiry)], cpu seconds spent).
+    """
+    cpu = time.process_time()
+    now = int(time.time())
+    results = []
+    for kind, request in items:
+        if kind == MSG_FULL:
+            results.append(verify_admission(request, _issuer_pk, now))
+            continue
+        ue_public, pop_sig, pop_message = request
+        try:
+            ed25519.Ed25519PublicKey.from_public_bytes(ue_public).verify(pop_sig, pop_message)
+            results.append((True, None, None, 0))
+        except (InvalidSignature, ValueError):
+            results.append((False, None, None, 0))
+    return results, time.process_time() - cpu
+
+# =============================================================================
+# SERVER
+# =============================================================================
+
+class AdmissionService:
+    """asyncio TCP front end + TRW cache + batched verification executor"""
+
+    def __init__(self, issuer_public_bytes, workers=None, max_batch=MAX_BATCH, trw_cache=None):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_batch = max_batch
+        self.trw_cache = trw_cache if trw_cache is not None else TRWCache(TRW_CACHE_BYTES)
+        self.sessions = 0
+        self.admitted = 0
+        self.worker_cpu = 0.0
+        self._binder = BinderRecord()
+        self._pool = None
+        _init_worker(issuer_public_bytes)
+        if self.workers > 0:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(issuer_public_bytes,))
+        self._queue = None
+        self._inflight = None
+
+    def cpu_seconds(self):
+        t = os.times()
+        return t.user + t.system + self.worker_cpu
+
+    async def serve(self, host=HOST, port=PORT, ready=None):
+        """ready: optional queue; receives the bound port once the server listens"""
+        self._queue = asyncio.Queue()
+        self._inflight = asyncio.Semaphore(max(1, 2 * self.workers))
+        server = await asyncio.start_server(self._handle, host, port)
+        batcher = asyncio.create_task(self._batcher())
+        if ready is not None:
+            ready.put(server.sockets[0].getsockname()[1])
+        async with server:
+            try:
+                await server.serve_forever()
+            finally:
+                batcher.cancel()
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readexactly(REQUEST_HEADER.size)
+                msg_type, req_id, length = REQUEST_HEADER.unpack(header)
+                body = await reader.readexactly(length)
+                self._dispatch(msg_type, req_id, body, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _respond(self, writer, req_id, verdict, body=b''):
+        if not writer.is_closing():
+            writer.write(RESPONSE_HEADER.pack(req_id, verdict, len(body)) + body)
+
+    def _dispatch(self, msg_type, req_id, body, writer):
+        if msg_type == MSG_STATS:
+            self._respond(writer, req_id, ADMIT, STATS_BODY.pack(self.cpu_seconds(), self.sessions))
+            return
+        try:
+            if msg_type == MSG_FULL:
+                item = (MSG_FULL, decode_full(body))
+            elif msg_type == MSG_BINDER:
+                binder_bytes, ue_public, challenge, pop_sig = decode_binder_request(body)
+                binder = decode_binder(binder_bytes, self._binder)
+                # Binder path: live TRW binding for this key and policy, checked
+                # before any signature work is scheduled
+                jkt = bytes(binder.jkt)
+                if ue_public[:16] != jkt or self.trw_cache.get(jkt) != binder.policy_fp:
+                    self._finish(writer, req_id, False)
+                    return
+                item = (MSG_BINDER, (ue_public, pop_sig, bytes(challenge) + bytes(binder_bytes[:32])))
+            else:
+                raise ValueError(f"Unknown message type {msg_type}")
+        except (ValueError, IndexError, struct.error):
+            self._finish(writer, req_id, False)
+            return
+        self._queue.put_nowait((writer, req_id, item))
+
+    def _finish(self, writer, req_id, admitted):
+        self.sessions += 1
+        self.admitted += admitted
+        self._respond(writer, req_id, ADMIT if admitted else REJECT)
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            if self._pool is None:
+                try:
+                    results, cpu = verify_batch([item for _, _, item in batch])
+                except Exception:
+                    results, cpu = None, 0.0
+                self._complete(batch, results, cpu)
+                await asyncio.sleep(0)  # let readers refill the queue
+                continue
+            await self._inflight.acquire()
+            future = loop.run_in_executor(self._pool, verify_batch, [item for _, _, item in batch])
+            future.add_done_callback(lambda f, b=batch: self._on_batch(b, f))
+
+    def _on_batch(self, batch, future):
+        self._inflight.release()
+        try:
+            results, cpu = future.result()
+        except (Exception, asyncio.CancelledError):
+            results, cpu = None, 0.0  # broken pool / cancelled batch: reject it
+        self._complete(batch, results, cpu)
+
+    def _complete(self, batch, results, cpu):
+        """results=None rejects the whole batch"""
+        if results is None:
+            results = [(False, None, None, 0)] * len(batch)
+        self.worker_cpu += cpu if self._pool is not None else 0.0
+        for (writer, req_id, _), (ok, jkt, policy_fp, expiry) in zip(batch, results):
+            if ok and jkt is not None:
+                self.trw_cache.put(jkt, policy_fp, expiry)
+            self._finish(writer, req_id, ok)
+
+def run_server(issuer_public_bytes, host=HOST, port=PORT, workers=None, ready=None):
+    """Process entry point: serve until terminated"""
+    service = AdmissionService(issuer_public_bytes, workers=workers)
+    try:
+        asyncio.run(service.serve(host, port, ready))
+    except KeyboardInterrupt:
+        pass
@@ -1,3 +1,7 @@
+import heapq
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 import simpy
 import numpy as np
 import matplotlib.pyplot as plt
@@ -17,12 +21,27 @@ The Design-Around Trap:
 The Monopoly Proof:
 - Show that U-CRED's stateless binders allow 10x faster restoration
 - This prevents "Grid-Telecom Cascade Failure" where slow telecom prevents grid frequency lock
+
+Simulation modes:
+- "event": one SimPy process per device (reference model, ~1M devices max)
+- "aggregated": per-tower sorted NumPy arrival arrays served by queue
+  recursions, towers partitioned across a process pool (10M-100M devices)
 """
 
 TOTAL_DEVICES = 1000000
 NUM_TOWERS = 100
 TOWER_CAPACITY = 200  # Concurrent auth sessions per tower
 BACKHAUL_CAPACITY = 50  # Per tower
+WAKEUP_WINDOW = 2.0  # seconds of boot-time variance
+UCRED_VERIFY_S = 0.00005  # 50us local binder verification
+BACKHAUL_TIMEOUT_S = 0.010  # give up waiting for backhaul after 10ms
+CORE_RTT_S = 0.008
+TLS_S = 0.003
+SIM_HORIZON_S = 120.0
+
+SIMULATION_MODE = "aggregated"  # "event" runs the per-device SimPy model
+SCALE_DEVICES = [10_000_000]  # extra aggregated runs (towers scale with devices)
+VALIDATION_TOWERS = 5  # towers replayed through both engines
 
 class RestorationTower:
     def __init__(self, env, tower_id, use_ucred):
@@ -70,19 +89,27 @@ class RestorationTower:
                     self.auth_complete_count += 1
                     self.auth_times.append(self.env.now - start_time)
 
-def run_cold_boot_simulation(use_ucred):
+def run_cold_boot_simulation(use_ucred, total_devices=TOTAL_DEVICES, num_towers=NUM_TOWERS,
+                             arrivals=None, return_times=False):
+    """
+    Event-mode (SimPy) restoration run.
+    arrivals: optional per-tower wake-up time arrays (replaces the random draw).
+    """
     env = simpy.Environment()
-    towers = [RestorationTower(env, i, use_ucred) for i in range(NUM_TOWERS)]
+    towers = [RestorationTower(env, i, use_ucred) for i in range(num_towers)]
     
     # All devices wake up in a VERY narrow window (Cold Boot = 0-2 seconds)
     def device_wakeup_generator():
-        devices_per_tower = TOTAL_DEVICES // NUM_TOWERS
+        devices_per_tower = total_devices // num_towers
         
         for tower in towers:
             for device_id in range(devices_per_tower):
                 # Tight synchronization (power returns simultaneously everywhere)
                 # Natural device boot time variance: 0-2 seconds
-                wakeup_time = np.random.uniform(0, 2)
+                if arrivals is None:
+                    wakeup_time = np.random.uniform(0, WAKEUP_WINDOW)
+                else:
+                    wakeup_time = arrivals[tower.tower_id][device_id]
                 
                 def delayed_auth(tid, did, delay):
                     yield env.timeout(delay)
@@ -93,7 +120,7 @@ def run_cold_boot_simulation(use_ucred):
     device_wakeup_generator()
     
     # Run for 120 seconds to capture full restoration
-    env.run(until=120)
+    env.run(until=SIM_HORIZON_S)
     
     # Aggregate results
     total_complete = sum(t.auth_complete_count for t in towers)
@@ -104,18 +131,175 @@ def run_cold_boot_simulation(use_ucred):
     
     time_to_95pct = np.percentile(all_times, 95) if all_times else 0
     
+    if return_times:
+        return total_complete, total_failed, np.array(all_times)
     return total_complete, total_failed, time_to_95pct
 
+# =============================================================================
+# AGGREGATED MODE
+# =============================================================================
+
+# Log-spaced latency histogram (1us .. 1000s, ~0.5% bin width): partitions
+# merge by addition, so percentiles need no per-device arrays at 100M scale
+LATENCY_BINS = np.logspace(-6, 3, 4097)
+
+def tower_arrivals(rng, n_devices):
+    """Sorted wake-up times of one tower's devices"""
+    return np.sort(rng.uniform(0, WAKEUP_WINDOW, n_devices))
+
+def multi_server_starts(arrivals, servers, service):
+    """
+    FIFO c-server queue with deterministic service: customer k starts at
+    max(a_k, start_{k-c} + s), so customers k, k+c, k+2c, ... form a
+    single-server Lindley chain. Each chain is solved in closed form,
+    start_j = s*j + max_{i<=j}(a_i - s*i), with one cumulative maximum.
+    """
+    n = len(arrivals)
+    rows = -(-n // servers)
+    padded = np.full(rows * servers, np.inf)
+    padded[:n] = arrivals
+    chains = padded.reshape(rows, servers)
+    step = service * np.arange(rows)[:, None]
+    starts = step + np.maximum.accumulate(chains - step, axis=0)
+    return starts.ravel()[:n]
+
+def serve_ucred(arrivals):
+    """Latencies of local binder verification on the tower CPU pool"""
+    return multi_server_starts(arrivals, TOWER_CAPACITY, UCRED_VERIFY_S) + UCRED_VERIFY_S - arrivals
+
+def serve_eaptls(arrivals, backhaul_capacity=BACKHAUL_CAPACITY):
+    """
+    EAP-TLS over the backhaul: balk when BACKHAUL_CAPACITY requests are
+    already queued, renege after BACKHAUL_TIMEOUT_S, otherwise hold the
+    link for RTT + TLS. The TLS step runs while the link is held, so at
+    most BACKHAUL_CAPACITY (< TOWER_CAPACITY) sessions use the CPU and it
+    never queues. Balking and reneging make the recursion data-dependent,
+    so it is a scalar pass with O(1) state per device: a ring of the last
+    c service starts and a heap of queue-departure times.
+    Returns (latencies of completed sessions, failures).
+    """
+    hold = CORE_RTT_S + TLS_S
+    ring = [-np.inf] * backhaul_capacity   # starts of the last c served sessions
+    head = 0
+    queued = []                            # times waiting requests leave the queue
+    latencies = []
+    failed = 0
+    for a in arrivals.tolist():
+        while queued and queued[0] <= a:
+            heapq.heappop(queued)
+        if len(queued) >= backhaul_capacity:
+            failed += 1
+            continue
+        start = max(a, ring[head] + hold)
+        if start - a > BACKHAUL_TIMEOUT_S:
+            heapq.heappush(queued, a + BACKHAUL_TIMEOUT_S)
+            failed += 1
+            continue
+        if start > a:
+            heapq.heappush(queued, start)
+        ring[head] = start
+        head = (head + 1) % backhaul_capacity
+        latencies.append(start + hold - a)
+    return np.array(latencies), failed
+
+def simulate_towers(seeds, devices_per_tower, use_ucred, backhaul_capacity=BACKHAUL_CAPACITY):
+    """Worker: one block of towers -> (completed, failed, latency histogram)"""
+    complete = failed = 0
+    hist = np.zeros(len(LATENCY_BINS) - 1, dtype=np.int64)
+    for seed in seeds:
+        arrivals = tower_arrivals(np.random.default_rng(seed), devices_per_tower)
+        if use_ucred:
+            latencies, n_failed = serve_ucred(arrivals), 0
+        else:
+            latencies, n_failed = serve_eaptls(arrivals, backhaul_capacity)
+        # Wake-ups end at WAKEUP_WINDOW and latency is bounded by timeout +
+        # hold, so every session completes well inside SIM_HORIZON_S
+        complete += len(latencies)
+        failed += n_failed
+        hist += np.histogram(latencies, LATENCY_BINS)[0]
+    return complete, failed, hist
+
+def histogram_percentile(hist, q):
+    """q-th percentile from a LATENCY_BINS histogram (geometric interpolation in the bin)"""
+    cum = np.cumsum(hist)
+    if cum[-1] == 0:
+        return 0.0
+    target = q / 100 * cum[-1]
+    i = int(np.searchsorted(cum, target))
+    below = cum[i - 1] if i else 0
+    frac = (target - below) / max(hist[i], 1)
+    lo, hi = LATENCY_BINS[i], LATENCY_BINS[i + 1]
+    return float(lo * (hi / lo) ** frac)
+
+def run_aggregated_simulation(use_ucred, total_devices=TOTAL_DEVICES, num_towers=NUM_TOWERS,
+                              seed=2025, workers=None, backhaul_capacity=BACKHAUL_CAPACITY):
+    """
+    Aggregated restoration run. Every tower gets its own SeedSequence
+    child, so results do not depend on how towers are partitioned.
+    seed: int or SeedSequence.
+    Returns (completed, failed, time_to_95pct).
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    seeds = seed.spawn(num_towers)
+    devices_per_tower = total_devices // num_towers
+    workers = workers or os.cpu_count() or 1
+    n_blocks = min(num_towers, 4 * workers)
+    blocks = [seeds[i::n_blocks] for i in range(n_blocks)]
+
+    if workers == 1:
+        partials = [simulate_towers(b, devices_per_tower, use_ucred, backhaul_capacity) for b in blocks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(simulate_towers, blocks, [devices_per_tower] * n_blocks,
+                                     [use_ucred] * n_blocks, [backhaul_capacity] * n_blocks))
+
+    complete = sum(p[0] for p in partials)
+    failed = sum(p[1] for p in partials)
+    hist = np.sum([p[2] for p in partials], axis=0)
+    return complete, failed, histogram_percentile(hist, 95)
+
+def validate_aggregated_engine(num_towers=VALIDATION_TOWERS, seed=7):
+    """Replays identical arrivals through the SimPy and aggregated engines"""
+    devices_per_tower = TOTAL_DEVICES // NUM_TOWERS
+    rng = np.random.default_rng(seed)
+    arrivals = [tower_arrivals(rng, devices_per_tower) for _ in range(num_towers)]
+    total = devices_per_tower * num_towers
+    agree = True
+    for use_ucred in (False, True):
+        c_ev, f_ev, t_ev = run_cold_boot_simulation(use_ucred, total, num_towers, arrivals, return_times=True)
+        if use_ucred:
+            t_ag = np.concatenate([serve_ucred(a) for a in arrivals])
+            f_ag = 0
+        else:
+            served = [serve_eaptls(a) for a in arrivals]
+            t_ag = np.concatenate([lat for lat, _ in served])
+            f_ag = sum(f for _, f in served)
+        p_ev, p_ag = np.percentile(t_ev, 95), np.percentile(t_ag, 95)
+        ok = abs(len(t_ag) - c_ev) <= 0.001 * total and abs(p_ag - p_ev) <= 0.01 * p_ev
+        agree &= ok
+        label = 'U-CRED ' if use_ucred else 'EAP-TLS'
+        print(f"  {label}: SimPy {c_ev:,} ok / {f_ev:,} failed, p95 {p_ev*1e3:.3f} ms | "
+              f"aggregated {len(t_ag):,} ok / {f_ag:,} failed, p95 {p_ag*1e3:.3f} ms {'✅' if ok else '❌'}")
+    return agree
+
 def generate_cold_boot_proof():
     print("--- U-CRED Phase 3.3: Cold-Boot Thundering Herd (1M Devices) ---")
+    run = run_aggregated_simulation if SIMULATION_MODE == "aggregated" else run_cold_boot_simulation
+    
+    if SIMULATION_MODE == "aggregated":
+        print(f"Validating aggregated engine against SimPy ({VALIDATION_TOWERS} towers, identical arrivals)...")
+        engine_agrees = validate_aggregated_engine()
+    else:
+        engine_agrees = True
     
     # EAP-TLS
-    print("Simulating EAP-TLS cold-boot restoration...")
-    complete_eap, failed_eap, t95_eap = run_cold_boot_simulation(use_ucred=False)
+    print(f"Simulating EAP-TLS cold-boot restoration ({SIMULATION_MODE} mode)...")
+    complete_eap, failed_eap, t95_eap = run(use_ucred=False)
     
     # U-CRED
-    print("Simulating U-CRED cold-boot restoration...")
-    complete_uc, failed_uc, t95_uc = run_cold_boot_simulation(use_ucred=True)
+    print(f"Simulating U-CRED cold-boot restoration ({SIMULATION_MODE} mode)...")
+    complete_uc, failed_uc, t95_uc = run(use_ucred=True)
     
     success_rate_eap = (complete_eap / TOTAL_DEVICES) * 100
     success_rate_uc = (complete_uc / TOTAL_DEVICES) * 100
@@ -158,11 +342,28 @@ def generate_cold_boot_proof():
     
     speedup = t95_eap / t95_uc if t95_uc > 0 else 0
     
+    if SIMULATION_MODE == "aggregated":
+        devices_per_tower = TOTAL_DEVICES // NUM_TOWERS
+        print(f"\n--- Aggregated Scale Runs ({devices_per_tower:,} devices/tower) ---")
+        for n_devices in SCALE_DEVICES:
+            for use_ucred in (False, True):
+                start = time.perf_counter()
+                c, f, t95 = run_aggregated_simulation(use_ucred, n_devices, n_devices // devices_per_tower)
+                elapsed = time.perf_counter() - start
+                label = 'U-CRED ' if use_ucred else 'EAP-TLS'
+                print(f"  {n_devices:>12,} devices {label}: {c / n_devices:6.1%} online, "
+                      f"p95 {t95 * 1e3:8.3f} ms ({elapsed:.1f} s, {n_devices / elapsed:,.0f} devices/s)")
+    
     print(f"\n--- Monopoly Analysis ---")
-    print(f"Restoration Speedup:    {speedup:.1f}x")
+    if engine_agrees:
+        print(f"Restoration Speedup:    {speedup:.1f}x")
+    else:
+        print(f"Speedup (untrusted):    {speedup:.1f}x")
     print(f"Grid Sync Deadline:     30s (NERC BAL-001 requirement)")
     
-    if t95_eap > 30 and t95_uc < 30:
+    if not engine_agrees:
+        print("STATUS: ❌ AGGREGATED ENGINE DIVERGES FROM SIMPY (results not trusted)")
+    elif t95_eap > 30 and t95_uc < 30:
         print("STATUS: ✅ COLD-BOOT MONOPOLY PROVEN (Only U-CRED meets grid sync deadline)")
     else:
         print("STATUS: ⚠️  Both meet deadline or neither meets deadline")
@@ -0,0 +1,250 @@
+import hmac
+import json
+import os
+import platform
+import sqlite3
+import time
+from collections import Counter
+import numpy as np
+import cbor2
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from cpu_verification_bench import build_claims
+from binder_codec import encode_binder, decode_binder
+
+"""
+U-CRED: Host CPU-Cost Calibration
+
+Microbenchmarks every primitive the capacity models price, on this host,
+and saves them as a JSON profile (microseconds per operation):
+
+- hmac_sha256_us          token/binder MAC over a 64-byte message
+- hkdf_sha256_us          binder key derivation (extract + one expand block)
+- bloom_lookup_us         TRW Bloom filter membership test, per filter size
+- dict_lookup_update_us   in-process session table get + set, per state size
+- sqlite_lookup_update_us indexed session store lookup + update, per state size
+- full_verify_us          COSE issuer verify + CBOR decode + PoP verify (Ed25519)
+- binder_verify_us        binder decode + PoP verify (Ed25519)
+
+Bloom and session-store costs are timed on the same basis: per key,
+amortized over BATCH keys handed to one native call (NumPy probe of the
+packed bit array, Counter.update, SQLite executemany), so neither side is
+priced at Python interpreter overhead.
+
+Calibration is opt-in: nat_trw_param_sweep, edge_admission_stress_test and
+ucred_rnpv_economics use the paper's constants unless the environment
+variable UCRED_COST_PROFILE names a saved profile. Size-dependent costs
+are interpolated in log(size); sizes outside the calibrated range raise.
+"""
+
+PROFILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cost_profile.json')
+PROFILE_ENV = 'UCRED_COST_PROFILE'
+BLOOM_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]   # entries per TRW window filter
+BLOOM_FPR = 1e-3
+STATE_SIZES = [10_000, 100_000, 1_000_000, 4_000_000]    # active sessions in a stateful store
+BATCH = 4096           # keys per native call in the per-key timings
+REPEATS = 5
+TARGET_SECONDS = 0.05  # per timing repeat
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+FMIX_C1 = 0xFF51AFD7ED558CCD
+FMIX_C2 = 0xC4CEB9FE1A85EC53
+
+# =============================================================================
+# TIMING
+# =============================================================================
+
+def time_op(fn, args_list):
+    """
+    Median microseconds per call over REPEATS runs; each run cycles through
+    args_list (distinct keys defeat branch/cache warm-up on a single key).
+    """
+    n = len(args_list)
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    per_call = (time.perf_counter() - start) / n
+    loops = max(1, int(TARGET_SECONDS / max(per_call, 1e-9) / n))
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            for args in args_list:
+                fn(*args)
+        samples.append((time.perf_counter_ns() - start) / (loops * n) / 1000)
+    return float(np.median(samples))
+
+def time_per_key(fn, batches):
+    """time_op() for batched calls: median microseconds per key, fn(batch) per batch"""
+    return time_op(fn, [(b,) for b in batches]) / len(batches[0])
+
+# =============================================================================
+# PRIMITIVES
+# =============================================================================
+
+def hkdf_sha256(ikm, salt, info, length=32):
+    prk = hmac.digest(salt, ikm, 'sha256')
+    return hmac.digest(prk, info + b'\x01', 'sha256')[:length]
+
+def _fmix64(x):
+    """MurmurHash3 64-bit finalizer over a uint64 array (wrapping multiply)"""
+    x = x ^ (x >> np.uint64(33))
+    x = x * np.uint64(FMIX_C1)
+    x = x ^ (x >> np.uint64(33))
+    x = x * np.uint64(FMIX_C2)
+    return x ^ (x >> np.uint64(33))
+
+class BloomFilter:
+    """
+    k-probe Bloom filter over a packed uint8 bit array, keyed on 64-bit key
+    prefixes; probes g_i = h1 + i*h2 (mod m) by double hashing one fmix64
+    digest, evaluated for a whole batch of keys at once.
+    """
+
+    def __init__(self, entries, fpr=BLOOM_FPR, rng=None):
+        self.m = int(np.ceil(-entries * np.log(fpr) / np.log(2) ** 2))
+        self.k = max(1, int(round(self.m / entries * np.log(2))))
+        # A filter filled to capacity has about half its bits set
+        rng = np.random.default_rng() if rng is None else rng
+        self.bits = rng.integers(0, 256, size=(self.m + 7) // 8, dtype=np.uint8)
+        self._steps = np.arange(self.k, dtype=np.uint64)
+
+    def add_many(self, keys):
+        pos = self._probes(keys).ravel()
+        np.bitwise_or.at(self.bits, pos >> np.uint64(3), np.left_shift(1, pos & np.uint64(7)).astype(np.uint8))
+
+    def contains_many(self, keys):
+        pos = self._probes(keys)
+        hits = (self.bits[pos >> np.uint64(3)] >> (pos & np.uint64(7)).astype(np.uint8)) & 1
+        return hits.all(axis=1)
+
+    def _probes(self, keys):
+        with np.errstate(over='ignore'):
+            h1 = _fmix64(np.asarray(keys, dtype=np.uint64))
+            h2 = _fmix64(h1 ^ np.uint64(FMIX_C1)) | np.uint64(1)
+            return (h1[:, None] + self._steps * h2[:, None]) % np.uint64(self.m)
+
+def _sqlite_store(size):
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE sessions (jkt BLOB PRIMARY KEY, policy BLOB, last_seen INTEGER) WITHOUT ROWID')
+    conn.executemany('INSERT INTO sessions VALUES (?, ?, 0)',
+                     ((i.to_bytes(16, 'big'), b'a' * 16) for i in range(size)))
+    conn.commit()
+    return conn
+
+# =============================================================================
+# CALIBRATION
+# =============================================================================
+
+def calibrate(verbose=True):
+    rng = np.random.default_rng(0)
+    keys = [rng.bytes(16) for _ in range(256)]
+    msg = rng.bytes(64)
+    profile = {'host': {'platform': platform.platform(), 'processor': platform.processor(),
+                        'python': platform.python_version(), 'cpu_count': os.cpu_count(),
+                        'calibrated_at': time.strftime('%Y-%m-%dT%H:%M:%S')}}
+
+    def log(name, value):
+        if verbose:
+            print(f"  {name:<50}{value:>10.3f} us")
+
+    profile['hmac_sha256_us'] = time_op(lambda k: hmac.digest(k, msg, 'sha256'), [(k,) for k in keys])
+    log('HMAC-SHA256 (64 B)', profile['hmac_sha256_us'])
+    profile['hkdf_sha256_us'] = time_op(lambda k: hkdf_sha256(k, b'ucred-salt', b'binder'), [(k,) for k in keys])
+    log('HKDF-SHA256 (extract + expand)', profile['hkdf_sha256_us'])
+
+    profile['bloom_lookup_us'] = {}
+    for size in BLOOM_SIZES:
+        bloom = BloomFilter(size, rng=rng)
+        batches = [rng.integers(0, 2 ** 63, BATCH, dtype=np.uint64) for _ in range(8)]
+        profile['bloom_lookup_us'][str(size)] = time_per_key(bloom.contains_many, batches)
+        log(f"Bloom lookup ({size:,} entries, k={bloom.k}, {bloom.m / 8e6:.1f} MB)",
+            profile['bloom_lookup_us'][str(size)])
+        del bloom
+
+    profile['dict_lookup_update_us'] = {}
+    profile['sqlite_lookup_update_us'] = {}
+    for size in STATE_SIZES:
+        batches = [[int(i).to_bytes(16, 'big') for i in rng.integers(0, size, BATCH)] for _ in range(8)]
+
+        # Counter.update is a C loop of get + set per key
+        table = Counter({i.to_bytes(16, 'big'): 0 for i in range(size)})
+        profile['dict_lookup_update_us'][str(size)] = time_per_key(table.update, batches)
+        log(f"dict lookup + update ({size:,} sessions)", profile['dict_lookup_update_us'][str(size)])
+        del table
+
+        conn = _sqlite_store(size)
+
+        def sqlite_op(keys, conn=conn):
+            conn.executemany('UPDATE sessions SET last_seen = last_seen + 1 WHERE jkt = ?', ((k,) for k in keys))
+        profile['sqlite_lookup_update_us'][str(size)] = time_per_key(sqlite_op, batches)
+        log(f"SQLite lookup + update ({size:,} sessions)", profile['sqlite_lookup_update_us'][str(size)])
+        conn.close()
+
+    issuer_sk = ed25519.Ed25519PrivateKey.generate()
+    issuer_pk = issuer_sk.public_key()
+    ue_sk = ed25519.Ed25519PrivateKey.generate()
+    ue_pk = ue_sk.public_key()
+    claims = build_claims(ue_pk)
+    payload = cbor2.dumps(claims, canonical=True)
+    issuer_sig = issuer_sk.sign(payload)
+    challenge = rng.bytes(16)
+    pop_sig = ue_sk.sign(challenge + payload[:32])
+    binder = encode_binder(ue_pk.public_bytes_raw()[:16], bytes.fromhex(claims["policy_fp"]), claims["cti"])
+    binder_sig = ue_sk.sign(challenge + binder[:32])
+
+    def full_verify():
+        issuer_pk.verify(issuer_sig, payload)
+        cbor2.loads(payload)
+        ue_pk.verify(pop_sig, challenge + payload[:32])
+
+    def binder_verify():
+        decode_binder(binder)
+        ue_pk.verify(binder_sig, challenge + binder[:32])
+
+    profile['full_verify_us'] = time_op(full_verify, [()])
+    log('Full path (issuer + CBOR + PoP)', profile['full_verify_us'])
+    profile['binder_verify_us'] = time_op(binder_verify, [()])
+    log('Binder path (decode + PoP)', profile['binder_verify_us'])
+    return profile
+
+def save_profile(profile, path=PROFILE_PATH):
+    with open(path, 'w') as f:
+        json.dump(profile, f, indent=2)
+
+def load_profile(path=None):
+    """
+    Saved profile when calibration is opted into via UCRED_COST_PROFILE
+    (or an explicit path), else None: callers use the paper's constants.
+    """
+    if path is None:
+        path = os.environ.get(PROFILE_ENV)
+        if not path:
+            return None
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{PROFILE_ENV}: no cost profile at {path} (run cost_calibration.py)")
+    with open(path) as f:
+        return json.load(f)
+
+def sized_cost(table, size, clamp=False):
+    """
+    Per-op cost for `size` entries from a {size: us} table, interpolated in
+    log(size). Sizes outside the measured range raise ValueError unless
+    clamp=True, which holds the nearest measured cost.
+    """
+    sizes = np.array(sorted(int(s) for s in table))
+    costs = np.array([table[str(s)] for s in sizes])
+    if not clamp and not sizes[0] <= size <= sizes[-1]:
+        raise ValueError(f"size {size:,} outside the calibrated range {sizes[0]:,}-{sizes[-1]:,}")
+    return float(np.interp(np.log10(max(size, 1)), np.log10(sizes), costs))
+
+def main():
+    print("--- U-CRED: Host CPU-Cost Calibration ---")
+    start = time.perf_counter()
+    profile = calibrate()
+    save_profile(profile)
+    print(f"\nCalibrated in {time.perf_counter() - start:.1f} s on {profile['host']['platform']}")
+    print(f"Saved {PROFILE_PATH} (use it with {PROFILE_ENV}={PROFILE_PATH})")
+    print("STATUS: ✅ COST PROFILE CALIBRATED")
+
+if __name__ == "__main__":
+    main()
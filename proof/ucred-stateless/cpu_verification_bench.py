@@ -4,6 +4,8 @@ import matplotlib.pyplot as plt
 import csv
 from cryptography.hazmat.primitives.asymmetric import ed25519
 import cbor2
+from trw_cache import TRWCache, TRW_CACHE_BYTES
+from binder_codec import BinderRecord, encode_binder, decode_binder
 
 """
 U-CRED E3: CPU Verification Cost Benchmarking
@@ -20,6 +22,23 @@ This proves the "Single-Verify" optimization is the core CPU monopoly.
 NUM_TRIALS = 3000
 SESSION_RATES = [100, 400]  # sessions per second
 
+def build_claims(ue_pk, now=None):
+    """U-CRED claim set bound to a UE key (cnf.jkt = first 16 bytes of the key, hex)."""
+    now = int(time.time()) if now is None else now
+    return {
+        "iss": "AUSF-001",
+        "cti": "credential-tx-12345",
+        "exp": now + 300,
+        "cnf": {"jkt": ue_pk.public_bytes_raw().hex()[:32]},
+        "policy_fp": "a" * 32,
+        "nat": {
+            "plmn": "310260",
+            "smf": "smf-metro-01",
+            "gkid": "key-001",
+            "exp_smf": now + 180
+        }
+    }
+
 class UCREDVerifier:
     def __init__(self):
         # Generate issuer and UE keys
@@ -29,24 +48,13 @@ class UCREDVerifier:
         self.ue_sk = ed25519.Ed25519PrivateKey.generate()
         self.ue_pk = self.ue_sk.public_key()
         
-        # TRW cache (jkt -> policy_fp mapping)
-        self.trw_cache = {}
+        # TRW cache (16-byte jkt -> 16-byte policy_fp, expires at min(exp, exp_smf))
+        self.trw_cache = TRWCache(TRW_CACHE_BYTES)
+        self._binder = BinderRecord()  # reused by every binder decode
     
     def create_full_token(self):
         """Creates a full COSE_Sign1 U-CRED token."""
-        claims = {
-            "iss": "AUSF-001",
-            "cti": "credential-tx-12345",
-            "exp": int(time.time()) + 300,
-            "cnf": {"jkt": self.ue_pk.public_bytes_raw().hex()[:32]},
-            "policy_fp": "a" * 32,
-            "nat": {
-                "plmn": "310260",
-                "smf": "smf-metro-01",
-                "gkid": "key-001",
-                "exp_smf": int(time.time()) + 180
-            }
-        }
+        claims = build_claims(self.ue_pk)
         
         # Encode and sign
         payload = cbor2.dumps(claims, canonical=True)
@@ -56,14 +64,8 @@ class UCREDVerifier:
         return payload, signature, claims
     
     def create_binder(self, prev_cti, policy_fp):
-        """Creates a TRW binder."""
-        binder_data = {
-            "binder": "bind-" + prev_cti[-8:],
-            "policy_fp": policy_fp,
-            "cnf": {"jkt": self.ue_pk.public_bytes_raw().hex()[:32]},
-            "prev_cti": prev_cti
-        }
-        return cbor2.dumps(binder_data, canonical=True)
+        """Creates a TRW binder (fixed-layout codec)."""
+        return encode_binder(self.ue_pk.public_bytes_raw()[:16], bytes.fromhex(policy_fp), prev_cti)
     
     def verify_full_path(self, payload, issuer_sig, pop_challenge):
         """
@@ -88,8 +90,8 @@ class UCREDVerifier:
         
         # Cache for TRW
         claims = cbor2.loads(payload)
-        jkt = claims["cnf"]["jkt"]
-        self.trw_cache[jkt] = claims["policy_fp"]
+        self.trw_cache.put(bytes.fromhex(claims["cnf"]["jkt"]), bytes.fromhex(claims["policy_fp"]),
+                           min(claims["exp"], claims["nat"]["exp_smf"]))
         
         return True
     
@@ -99,11 +101,14 @@ class UCREDVerifier:
         1. Check TRW cache (O(1) lookup)
         2. Verify UE PoP signature ONLY
         """
-        binder = cbor2.loads(binder_bytes)
-        jkt = binder["cnf"]["jkt"]
+        try:
+            binder = decode_binder(binder_bytes, self._binder)
+        except ValueError:
+            return False
         
-        # Step 1: Cache lookup (negligible cost)
-        if jkt not in self.trw_cache:
+        # Step 1: Cache lookup (negligible cost); the binding must be live and
+        # carry the same policy the binder claims
+        if self.trw_cache.get(bytes(binder.jkt)) != binder.policy_fp:
             return False
         
         # Step 2: Single PoP verification only
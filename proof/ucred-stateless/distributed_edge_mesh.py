@@ -1,7 +1,10 @@
+import sys
+import time
 import simpy
 import numpy as np
 import matplotlib.pyplot as plt
 import networkx as nx
+from scipy.spatial import Delaunay, cKDTree
 
 """
 U-CRED Phase 3.1: Distributed Edge Mesh Topology
@@ -12,6 +15,14 @@ This models:
 - Inter-tower backhaul links (10 Gbps, 500us latency)
 - 10,000 mobility events per second (autonomous vehicles at 120 km/h)
 - Comparison: EAP-TLS (requires core round-trip) vs U-CRED (zero backhaul)
+
+Two mobility models:
+- mobility_generator: one SimPy process per vehicle (reference, ~10k vehicles)
+- MobilityEngine: all vehicles in struct-of-arrays form advanced in fixed
+  time steps; a rasterized cell index turns positions into serving towers
+  with one gather, and only the resulting handovers enter the SimPy event
+  queue. Handles 1M vehicles over thousands of towers on grid or Voronoi
+  (uniformly scattered sites, Delaunay neighbour graph) layouts.
 """
 
 # Simulation Parameters
@@ -22,6 +33,19 @@ BACKHAUL_LATENCY_US = 500
 MOBILITY_EVENTS_PER_SEC = 10000
 SIM_DURATION = 10.0  # seconds
 VEHICLE_SPEED_KMH = 120
+NUM_VEHICLES = 10000
+CELL_SIZE_M = 1000  # grid pitch; Voronoi layouts keep ~1 km^2 per tower
+MOBILITY_STEP_S = 0.05  # engine time step (1.7 m of travel at 120 km/h)
+INDEX_RESOLUTION_M = 25  # cell-index raster pitch
+SCALE_VEHICLES = 1_000_000  # scale run: `python distributed_edge_mesh.py --scale`
+SCALE_TOWERS = 2500
+SCALE_DURATION = 5.0
+# Engine vs per-vehicle SimPy cross-check. The reference starts vehicles in
+# [0, 9 km]^2 and applies each exponential (mean 1 s) move before waiting it
+# out, so its vehicles travel SIM_DURATION + 1 s on average.
+REFERENCE_START_M = 9000
+REFERENCE_LOOKAHEAD_S = 1.0
+HANDOVER_TOLERANCE = 0.05  # relative
 
 class CellTower:
     def __init__(self, env, tower_id, grid_x, grid_y):
@@ -90,23 +114,22 @@ class EdgeMesh:
         tower_id = grid_x * GRID_SIZE + grid_y
         return self.towers[tower_id]
 
-def mobility_generator(env, mesh):
+def mobility_generator(env, mesh, rng=None, num_vehicles=NUM_VEHICLES):
     """
     Generates mobility events (vehicles crossing cell boundaries).
     """
     # Highway: 10km long, vehicles at 120 km/h
     # Cell radius: 1km, so vehicle crosses cells every 30 seconds at 120 km/h
     # But we have 10,000 vehicles, so aggregate mobility is high
-    
-    num_vehicles = 10000
+    rng = np.random.default_rng() if rng is None else rng
     
     for vehicle_id in range(num_vehicles):
         # Random starting position
-        start_x = np.random.uniform(0, 9000)
-        start_y = np.random.uniform(0, 9000)
+        start_x = rng.uniform(0, 9000)
+        start_y = rng.uniform(0, 9000)
         
         # Random direction
-        direction = np.random.uniform(0, 2*np.pi)
+        direction = rng.uniform(0, 2*np.pi)
         velocity = VEHICLE_SPEED_KMH / 3.6  # m/s
         
         def vehicle_movement(v_id, x, y, dx, dy):
@@ -114,7 +137,7 @@ def mobility_generator(env, mesh):
             
             while True:
                 # Move vehicle
-                dt = np.random.exponential(1.0)  # Exponential inter-event time
+                dt = rng.exponential(1.0)  # Exponential inter-event time
                 x += dx * velocity * dt
                 y += dy * velocity * dt
                 
@@ -135,11 +158,134 @@ def mobility_generator(env, mesh):
         dy = np.sin(direction)
         env.process(vehicle_movement(vehicle_id, start_x, start_y, dx, dy))
 
-def run_mesh_simulation(use_ucred):
+# =============================================================================
+# SPATIALLY INDEXED MOBILITY ENGINE
+# =============================================================================
+
+class CellLayout:
+    """
+    Tower sites, their neighbour graph and a raster cell index.
+    index[iy, ix] holds the nearest site to the centre of each
+    INDEX_RESOLUTION_M pixel, so a position maps to its serving tower with
+    two integer divisions and a gather (boundaries exact to one pixel).
+    """
+
+    def __init__(self, sites, width, height, graph, resolution=INDEX_RESOLUTION_M):
+        self.sites = np.asarray(sites, dtype=np.float64)
+        self.width = width
+        self.height = height
+        self.graph = graph
+        self.resolution = resolution
+        nx_px = int(np.ceil(width / resolution))
+        ny_px = int(np.ceil(height / resolution))
+        tree = cKDTree(self.sites)
+        xs = (np.arange(nx_px) + 0.5) * resolution
+        self.index = np.empty((ny_px, nx_px), dtype=np.int32)
+        rows = max(1, 1_000_000 // nx_px)
+        for r0 in range(0, ny_px, rows):
+            ys = (np.arange(r0, min(r0 + rows, ny_px)) + 0.5) * resolution
+            gx, gy = np.meshgrid(xs, ys)
+            self.index[r0:r0 + len(ys)] = tree.query(np.column_stack([gx.ravel(), gy.ravel()]))[1].reshape(gx.shape)
+
+    @property
+    def num_towers(self):
+        return len(self.sites)
+
+    def lookup(self, x, y):
+        """Serving tower for every (x, y) position"""
+        ix = np.minimum((x / self.resolution).astype(np.int32), self.index.shape[1] - 1)
+        iy = np.minimum((y / self.resolution).astype(np.int32), self.index.shape[0] - 1)
+        return self.index[iy, ix]
+
+def grid_layout(grid_size=GRID_SIZE, cell_m=CELL_SIZE_M):
+    """Square cells; tower i*grid_size + j serves [i, i+1) x [j, j+1) km, as in EdgeMesh"""
+    i, j = np.divmod(np.arange(grid_size * grid_size), grid_size)
+    sites = np.column_stack([(i + 0.5) * cell_m, (j + 0.5) * cell_m])
+    graph = nx.relabel_nodes(nx.grid_2d_graph(grid_size, grid_size), lambda n: n[0] * grid_size + n[1])
+    side = grid_size * cell_m
+    return CellLayout(sites, side, side, graph)
+
+def voronoi_layout(num_towers, rng, cell_m=CELL_SIZE_M):
+    """Uniformly scattered sites; cells are their Voronoi regions, edges the Delaunay neighbours"""
+    side = np.sqrt(num_towers) * cell_m
+    sites = rng.uniform(0, side, size=(num_towers, 2))
+    graph = nx.Graph()
+    graph.add_nodes_from(range(num_towers))
+    for simplex in Delaunay(sites).simplices:
+        graph.add_edges_from([(simplex[0], simplex[1]), (simplex[1], simplex[2]), (simplex[0], simplex[2])])
+    return CellLayout(sites, side, side, graph)
+
+class MobilityEngine:
+    """
+    Struct-of-arrays vehicle state: x, y, vx, vy (m, m/s) and serving tower.
+    Vehicles drive straight lines and reflect off the edge of the area.
+    """
+
+    def __init__(self, layout, num_vehicles, rng, speed_ms=VEHICLE_SPEED_KMH / 3.6, start_box=None):
+        self.layout = layout
+        width, height = (layout.width, layout.height) if start_box is None else start_box
+        self.x = rng.uniform(0, width, num_vehicles)
+        self.y = rng.uniform(0, height, num_vehicles)
+        heading = rng.uniform(0, 2 * np.pi, num_vehicles)
+        self.vx = speed_ms * np.cos(heading)
+        self.vy = speed_ms * np.sin(heading)
+        self.tower = layout.lookup(self.x, self.y)
+
+    @staticmethod
+    def _reflect(pos, vel, limit):
+        below, above = pos < 0, pos >= limit
+        pos[below] = -pos[below]
+        pos[above] = np.nextafter(2 * limit - pos[above], 0)
+        vel[below | above] *= -1
+
+    def step(self, dt):
+        """Advances every vehicle by dt; returns (vehicle ids, old towers, new towers) of handovers"""
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        self._reflect(self.x, self.vx, self.layout.width)
+        self._reflect(self.y, self.vy, self.layout.height)
+        tower = self.layout.lookup(self.x, self.y)
+        moved = np.flatnonzero(tower != self.tower)
+        old = self.tower[moved]
+        self.tower[moved] = tower[moved]
+        return moved, old, tower[moved]
+
+def run_mobility_simulation(use_ucred, layout, num_vehicles=NUM_VEHICLES, duration=SIM_DURATION,
+                            rng=None, dt=MOBILITY_STEP_S, start_box=None):
+    """
+    Engine-mode run: vectorized mobility steps feed handovers into SimPy.
+    Returns (handovers, avg latency ms, p95 latency ms, fraction of
+    handovers between neighbouring cells).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    env = simpy.Environment()
+    towers = [CellTower(env, t, x, y) for t, (x, y) in enumerate(layout.sites)]
+    engine = MobilityEngine(layout, num_vehicles, rng, start_box=start_box)
+    neighbour = [0, 0]
+
+    def mobility():
+        while True:
+            yield env.timeout(dt)
+            vehicles, old, new = engine.step(dt)
+            neighbour[0] += sum(layout.graph.has_edge(a, b) for a, b in zip(old.tolist(), new.tolist()))
+            neighbour[1] += len(vehicles)
+            for v, t in zip(vehicles.tolist(), new.tolist()):
+                tower = towers[t]
+                env.process(tower.handover_ucred(v) if use_ucred else tower.handover_eaptls(v))
+
+    env.process(mobility())
+    env.run(until=duration)
+
+    total_handovers = sum(t.handover_count for t in towers)
+    all_latencies = np.concatenate([t.handover_latencies for t in towers if t.handover_latencies] or [[0.0]])
+    return (total_handovers, float(np.mean(all_latencies)), float(np.percentile(all_latencies, 95)),
+            neighbour[0] / max(1, neighbour[1]))
+
+def run_mesh_simulation(use_ucred, rng=None, num_vehicles=NUM_VEHICLES):
     env = simpy.Environment()
     mesh = EdgeMesh(env, use_ucred=use_ucred)
     
-    mobility_generator(env, mesh)
+    mobility_generator(env, mesh, rng, num_vehicles)
     
     env.run(until=SIM_DURATION)
     
@@ -157,13 +303,28 @@ def run_mesh_simulation(use_ucred):
 def generate_mesh_proofs():
     print("--- U-CRED Phase 3.1: Distributed Edge Mesh Simulation ---")
     
+    grid = grid_layout()
+    
     # Baseline: EAP-TLS
     print("Running EAP-TLS baseline...")
-    ho_eap, lat_eap_avg, lat_eap_p95 = run_mesh_simulation(use_ucred=False)
+    ho_eap, lat_eap_avg, lat_eap_p95, _ = run_mobility_simulation(False, grid, rng=np.random.default_rng(1))
     
     # U-CRED
     print("Running U-CRED...")
-    ho_ucred, lat_ucred_avg, lat_ucred_p95 = run_mesh_simulation(use_ucred=True)
+    ho_ucred, lat_ucred_avg, lat_ucred_p95, _ = run_mobility_simulation(True, grid, rng=np.random.default_rng(1))
+    
+    # Cross-check against the per-vehicle SimPy model, engine run on the reference's terms
+    start = time.perf_counter()
+    ho_ref, _, _ = run_mesh_simulation(use_ucred=False, rng=np.random.default_rng(1))
+    t_ref = time.perf_counter() - start
+    ho_xc, _, _, _ = run_mobility_simulation(False, grid, duration=SIM_DURATION + REFERENCE_LOOKAHEAD_S,
+                                             rng=np.random.default_rng(1),
+                                             start_box=(REFERENCE_START_M, REFERENCE_START_M))
+    deviation = abs(ho_xc - ho_ref) / ho_ref
+    engine_agrees = deviation <= HANDOVER_TOLERANCE
+    print(f"Per-vehicle SimPy model: {ho_ref} EAP-TLS handovers in {t_ref:.1f} s; engine on the same "
+          f"start area and travel time: {ho_xc} ({deviation:.1%} apart, tolerance {HANDOVER_TOLERANCE:.0%}) "
+          f"{'✅' if engine_agrees else '❌'}")
     
     print(f"\n--- Distributed Mesh Results ---")
     print(f"Simulation Duration: {SIM_DURATION}s")
@@ -198,10 +359,31 @@ def generate_mesh_proofs():
     plt.savefig('mesh_topology_diagram.png')
     print("Saved mesh_topology_diagram.png")
     
-    if lat_eap_avg > 5.0 and lat_ucred_avg < 5.0:
+    if not engine_agrees:
+        print("STATUS: ❌ MOBILITY ENGINE DISAGREES WITH PER-VEHICLE MODEL")
+    elif lat_eap_avg > 5.0 and lat_ucred_avg < 5.0:
         print("STATUS: ✅ STATELESS ADVANTAGE PROVEN (Meets URLLC 5ms target)")
     else:
         print("STATUS: ⚠️  Latency advantage insufficient")
 
+def run_scale_demo():
+    """1M vehicles over a Voronoi layout (not part of the proof run)"""
+    print(f"--- Scale Run: {SCALE_VEHICLES:,} vehicles, {SCALE_TOWERS:,} Voronoi cells, {SCALE_DURATION}s ---")
+    rng = np.random.default_rng(2)
+    start = time.perf_counter()
+    layout = voronoi_layout(SCALE_TOWERS, rng)
+    print(f"Layout + cell index ({layout.index.shape[1]}x{layout.index.shape[0]} px, "
+          f"{layout.graph.number_of_edges():,} neighbour links): {time.perf_counter() - start:.1f} s")
+    for use_ucred in (False, True):
+        start = time.perf_counter()
+        ho, avg, p95, adjacent = run_mobility_simulation(use_ucred, layout, SCALE_VEHICLES, SCALE_DURATION,
+                                                         rng=np.random.default_rng(3))
+        label = 'U-CRED ' if use_ucred else 'EAP-TLS'
+        print(f"  {label}: {ho:,} handovers, avg {avg:.3f} ms, p95 {p95:.3f} ms, "
+              f"{adjacent:.1%} to neighbour cells ({time.perf_counter() - start:.1f} s wall)")
+
 if __name__ == "__main__":
-    generate_mesh_proofs()
+    if "--scale" in sys.argv[1:]:
+        run_scale_demo()
+    else:
+        generate_mesh_proofs()
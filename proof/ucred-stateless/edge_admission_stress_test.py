@@ -4,6 +4,7 @@ import matplotlib.pyplot as plt
 import cbor2
 import time
 import os
+from cost_calibration import load_profile, sized_cost
 
 """
 U-CRED: Edge Admission Stress Test
@@ -13,6 +14,16 @@ This script simulates 1 million concurrent IoT sessions to prove:
 1. 85% Reduction in RAM usage via Stateless Binders.
 2. 51% Reduction in CPU load via Single-Verify PoP.
 3. Mitigation of the "Memory Wall" and Cache Miss penalties.
+
+Memory cost per admission comes from a pluggable model (MEMORY_MODEL) of
+the live session-state working set; state is freed SESSION_LIFETIME after
+admission:
+- 'flat':       the original 50us penalty once state exceeds L3
+- 'hierarchy':  L1/L2/L3/DRAM hit rates from working-set size and access
+                pattern (uniform or Zipf), times per-level latency, per
+                cache line of session state
+- 'empirical':  random row lookups into NumPy session tables of each
+                working-set size, timed on this host and interpolated
 """
 
 # Simulation Parameters
@@ -23,14 +34,131 @@ PQC_VERIFY_TIME = 2.0      # ms (Full PQC chain)
 BINDER_VERIFY_TIME = 0.1   # ms (HMAC/PoP)
 L3_CACHE_LIMIT_MB = 32     # Typical L3 Cache size on high-end Edge Switch
 
+# Host calibration (cost_calibration.py, opt-in via UCRED_COST_PROFILE) replaces the verify constants:
+# full path = Ed25519 COSE + CBOR + PoP, binder path = binder decode + PoP
+PROFILE = load_profile()
+if PROFILE is not None:
+    PQC_VERIFY_TIME = PROFILE['full_verify_us'] / 1000
+    BINDER_VERIFY_TIME = PROFILE['binder_verify_us'] / 1000
+
+# Memory model
+MEMORY_MODEL = 'empirical'  # 'flat' | 'hierarchy' | 'empirical'
+SESSION_LIFETIME = 300      # ms a session's state stays live after admission
+CACHE_LINE_BYTES = 64
+CACHE_LEVELS = [            # (name, capacity bytes, load latency ns)
+    ('L1', 48 * 1024, 1.2),
+    ('L2', 2 * 1024 * 1024, 4.5),
+    ('L3', L3_CACHE_LIMIT_MB * 1024 * 1024, 18.0),
+]
+DRAM_LATENCY_NS = 95.0
+ACCESS_PATTERN = 'uniform'  # 'uniform' | 'zipf'
+ZIPF_SKEW = 0.99
+EMPIRICAL_TABLE_BYTES = [2**16, 2**20, 2**23, 2**25, 2**27]  # 64 KiB .. 128 MiB
+EMPIRICAL_LOOKUPS = 20_000
+
+# =============================================================================
+# MEMORY MODELS
+# =============================================================================
+
+class FlatPenaltyModel:
+    """Original model: 50us per admission once live state exceeds L3"""
+    name = 'flat'
+
+    def __init__(self, entry_bytes):
+        self.entry_bytes = entry_bytes
+
+    def access_time(self, working_set_bytes):
+        return 0.05 if working_set_bytes > CACHE_LEVELS[-1][1] else 0.0
+
+    def dram_share(self, working_set_bytes):
+        return 1.0 if working_set_bytes > CACHE_LEVELS[-1][1] else 0.0
+
+class CacheHierarchyModel:
+    """
+    Expected memory time (ms) to read one session's state: each cache line
+    is served by the smallest level holding it. The share of accesses
+    served within capacity C is C / working set for uniform access, or the
+    Zipf mass of the hottest C / entry_bytes sessions.
+    """
+    name = 'hierarchy'
+
+    def __init__(self, entry_bytes, levels=CACHE_LEVELS, dram_ns=DRAM_LATENCY_NS,
+                 pattern=ACCESS_PATTERN, skew=ZIPF_SKEW):
+        self.entry_bytes = entry_bytes
+        self.lines = -(-entry_bytes // CACHE_LINE_BYTES)
+        self.capacities = np.array([c for _, c, _ in levels], dtype=float)
+        self.latencies = np.array([ns for _, _, ns in levels] + [dram_ns])
+        self.pattern = pattern
+        self.skew = skew
+
+    def hit_rates(self, working_set_bytes):
+        """Share of accesses served by each level (last entry: DRAM)"""
+        ws = max(float(working_set_bytes), self.entry_bytes)
+        if self.pattern == 'zipf':
+            n = ws / self.entry_bytes
+            k = np.clip(self.capacities / self.entry_bytes, 1.0, n)
+            if abs(self.skew - 1.0) < 1e-9:
+                cum = np.log1p(k - 1) / np.log(n) if n > 1 else np.ones_like(k)
+            else:
+                e = 1.0 - self.skew
+                cum = (k ** e - 1) / (n ** e - 1) if n > 1 else np.ones_like(k)
+        else:
+            cum = np.minimum(self.capacities / ws, 1.0)
+        cum = np.append(cum, 1.0)
+        return np.diff(cum, prepend=0.0)
+
+    def access_time(self, working_set_bytes):
+        return self.lines * float(self.hit_rates(working_set_bytes) @ self.latencies) / 1e6
+
+    def dram_share(self, working_set_bytes):
+        return float(self.hit_rates(working_set_bytes)[-1])
+
+class EmpiricalMemoryModel:
+    """
+    Host-measured lookup time: for each table size, random row gathers from
+    a NumPy (rows x entry_bytes) session table; access_time() interpolates
+    ns/lookup in log(working set).
+    """
+    name = 'empirical'
+
+    def __init__(self, entry_bytes, table_bytes=EMPIRICAL_TABLE_BYTES, lookups=EMPIRICAL_LOOKUPS, rng=None):
+        self.entry_bytes = entry_bytes
+        rng = np.random.default_rng(0) if rng is None else rng
+        self.lookup_ns = {}
+        for size in table_bytes:
+            rows = max(1, size // entry_bytes)
+            table = np.ones((rows, entry_bytes), dtype=np.uint8)  # touch every page
+            idx = rng.integers(0, rows, lookups)
+            best = float('inf')
+            for _ in range(3):
+                start = time.perf_counter_ns()
+                table[idx].sum(axis=1, dtype=np.uint32)
+                best = min(best, (time.perf_counter_ns() - start) / lookups)
+            self.lookup_ns[str(rows * entry_bytes)] = best
+            del table
+
+    def access_time(self, working_set_bytes):
+        return sized_cost(self.lookup_ns, working_set_bytes, clamp=True) / 1e6
+
+    def dram_share(self, working_set_bytes):
+        return None  # measures lookup time, not where it was served from
+
+MEMORY_MODELS = {m.name: m for m in (FlatPenaltyModel, CacheHierarchyModel, EmpiricalMemoryModel)}
+
+# =============================================================================
+# SIMULATION
+# =============================================================================
+
 class EdgeSwitch:
-    def __init__(self, env):
+    def __init__(self, env, memory_model):
         self.env = env
         self.cpu = simpy.Resource(env, capacity=16) # 16-core switch
+        self.memory = memory_model
         self.ram_usage = 0
         self.total_latency = 0
+        self.total_memory_time = 0
         self.processed_count = 0
-        self.cache_misses = 0
+        self.cache_misses = 0.0  # expected L3 misses under the memory model
 
     def process_session(self, is_ucred):
         start_time = self.env.now
@@ -39,25 +167,31 @@ class EdgeSwitch:
         size = UCRED_BINDER_SIZE if is_ucred else LEGACY_SESSION_SIZE
         self.ram_usage += size
         
-        # 2. Cache Miss Check (Simulating physical memory reality)
-        if self.ram_usage / (1024*1024) > L3_CACHE_LIMIT_MB:
-            self.cache_misses += 1
-            cache_penalty = 0.05 # 50us penalty for cache miss
-        else:
-            cache_penalty = 0
+        # 2. State lookup against the live working set (Simulating physical memory reality)
+        share = self.memory.dram_share(self.ram_usage)
+        self.cache_misses = None if share is None else self.cache_misses + share
+        memory_time = self.memory.access_time(self.ram_usage)
             
         # 3. CPU Verification
         verify_time = BINDER_VERIFY_TIME if is_ucred else PQC_VERIFY_TIME
         with self.cpu.request() as req:
             yield req
-            yield self.env.timeout(verify_time + cache_penalty)
+            yield self.env.timeout(verify_time + memory_time)
             
         self.total_latency += (self.env.now - start_time)
+        self.total_memory_time += memory_time
         self.processed_count += 1
+        
+        # 4. Session expiry frees its state
+        yield self.env.timeout(SESSION_LIFETIME)
+        self.ram_usage -= size
 
-def run_simulation(is_ucred):
+def run_simulation(is_ucred, memory_model=None):
+    entry_bytes = UCRED_BINDER_SIZE if is_ucred else LEGACY_SESSION_SIZE
+    if memory_model is None:
+        memory_model = MEMORY_MODELS[MEMORY_MODEL](entry_bytes)
     env = simpy.Environment()
-    switch = EdgeSwitch(env)
+    switch = EdgeSwitch(env, memory_model)
     
     def session_generator(env, switch):
         for i in range(NUM_SESSIONS):
@@ -78,18 +212,23 @@ def run_simulation(is_ucred):
         time_points.append(switch.processed_count)
         
     avg_latency = switch.total_latency / switch.processed_count if switch.processed_count > 0 else 0
-    return time_points, ram_history, avg_latency, switch.cache_misses
+    avg_memory = switch.total_memory_time / switch.processed_count if switch.processed_count > 0 else 0
+    return time_points, ram_history, avg_latency, switch.cache_misses, avg_memory
 
 def generate_proofs():
     print("Starting U-CRED Edge Stress Test (1 Million Sessions)...")
+    if PROFILE is not None:
+        print(f"Verify costs calibrated on {PROFILE['host']['platform']}: full {PQC_VERIFY_TIME:.3f} ms, "
+              f"binder {BINDER_VERIFY_TIME:.3f} ms")
+    print(f"Memory model: {MEMORY_MODEL} (session lifetime {SESSION_LIFETIME} ms)")
     
     # Run Legacy Simulation
     print("Running Legacy Baseline (EAP-TLS)...")
-    legacy_counts, legacy_ram, legacy_latency, legacy_misses = run_simulation(is_ucred=False)
+    legacy_counts, legacy_ram, legacy_latency, legacy_misses, legacy_memory = run_simulation(is_ucred=False)
     
     # Run U-CRED Simulation
     print("Running U-CRED Optimization...")
-    ucred_counts, ucred_ram, ucred_latency, ucred_misses = run_simulation(is_ucred=True)
+    ucred_counts, ucred_ram, ucred_latency, ucred_misses, ucred_memory = run_simulation(is_ucred=True)
     
     # 1. Memory Heatmap / Growth Chart
     plt.figure(figsize=(10, 6))
@@ -124,10 +263,37 @@ def generate_proofs():
     print(f"\n--- U-CRED Audit Summary ---")
     print(f"RAM Reduction: {ram_reduction:.1f}%")
     print(f"CPU Reduction: {reduction:.1f}%")
-    print(f"Cache Misses (Legacy): {legacy_misses}")
-    print(f"Cache Misses (U-CRED): {ucred_misses}")
+    if legacy_misses is None:
+        print(f"Cache Misses: n/a ({MEMORY_MODEL} model measures lookup time, not misses)")
+    else:
+        print(f"Cache Misses (Legacy): {legacy_misses:,.0f}")
+        print(f"Cache Misses (U-CRED): {ucred_misses:,.0f}")
     print(f"Avg Latency (Legacy): {legacy_latency:.2f}ms")
     print(f"Avg Latency (U-CRED): {ucred_latency:.2f}ms")
+    print(f"Avg Memory Time (Legacy): {legacy_memory * 1000:.3f}us")
+    print(f"Avg Memory Time (U-CRED): {ucred_memory * 1000:.3f}us")
+    
+    # Memory-model cross-check at each path's peak working set
+    hierarchy = {n: CacheHierarchyModel(n) for n in (LEGACY_SESSION_SIZE, UCRED_BINDER_SIZE)}
+    print(f"\nLookup time per session at peak working set (hierarchy model vs host):")
+    for label, entry, peak in [("Legacy", LEGACY_SESSION_SIZE, max(legacy_ram)), ("U-CRED", UCRED_BINDER_SIZE, max(ucred_ram))]:
+        ws = peak * 1024 * 1024
+        rates = hierarchy[entry].hit_rates(ws)
+        empirical = EmpiricalMemoryModel(entry).access_time(ws)
+        print(f"  {label}: {peak:6.1f} MB live, hit rates L1/L2/L3/DRAM "
+              + "/".join(f"{r:.0%}" for r in rates)
+              + f" -> model {hierarchy[entry].access_time(ws) * 1e6:.0f} ns, host {empirical * 1e6:.0f} ns")
+
+    # What the memory model contributes to the latency gap
+    gap_ms = legacy_latency - ucred_latency
+    memory_gap_ms = legacy_memory - ucred_memory
+    print(f"\nLatency gap {gap_ms:.3f} ms, of which memory time {memory_gap_ms * 1000:.3f} us "
+          f"({memory_gap_ms / gap_ms:.2%} of the gap)" if gap_ms > 0 else
+          f"\nNo latency gap ({gap_ms:.3f} ms); memory time differs by {memory_gap_ms * 1000:.3f} us")
+    print(f"Note: per-session memory time is under {max(legacy_memory, ucred_memory) * 1000:.2f} us against "
+          f"{BINDER_VERIFY_TIME * 1000:.0f}-{PQC_VERIFY_TIME * 1000:.0f} us of verification; the hierarchy "
+          f"model (dependent loads) and the host gathers (overlapping misses) may differ several-fold "
+          f"without moving the latency gap, which verification and queueing drive")
     
     # Canonical CBOR Proof
     sample_binder = {
@@ -2,6 +2,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import csv
 from itertools import product
+from cost_calibration import load_profile, sized_cost
 
 """
 U-CRED E5: NAT & TRW Parameter Sweep
@@ -24,6 +25,11 @@ Target Results (from paper):
 Security Claim:
 U-CRED's stateless design decouples security (TRW) from NAT compatibility,
 enabling tuning for specific deployment constraints without sacrificing CPU efficiency.
+
+Cost model: the paper's constants, or with UCRED_COST_PROFILE set, the
+per-primitive costs of the host profile written by cost_calibration.py
+(Bloom filters sized for TRW_SESSION_RATE x TRW_WINDOW entries, session
+store for TRW_SESSION_RATE x NAT_TTL sessions).
 """
 
 # Baseline (stateful admission control)
@@ -32,11 +38,34 @@ STATEFUL_CPU_PER_MSG = 120.0  # μs (hash table lookup + update)
 # U-CRED (stateless)
 UCRED_CPU_PER_MSG = 74.2  # μs (HMAC verify + TRW check, no state)
 
+# Calibrated model
+TRW_SESSION_RATE = 2_000  # admissions/sec per SMF (sizes Bloom windows and session state)
+STATEFUL_BACKEND = 'sqlite'  # 'sqlite' (indexed session store) or 'dict' (in-process table)
+MAX_TRW_WINDOWS = 10
+PROFILE = load_profile()
+
 # Test parameters
 NAT_TTL_VALUES = [300, 600, 1200]  # seconds (5min, 10min, 20min)
 TRW_WINDOW_VALUES = [10, 30, 60]   # seconds
 
-def simulate_ucred_performance(nat_ttl, trw_window, num_messages=100_000):
+def per_message_costs(nat_ttl, trw_window, profile=PROFILE):
+    """
+    (U-CRED μs/msg, stateful μs/msg) for one configuration.
+    U-CRED: HMAC verify + HKDF binder derivation + one Bloom check per live
+    TRW window. Stateful: session lookup + update in a store holding every
+    session alive within NAT_TTL.
+    """
+    num_trw_windows = min(int(np.ceil(nat_ttl / trw_window)), MAX_TRW_WINDOWS)  # Cap at 10 for practicality
+    if profile is None:
+        # Paper constants: HMAC ~4μs, HKDF ~2μs, Bloom ~0.8μs per window
+        return 4.0 + 2.0 + num_trw_windows * 0.8, STATEFUL_CPU_PER_MSG
+    
+    bloom_us = sized_cost(profile['bloom_lookup_us'], TRW_SESSION_RATE * trw_window)
+    ucred_us = profile['hmac_sha256_us'] + profile['hkdf_sha256_us'] + num_trw_windows * bloom_us
+    stateful_us = sized_cost(profile[f'{STATEFUL_BACKEND}_lookup_update_us'], TRW_SESSION_RATE * nat_ttl)
+    return ucred_us, stateful_us
+
+def simulate_ucred_performance(nat_ttl, trw_window, num_messages=100_000, profile=PROFILE):
     """
     Simulates U-CRED performance for given parameters.
     
@@ -48,24 +77,14 @@ def simulate_ucred_performance(nat_ttl, trw_window, num_messages=100_000):
     Returns:
         (cpu_saving_pct, max_replay_exposure_s, cpu_time_ucred, cpu_time_stateful)
     """
-    # CPU time for U-CRED (stateless, independent of parameters)
-    # Token verification: HMAC-SHA256 (~4μs)
-    # Binder derivation: HKDF (~2μs)
-    # TRW check: Bloom filter lookup (~0.8μs per window, up to 3 windows)
+    # CPU time for U-CRED: HMAC verification + binder derivation + TRW Bloom checks
     # NAT compatibility: No impact on CPU (just affects replay window)
-    
-    num_trw_windows = min(int(np.ceil(nat_ttl / trw_window)), 10)  # Cap at 10 for practicality
-    
-    cpu_time_per_msg_ucred = (
-        4.0 +  # HMAC verification
-        2.0 +  # Binder derivation
-        (num_trw_windows * 0.8)  # TRW Bloom filter checks
-    )
+    cpu_time_per_msg_ucred, cpu_time_per_msg_stateful = per_message_costs(nat_ttl, trw_window, profile)
     
     total_cpu_ucred = num_messages * cpu_time_per_msg_ucred
     
     # CPU time for stateful baseline
-    total_cpu_stateful = num_messages * STATEFUL_CPU_PER_MSG
+    total_cpu_stateful = num_messages * cpu_time_per_msg_stateful
     
     # CPU savings
     cpu_saving_pct = ((total_cpu_stateful - total_cpu_ucred) / total_cpu_stateful) * 100
@@ -81,7 +100,12 @@ def run_parameter_sweep():
     Main test: Sweep 9 configurations, measure CPU savings and replay exposure.
     """
     print("--- U-CRED E5: NAT & TRW Parameter Sweep ---")
-    print(f"Test matrix: {len(NAT_TTL_VALUES)} NAT_TTL × {len(TRW_WINDOW_VALUES)} TRW_WINDOW = 9 configs\n")
+    print(f"Test matrix: {len(NAT_TTL_VALUES)} NAT_TTL × {len(TRW_WINDOW_VALUES)} TRW_WINDOW = 9 configs")
+    if PROFILE is None:
+        print("Cost model: paper constants (set UCRED_COST_PROFILE to a cost_calibration.py profile to calibrate)\n")
+    else:
+        print(f"Cost model: calibrated on {PROFILE['host']['platform']} ({PROFILE['host']['calibrated_at']}), "
+              f"stateful baseline = {STATEFUL_BACKEND}\n")
     
     results = []
     
@@ -1,6 +1,7 @@
 import simpy
 import numpy as np
 import matplotlib.pyplot as plt
+from overload_control import OverloadController, ADMIT, PRIORITY_BINDER, PRIORITY_ATTACH
 
 """
 U-CRED Phase 3.2: Signaling Storm & Backhaul Saturation
@@ -14,16 +15,26 @@ The Design-Around Trap:
 The Monopoly Proof:
 - EAP-TLS: Backhaul saturates at 8k events/sec
 - U-CRED: No backhaul signaling, handles 100k+ events/sec
+
+Attach flood: with an OverloadController on the link (per-source token
+buckets, AIMD concurrency limit, priority classes) a 10k+/sec flood is shed
+at the edge while known UEs keep their backhaul fetches.
 """
 
 BACKHAUL_CAPACITY_MBPS = 1000  # 1 Gbps per tower
 MESSAGE_SIZE_BYTES = 2000  # Average signaling message
 CORE_RTT_MS = 8.0  # Round-trip time to core (more realistic with queuing)
 CACHE_HIT_RATE = 0.3  # 30% hit rate (cold cache, high mobility scenario)
+SIM_DURATION = 5.0  # seconds
+RNG_BLOCK = 4096  # inter-event times / cache draws generated per RNG call
+FLOOD_RATE = 12_000  # attach requests/sec
+FLOOD_SOURCES = 500
+LEGIT_EVENT_RATE = 2_000  # mobility events/sec from known UEs during the flood
 
 class BackhaulLink:
-    def __init__(self, env, capacity_mbps):
+    def __init__(self, env, capacity_mbps, controller=None):
         self.env = env
+        self.controller = controller
         self.capacity_bps = capacity_mbps * 1e6
         # Model backhaul as a finite resource (concurrent sessions)
         # At 8ms RTT, max concurrent = capacity * RTT
@@ -34,16 +45,28 @@ class BackhaulLink:
         self.dropped_packets = 0
         self.successful_packets = 0
         
-    def send_message(self, size_bytes):
+    def send_message(self, size_bytes, source=None, priority=PRIORITY_BINDER):
         """Attempts to send a signaling message over the backhaul."""
         size_bits = size_bytes * 8
         transmission_time = size_bits / self.capacity_bps
         
+        if self.controller is not None:
+            if self.controller.admit(source, priority, self.env.now) != ADMIT:
+                self.dropped_packets += 1
+                return False
+            start = self.env.now
+            ok = yield from self._transmit(transmission_time)
+            self.controller.release(self.env.now - start, self.env.now, dropped=not ok)
+            return ok
+        
         # Try to acquire link resource
         if len(self.link.queue) >= 20:  # Drop if queue too long (head-of-line blocking)
             self.dropped_packets += 1
             return False
         
+        return (yield from self._transmit(transmission_time))
+    
+    def _transmit(self, transmission_time):
         with self.link.request() as req:
             result = yield req | self.env.timeout(0.001)  # 1ms timeout
             if req not in result:
@@ -57,26 +80,29 @@ class BackhaulLink:
         
         return True
 
-def mobility_event_generator(env, backhaul, event_rate, use_ucred):
+def mobility_event_generator(env, backhaul, event_rate, use_ucred, rng=None, cache_hit_rate=CACHE_HIT_RATE):
     """
     Generates mobility events (handovers) at specified rate.
+    Inter-event times and cache outcomes are drawn RNG_BLOCK at a time.
     """
+    rng = np.random.default_rng() if rng is None else rng
     inter_event_time = 1.0 / event_rate
     
     while True:
-        yield env.timeout(np.random.exponential(inter_event_time))
-        
-        if use_ucred:
-            # U-CRED: No backhaul signaling (stateless binder verified locally)
-            # Zero backhaul load
-            pass
-        else:
-            # EAP-TLS: Check cache first
-            if np.random.random() > CACHE_HIT_RATE:
-                # Cache miss: Must fetch from core
+        gaps = rng.exponential(inter_event_time, RNG_BLOCK).tolist()
+        misses = (rng.random(RNG_BLOCK) > cache_hit_rate).tolist()
+        for gap, miss in zip(gaps, misses):
+            yield env.timeout(gap)
+            
+            if use_ucred:
+                # U-CRED: No backhaul signaling (stateless binder verified locally)
+                # Zero backhaul load
+                pass
+            elif miss:
+                # EAP-TLS cache miss: Must fetch from core
                 env.process(backhaul.send_message(MESSAGE_SIZE_BYTES))
 
-def run_signaling_storm(event_rate, use_ucred):
+def run_signaling_storm(event_rate, use_ucred, rng=None, cache_hit_rate=CACHE_HIT_RATE, duration=SIM_DURATION):
     env = simpy.Environment()
     backhaul = BackhaulLink(env, BACKHAUL_CAPACITY_MBPS)
     
@@ -88,9 +114,9 @@ def run_signaling_storm(event_rate, use_ucred):
             yield env.timeout(0.01)  # 10ms resolution
     
     env.process(monitor())
-    env.process(mobility_event_generator(env, backhaul, event_rate, use_ucred))
+    env.process(mobility_event_generator(env, backhaul, event_rate, use_ucred, rng, cache_hit_rate))
     
-    env.run(until=5.0)  # 5 second simulation
+    env.run(until=duration)
     
     avg_util = np.mean(backhaul.utilization_history)
     peak_util = np.max(backhaul.utilization_history) if backhaul.utilization_history else 0
@@ -98,6 +124,38 @@ def run_signaling_storm(event_rate, use_ucred):
     
     return avg_util, peak_util, drop_rate
 
+def run_attach_flood(flood_rate, controller=None, rng=None, duration=SIM_DURATION,
+                     legit_rate=LEGIT_EVENT_RATE, flood_sources=FLOOD_SOURCES):
+    """
+    Known UEs' backhaul fetches under an attach flood.
+    Returns (legitimate success rate, flood success rate).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    env = simpy.Environment()
+    backhaul = BackhaulLink(env, BACKHAUL_CAPACITY_MBPS, controller)
+    outcome = {True: [0, 0], False: [0, 0]}  # is_flood -> [sent, delivered]
+    
+    def send(source, priority, is_flood):
+        ok = yield from backhaul.send_message(MESSAGE_SIZE_BYTES, source, priority)
+        outcome[is_flood][1] += ok
+    
+    def arrivals(rate, priority, is_flood, sources):
+        while True:
+            gaps = rng.exponential(1.0 / rate, RNG_BLOCK).tolist()
+            ids = rng.integers(sources[0], sources[1], RNG_BLOCK).tolist()
+            for gap, source in zip(gaps, ids):
+                yield env.timeout(gap)
+                outcome[is_flood][0] += 1
+                env.process(send(source, priority, is_flood))
+    
+    env.process(arrivals(flood_rate, PRIORITY_ATTACH, True, (0, flood_sources)))
+    env.process(arrivals(legit_rate, PRIORITY_BINDER, False, (flood_sources, flood_sources + 10_000_000)))
+    env.run(until=duration)
+    
+    legit_sent, legit_ok = outcome[False]
+    flood_sent, flood_ok = outcome[True]
+    return legit_ok / max(1, legit_sent), flood_ok / max(1, flood_sent)
+
 def generate_signaling_storm_proof():
     print("--- U-CRED Phase 3.2: Signaling Storm Backhaul Saturation ---")
     
@@ -153,6 +211,14 @@ def generate_signaling_storm_proof():
     print(f"  EAP-TLS Drop Rate:      {drop_eaptls[-1]:.1f}%")
     print(f"  U-CRED Drop Rate:       0%")
     
+    # Attach flood: queue-length drops vs. overload control
+    rng = np.random.default_rng(7)
+    legit_plain, flood_plain = run_attach_flood(FLOOD_RATE, None, rng)
+    legit_ctl, flood_ctl = run_attach_flood(FLOOD_RATE, OverloadController(), rng)
+    print(f"\nAttach flood ({FLOOD_RATE:,}/sec from {FLOOD_SOURCES} sources, {LEGIT_EVENT_RATE:,}/sec known UEs):")
+    print(f"  Queue-length drops:  known UEs served {legit_plain:6.1%}, flood served {flood_plain:6.1%}")
+    print(f"  Overload control:    known UEs served {legit_ctl:6.1%}, flood served {flood_ctl:6.1%}")
+    
     if saturation_rate <= 8000:
         print("STATUS: ✅ BACKHAUL SATURATION PROVEN (<8k events/sec)")
     else:
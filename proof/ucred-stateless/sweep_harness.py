@@ -0,0 +1,199 @@
+import glob
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from scipy import stats
+from signaling_storm_sim import run_signaling_storm
+from distributed_edge_mesh import run_mesh_simulation
+from cold_boot_restoration import run_aggregated_simulation
+
+"""
+U-CRED: Parallel Parameter-Sweep Harness for the Backhaul Models
+
+A sweep is a model function, a parameter grid and a replicate count. Every
+(configuration, replicate) run gets its own SeedSequence child, so results
+do not depend on worker count or completion order, and runs fan out over a
+process pool. Each finished run is written as one .npz shard (parameters,
+metrics, seed entropy) into the sweep directory: the store is append-only,
+an interrupted sweep resumes by skipping shards already on disk, and
+load_results() reads all shards back as columns. Shards are keyed by
+grid position, so the sweep directory name carries a hash of (grid, seed,
+replicates): changing any of them starts a fresh directory instead of
+resuming into stale shards.
+
+Model contract: fn(seed=SeedSequence, **params) -> {metric: scalar}.
+"""
+
+SWEEP_DIR = 'sweep_results'
+REPLICATES = 8
+SEED = 2025
+SATURATION_UTIL = 80.0  # % backhaul utilization
+
+# =============================================================================
+# MODEL ADAPTERS
+# =============================================================================
+
+def signaling_storm_run(seed, event_rate, use_ucred):
+    avg, peak, drop = run_signaling_storm(event_rate, use_ucred, rng=np.random.default_rng(seed))
+    return {'avg_util': avg, 'peak_util': peak, 'drop_rate': drop}
+
+def edge_mesh_run(seed, use_ucred, num_vehicles):
+    handovers, avg, p95 = run_mesh_simulation(use_ucred, rng=np.random.default_rng(seed),
+                                              num_vehicles=num_vehicles)
+    return {'handovers': handovers, 'avg_latency_ms': avg, 'p95_latency_ms': p95}
+
+def cold_boot_run(seed, use_ucred, backhaul_capacity, total_devices):
+    complete, failed, t95 = run_aggregated_simulation(use_ucred, total_devices, total_devices // 10_000,
+                                                      seed=seed, workers=1,
+                                                      backhaul_capacity=backhaul_capacity)
+    return {'online_frac': complete / total_devices, 'failed': failed, 't95_s': t95}
+
+EXPERIMENTS = {
+    'signaling_storm': (signaling_storm_run, {
+        'event_rate': [1000, 2000, 4000, 6000, 8000, 10000, 15000],
+        'use_ucred': [False, True],
+    }),
+    'edge_mesh': (edge_mesh_run, {
+        'use_ucred': [False, True],
+        'num_vehicles': [5000, 10000],
+    }),
+    'cold_boot': (cold_boot_run, {
+        'use_ucred': [False, True],
+        'backhaul_capacity': [25, 50, 100],
+        'total_devices': [1_000_000],
+    }),
+}
+
+# =============================================================================
+# HARNESS
+# =============================================================================
+
+def expand_grid(grid):
+    """Cartesian product of {param: [values]} -> list of {param: value}"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+def sweep_dir(name, grid, replicates=REPLICATES, seed=SEED, out_dir=SWEEP_DIR):
+    """<out_dir>/<name>-<hash of grid, seed, replicates>"""
+    spec = json.dumps({'grid': grid, 'seed': seed, 'replicates': replicates}, default=str)
+    return os.path.join(out_dir, f"{name}-{hashlib.sha256(spec.encode()).hexdigest()[:12]}")
+
+def _shard_path(out_dir, config_id, replicate):
+    return os.path.join(out_dir, f"run_c{config_id:04d}_r{replicate:03d}.npz")
+
+def _execute(fn, params, seed, path, config_id, replicate):
+    """Worker: one run -> one shard (written atomically)"""
+    start = time.perf_counter()
+    metrics = fn(seed=seed, **params)
+    columns = {f"param_{k}": np.asarray(v) for k, v in params.items()}
+    columns.update({f"metric_{k}": np.asarray(v) for k, v in metrics.items()})
+    tmp = path + '.tmp.npz'
+    np.savez(tmp, config_id=config_id, replicate=replicate, seed_entropy=str(seed.entropy),
+             spawn_key=np.asarray(seed.spawn_key), elapsed_s=time.perf_counter() - start, **columns)
+    os.replace(tmp, path)
+    return path
+
+def run_sweep(name, fn, grid, replicates=REPLICATES, out_dir=SWEEP_DIR, seed=SEED, workers=None):
+    """
+    Runs every (configuration, replicate) not already on disk.
+    Returns the number of runs executed.
+    """
+    directory = sweep_dir(name, grid, replicates, seed, out_dir)
+    os.makedirs(directory, exist_ok=True)
+    configs = expand_grid(grid)
+    # One child per (config, replicate), fixed by position in the grid
+    seeds = np.random.SeedSequence(seed).spawn(len(configs) * replicates)
+    pending = [(params, seeds[c * replicates + r], _shard_path(directory, c, r), c, r)
+               for c, params in enumerate(configs) for r in range(replicates)
+               if not os.path.exists(_shard_path(directory, c, r))]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for task in pending:
+            _execute(fn, *task)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in as_completed([pool.submit(_execute, fn, *task) for task in pending]):
+                future.result()
+    return len(pending)
+
+def load_results(name, grid, replicates=REPLICATES, seed=SEED, out_dir=SWEEP_DIR):
+    """All shards of a sweep as {column: array}, ordered by (config, replicate)"""
+    paths = sorted(glob.glob(os.path.join(sweep_dir(name, grid, replicates, seed, out_dir), 'run_c*_r*.npz')))
+    rows = []
+    for path in paths:
+        with np.load(path) as shard:
+            rows.append({k: shard[k][()] for k in shard.files if k != 'spawn_key'})
+    columns = {}
+    for key in rows[0] if rows else []:
+        columns[key] = np.array([row[key] for row in rows])
+    return columns
+
+def summarize(columns, metric, by, confidence=0.95):
+    """
+    Per-configuration mean and Student-t confidence half-width of a metric.
+    by: parameter names identifying a configuration.
+    Returns [(params tuple, mean, half_width, n)].
+    """
+    values = columns[f"metric_{metric}"].astype(float)
+    keys = list(zip(*(columns[f"param_{p}"] for p in by)))
+    out = []
+    for key in sorted(set(keys)):
+        sample = values[[k == key for k in keys]]
+        n = len(sample)
+        half = stats.t.ppf(0.5 + confidence / 2, n - 1) * sample.std(ddof=1) / np.sqrt(n) if n > 1 else float('nan')
+        out.append((key, float(sample.mean()), float(half), n))
+    return out
+
+def saturation_points(columns, threshold=SATURATION_UTIL):
+    """First EAP-TLS event rate whose utilization exceeds the threshold, per replicate"""
+    eap = ~columns['param_use_ucred'].astype(bool)
+    points = []
+    for r in np.unique(columns['replicate']):
+        sel = eap & (columns['replicate'] == r)
+        rates = columns['param_event_rate'][sel]
+        util = columns['metric_avg_util'][sel]
+        order = np.argsort(rates)
+        over = rates[order][util[order] > threshold]
+        points.append(over[0] if len(over) else rates.max())
+    return np.array(points, dtype=float)
+
+def main():
+    print("--- U-CRED: Parallel Backhaul Parameter Sweeps ---")
+    workers = os.cpu_count() or 1
+    for name, (fn, grid) in EXPERIMENTS.items():
+        start = time.perf_counter()
+        executed = run_sweep(name, fn, grid)
+        n_runs = len(expand_grid(grid)) * REPLICATES
+        print(f"\n[{name}] {n_runs} runs ({executed} new) on {workers} worker(s) "
+              f"in {time.perf_counter() - start:.1f} s -> {sweep_dir(name, grid)}/")
+
+    storm = load_results('signaling_storm', EXPERIMENTS['signaling_storm'][1])
+    print(f"\nSignaling storm, avg backhaul utilization (mean ± 95% CI, {REPLICATES} replicates):")
+    for (rate, ucred), mean, half, _ in summarize(storm, 'avg_util', ('event_rate', 'use_ucred')):
+        print(f"  {'U-CRED ' if ucred else 'EAP-TLS'} {rate:>6,} ev/s: {mean:6.1f}% ± {half:.1f}")
+    sat = saturation_points(storm)
+    sat_half = stats.t.ppf(0.975, len(sat) - 1) * sat.std(ddof=1) / np.sqrt(len(sat)) if len(sat) > 1 else 0.0
+    print(f"  EAP-TLS saturation point: {sat.mean():,.0f} ± {sat_half:,.0f} events/sec")
+
+    mesh = load_results('edge_mesh', EXPERIMENTS['edge_mesh'][1])
+    print("\nEdge mesh, avg handover latency:")
+    for (ucred, vehicles), mean, half, _ in summarize(mesh, 'avg_latency_ms', ('use_ucred', 'num_vehicles')):
+        print(f"  {'U-CRED ' if ucred else 'EAP-TLS'} {vehicles:>6,} vehicles: {mean:.3f} ms ± {half:.3f}")
+
+    boot = load_results('cold_boot', EXPERIMENTS['cold_boot'][1])
+    print("\nCold boot, devices online:")
+    for (ucred, cap), mean, half, _ in summarize(boot, 'online_frac', ('use_ucred', 'backhaul_capacity')):
+        print(f"  {'U-CRED ' if ucred else 'EAP-TLS'} backhaul {cap:>3}: {mean:.2%} ± {half:.2%}")
+
+    if sat.mean() + sat_half <= 8000:
+        print("\nSTATUS: ✅ SWEEP COMPLETE (saturation point confidence interval below 8k events/sec)")
+    else:
+        print(f"\nSTATUS: ⚠️  SWEEP COMPLETE (saturation at {sat.mean():,.0f} events/sec)")
+
+if __name__ == "__main__":
+    main()
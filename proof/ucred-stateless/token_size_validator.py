@@ -3,6 +3,7 @@ import time
 import csv
 import matplotlib.pyplot as plt
 from cryptography.hazmat.primitives.asymmetric import ed25519
+from binder_codec import encode_binder, encode_binder_cbor_map
 
 """
 U-CRED E2: Token & Binder Size Budget Validation
@@ -11,7 +12,8 @@ Measures exact byte counts for over-the-air transmission budget.
 Target Results (from paper):
 - 1-slice token: 413 bytes (target ≤360B, paper notes +53B acceptable)
 - 4-slice token: 422 bytes (target ≤450B)
-- TRW binder: 192 bytes (target ≤200B)
+- TRW binder: 192 bytes (target ≤200B); the fixed-layout binder codec
+  carries the same fields in ~55 bytes
 
 This proves U-CRED fits within NAS signaling budget constraints.
 """
@@ -72,19 +74,9 @@ def create_cose_sign1_token(issuer_sk, ue_pk, slices, include_dcc=True):
     
     return cose_bytes, claims
 
-def create_trw_binder(ue_pk, policy_fp, prev_cti):
-    """Creates a TRW resumption binder."""
-    binder = {
-        "binder": f"bind-{prev_cti[-8:]}",
-        "policy_fp": policy_fp,
-        "cnf": {
-            "jkt": ue_pk.public_bytes_raw().hex()[:32]
-        },
-        "prev_cti": prev_cti
-    }
-    
-    binder_bytes = cbor2.dumps(binder, canonical=True)
-    return binder_bytes
+def create_trw_binder(ue_pk, policy_fp, prev_cti, encoder=encode_binder):
+    """Creates a TRW resumption binder (fixed layout; encode_binder_cbor_map for the original)."""
+    return encoder(ue_pk.public_bytes_raw()[:16], bytes.fromhex(policy_fp), prev_cti)
 
 def run_size_validation():
     print("--- U-CRED E2: Token & Binder Size Budget Validation ---")
@@ -126,6 +118,8 @@ def run_size_validation():
     # Test 3: TRW Binder
     binder = create_trw_binder(ue_pk, claims_1["policy_fp"], claims_1["cti"])
     size_binder = len(binder)
+    size_binder_cbor = len(create_trw_binder(ue_pk, claims_1["policy_fp"], claims_1["cti"],
+                                             encoder=encode_binder_cbor_map))
     
     results.append({
         'type': 'Binder',
@@ -147,7 +141,8 @@ def run_size_validation():
     # Paper comparison
     print(f"\n--- Comparison to Paper ---")
     print(f"Paper: 1-slice = 413B, 4-slice = 422B, Binder = 192B")
-    print(f"Ours:  1-slice = {size_1}B, 4-slice = {size_4}B, Binder = {size_binder}B")
+    print(f"Ours:  1-slice = {size_1}B, 4-slice = {size_4}B, Binder = {size_binder}B "
+          f"(CBOR map binder: {size_binder_cbor}B)")
     
     # Save CSV
     with open('token_sizes.csv', 'w', newline='') as f:
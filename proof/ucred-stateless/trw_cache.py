@@ -0,0 +1,256 @@
+import threading
+import time
+import tracemalloc
+from array import array
+import numpy as np
+
+"""
+U-CRED: Bounded TTL-Aware TRW Cache
+
+The binder fast path only needs "is this UE's jkt bound to a live policy,
+and which one". TRWCache keeps that in fixed-width slots sized from a byte
+budget instead of an unbounded dict of hex strings:
+
+- keys: 16-byte jkt (raw bytes), values: 16-byte policy fingerprint
+- per-entry expiry = min(exp, exp_smf) of the token that created it
+- CLOCK eviction (one reference bit per slot) once the budget is full;
+  expired entries found by the hand are reclaimed before live ones
+- hit / miss / expiry / eviction counters
+- ShardedTRWCache splits the budget over independently locked shards
+  so worker threads do not serialize on one lock
+"""
+
+KEY_BYTES = 16
+VALUE_BYTES = 16
+# Per slot: key + value + expiry (uint32) + reference bit (1 byte)
+SLOT_BYTES = KEY_BYTES + VALUE_BYTES + 4 + 1
+# Index cost per entry: 16-byte bytes key object (56 B allocated), the slot
+# int it maps to (32 B) and the dict's hash/entry tables (~50 B at worst-case
+# load), rounded up
+INDEX_BYTES = 160
+ENTRY_BYTES = SLOT_BYTES + INDEX_BYTES
+TRW_CACHE_BYTES = 64 * 1024 * 1024   # default per-verifier budget (~400k UEs)
+
+class TRWCache:
+    """Fixed-capacity jkt -> policy_fp cache with expiry and CLOCK eviction"""
+
+    def __init__(self, byte_budget, clock=time.time):
+        self.capacity = max(1, byte_budget // ENTRY_BYTES)
+        self.byte_budget = byte_budget
+        self.clock = clock
+        self._index = {}
+        self._keys = bytearray(self.capacity * KEY_BYTES)
+        self._values = bytearray(self.capacity * VALUE_BYTES)
+        self._expiry = array('I', bytes(4 * self.capacity))
+        self._ref = bytearray(self.capacity)
+        self._free = []          # slots released by delete/expiry
+        self._unused = 0         # slots [_unused, capacity) never handed out
+        self._hand = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.inserts = 0
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, jkt):
+        return self.get(jkt) is not None
+
+    def get(self, jkt, now=None):
+        """policy_fp for a live binding, else None"""
+        slot = self._index.get(jkt)
+        if slot is None:
+            self.misses += 1
+            return None
+        if self._expiry[slot] <= (self.clock() if now is None else now):
+            self._remove(jkt, slot)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._ref[slot] = 1
+        self.hits += 1
+        off = slot * VALUE_BYTES
+        return bytes(self._values[off:off + VALUE_BYTES])
+
+    def put(self, jkt, policy_fp, expiry, now=None):
+        """Bind jkt to policy_fp until `expiry` (epoch seconds)"""
+        if len(jkt) != KEY_BYTES or len(policy_fp) != VALUE_BYTES:
+            raise ValueError(f"TRW cache entries are {KEY_BYTES}-byte jkt / {VALUE_BYTES}-byte policy_fp")
+        slot = self._index.get(jkt)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            elif self._unused < self.capacity:
+                slot = self._unused
+                self._unused += 1
+            else:
+                slot = self._evict(self.clock() if now is None else now)
+            self._index[jkt] = slot
+            off = slot * KEY_BYTES
+            self._keys[off:off + KEY_BYTES] = jkt
+        off = slot * VALUE_BYTES
+        self._values[off:off + VALUE_BYTES] = policy_fp
+        self._expiry[slot] = expiry
+        self._ref[slot] = 0
+        self.inserts += 1
+
+    def delete(self, jkt):
+        slot = self._index.get(jkt)
+        if slot is not None:
+            self._remove(jkt, slot)
+
+    def _remove(self, jkt, slot):
+        del self._index[jkt]
+        self._free.append(slot)
+
+    def _evict(self, now):
+        """
+        CLOCK sweep: an expired slot is taken at once; a referenced slot gets
+        its bit cleared and a second chance; the first unreferenced slot goes.
+        """
+        expiry, ref, capacity = self._expiry, self._ref, self.capacity
+        while True:
+            slot = self._hand
+            self._hand = (slot + 1) % capacity
+            if expiry[slot] <= now:
+                self.expirations += 1
+                break
+            if ref[slot]:
+                ref[slot] = 0
+                continue
+            self.evictions += 1
+            break
+        off = slot * KEY_BYTES
+        del self._index[bytes(self._keys[off:off + KEY_BYTES])]
+        return slot
+
+    def stats(self):
+        return {
+            'entries': len(self._index),
+            'capacity': self.capacity,
+            'byte_budget': self.byte_budget,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / max(1, self.hits + self.misses),
+            'expirations': self.expirations,
+            'evictions': self.evictions,
+            'inserts': self.inserts,
+        }
+
+class ShardedTRWCache:
+    """TRWCache split into independently locked shards keyed by jkt"""
+
+    def __init__(self, byte_budget, num_shards=16, clock=time.time):
+        self.shards = [TRWCache(byte_budget // num_shards, clock) for _ in range(num_shards)]
+        self.locks = [threading.Lock() for _ in range(num_shards)]
+        self.num_shards = num_shards
+
+    def _shard(self, jkt):
+        # jkt is a key thumbprint, so its leading byte is already uniform
+        return jkt[0] % self.num_shards
+
+    def get(self, jkt, now=None):
+        i = self._shard(jkt)
+        with self.locks[i]:
+            return self.shards[i].get(jkt, now)
+
+    def put(self, jkt, policy_fp, expiry, now=None):
+        i = self._shard(jkt)
+        with self.locks[i]:
+            self.shards[i].put(jkt, policy_fp, expiry, now)
+
+    def __contains__(self, jkt):
+        return self.get(jkt) is not None
+
+    def __len__(self):
+        return sum(len(s) for s in self.shards)
+
+    def stats(self):
+        totals = {}
+        for shard in self.shards:
+            for k, v in shard.stats().items():
+                totals[k] = totals.get(k, 0) + v
+        totals['hit_ratio'] = totals['hits'] / max(1, totals['hits'] + totals['misses'])
+        return totals
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+NUM_UES = 1_000_000
+CACHE_BUDGET_MB = TRW_CACHE_BYTES // (1024 * 1024)
+NUM_LOOKUPS = 1_000_000
+ZIPF_EXPONENT = 1.1
+
+def _traced(build):
+    tracemalloc.start()
+    obj = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current
+
+def main():
+    print("--- U-CRED: Bounded TRW Cache ---")
+    rng = np.random.default_rng(7)
+    blob = rng.integers(0, 256, size=NUM_UES * KEY_BYTES, dtype=np.uint8).tobytes()
+    jkts = [blob[i:i + KEY_BYTES] for i in range(0, len(blob), KEY_BYTES)]
+    policy_fp = bytes.fromhex("a" * 32)
+    now = int(time.time())
+    expiry = (now + rng.integers(60, 300, size=NUM_UES)).tolist()
+
+    # Legacy: unbounded dict of hex strings, as decoded from the claims
+    def build_legacy():
+        cache = {}
+        for jkt in jkts:
+            cache[jkt.hex()] = policy_fp.hex()
+        return cache
+    _, legacy_bytes = _traced(build_legacy)
+
+    budget = CACHE_BUDGET_MB * 1024 * 1024
+    def build_bounded():
+        cache = TRWCache(budget)
+        # Keys are sliced afresh, as they would be from decoded claims,
+        # so the traced total includes the index's own key objects
+        for i, exp in enumerate(expiry):
+            cache.put(blob[i * KEY_BYTES:(i + 1) * KEY_BYTES], policy_fp, exp, now)
+        return cache
+    _, bounded_bytes = _traced(build_bounded)
+    start = time.perf_counter()
+    cache = build_bounded()
+    insert_rate = NUM_UES / (time.perf_counter() - start)
+
+    # Zipf-skewed binder lookups (recently active UEs dominate)
+    ranks = np.minimum(rng.zipf(ZIPF_EXPONENT, size=NUM_LOOKUPS) - 1, NUM_UES - 1)
+    recent = NUM_UES - 1 - ranks
+    lookups = [jkts[i] for i in recent]
+    start = time.perf_counter()
+    for jkt in lookups:
+        cache.get(jkt, now)
+    lookup_rate = NUM_LOOKUPS / (time.perf_counter() - start)
+
+    # Expiry: an hour later every binding is dead
+    expired_hits = sum(cache.get(jkt, now + 3600) is not None for jkt in lookups[:10000])
+
+    stats = cache.stats()
+    print(f"UEs inserted: {NUM_UES:,} | budget: {CACHE_BUDGET_MB} MiB -> capacity {stats['capacity']:,} entries")
+    resident = min(NUM_UES, stats['capacity'])
+    print(f"  Legacy dict[hex -> hex]: {legacy_bytes / 1e6:,.1f} MB for {NUM_UES:,} entries "
+          f"({legacy_bytes / NUM_UES:.0f} B/UE), unbounded")
+    print(f"  TRWCache (traced):       {bounded_bytes / 1e6:,.1f} MB for {resident:,} entries "
+          f"({bounded_bytes / resident:.0f} B/UE), capped at {budget / 1e6:,.1f} MB")
+    print(f"  Inserts: {insert_rate:,.0f}/s | lookups: {lookup_rate:,.0f}/s")
+    print(f"  Hit ratio (Zipf {ZIPF_EXPONENT}): {stats['hit_ratio']:.1%} | evictions: {stats['evictions']:,} "
+          f"| expirations: {stats['expirations']:,}")
+    print(f"  Bindings served after expiry: {expired_hits}")
+
+    within_budget = bounded_bytes <= budget
+    if within_budget and expired_hits == 0:
+        print("STATUS: ✅ TRW CACHE BOUNDED (memory within budget, expired bindings rejected)")
+    else:
+        print("STATUS: ❌ TRW CACHE OVER BUDGET OR SERVING EXPIRED BINDINGS")
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import csv
 from scipy import stats
+from nat_trw_param_sweep import PROFILE, per_message_costs
 
 """
 U-CRED E7: Risk-Neutral NPV (rNPV) Financial Model
@@ -23,6 +24,12 @@ Target Results (from paper):
 - Base Case Mean: $35.2M rNPV
 - Aggressive P80: $87.6M rNPV
 - Downside P30: $9.8M rNPV
+
+With a host calibration profile (cost_calibration.py, opted into via
+UCRED_COST_PROFILE), royalties scale with the CPU saving measured at the
+recommended NAT_TTL / TRW_WINDOW against the paper's 38.16%: the licence is
+priced on the value actually delivered. A calibrated saving that is not
+positive leaves nothing to license and fails the analysis.
 """
 
 # Market parameters
@@ -52,6 +59,19 @@ ROYALTY_EDGE_BASE = 8_000         # $/year per edge site (smaller scale)
 ROYALTY_EDGE_AGGRESSIVE = 12_000
 ROYALTY_EDGE_DOWNSIDE = 4_000
 
+# Technology value driver
+PAPER_CPU_SAVING = 38.16  # % (nat_trw_param_sweep target)
+RECOMMENDED_NAT_TTL = 600
+RECOMMENDED_TRW_WINDOW = 30
+
+def royalty_value_factor(profile=PROFILE):
+    """(royalty multiplier, CPU saving %): calibrated saving / paper saving (1.0 without a profile)"""
+    if profile is None:
+        return 1.0, PAPER_CPU_SAVING
+    ucred_us, stateful_us = per_message_costs(RECOMMENDED_NAT_TTL, RECOMMENDED_TRW_WINDOW, profile)
+    saving = (stateful_us - ucred_us) / stateful_us * 100
+    return saving / PAPER_CPU_SAVING, saving
+
 def logistic_adoption_curve(year, max_penetration, inflection_year, steepness):
     """Models technology adoption using logistic curve."""
     return max_penetration / (1 + np.exp(-steepness * (year - inflection_year)))
@@ -74,7 +94,7 @@ def project_edge_tam(year):
     else:
         return 60_000 * (1 + 0.03 * (year - 10))  # Faster growth (edge expansion)
 
-def simulate_revenue_scenario(scenario_name, num_draws=NUM_DRAWS):
+def simulate_revenue_scenario(scenario_name, num_draws=NUM_DRAWS, value_factor=1.0):
     """Simulates rNPV for a given scenario using Monte Carlo."""
     npv_samples = []
     
@@ -113,6 +133,9 @@ def simulate_revenue_scenario(scenario_name, num_draws=NUM_DRAWS):
             edge_steepness = np.random.triangular(0.2, 0.3, 0.4)
             edge_royalty = np.random.triangular(3_000, 4_000, 6_000)
         
+        smf_royalty *= value_factor
+        edge_royalty *= value_factor
+        
         # Project cash flows for 20 years
         cash_flows = []
         
@@ -157,7 +180,17 @@ def run_rnpv_analysis():
     print("--- U-CRED E7: Risk-Neutral NPV Economic Model ---")
     print(f"Monte Carlo draws per scenario: {NUM_DRAWS:,}")
     print(f"Patent lifetime: {PATENT_LIFETIME} years")
-    print(f"WACC: {WACC*100:.1f}%\n")
+    print(f"WACC: {WACC*100:.1f}%")
+    value_factor, cpu_saving = royalty_value_factor()
+    if PROFILE is None:
+        print(f"CPU saving: {cpu_saving:.2f}% (paper; no host calibration profile)\n")
+    else:
+        print(f"CPU saving: {cpu_saving:.2f}% (calibrated on {PROFILE['host']['platform']}) "
+              f"-> royalty factor {value_factor:.2f}\n")
+    if cpu_saving <= 0:
+        print(f"STATUS: ❌ NO CALIBRATED CPU SAVING (U-CRED costs {-cpu_saving:.1f}% more than the "
+              f"stateful baseline at NAT_TTL {RECOMMENDED_NAT_TTL} s, TRW {RECOMMENDED_TRW_WINDOW} s)")
+        return
     
     # Run scenarios
     scenarios = ["base", "aggressive", "downside"]
@@ -165,7 +198,7 @@ def run_rnpv_analysis():
     
     for scenario in scenarios:
         print(f"Simulating {scenario.upper()} scenario...")
-        npv_samples = simulate_revenue_scenario(scenario)
+        npv_samples = simulate_revenue_scenario(scenario, value_factor=value_factor)
         results[scenario] = npv_samples
     
     # Statistics
@@ -305,7 +338,7 @@ def run_rnpv_analysis():
     # Key drivers
     print(f"\n--- Key Drivers ---")
     print(f"1. Dual Revenue Streams: SMF core + edge cloud deployments")
-    print(f"2. CapEx Value Proposition: 17% RAM savings (38% CPU + state elimination)")
+    print(f"2. CapEx Value Proposition: 17% RAM savings ({cpu_saving:.0f}% CPU + state elimination)")
     print(f"3. Market Tailwinds: Edge cloud explosion (5k → 60k sites)")
     
     # Final verdict
@@ -5,10 +5,12 @@ Portfolio B Master Validation Script - All Experiments
 One command to verify ALL experiments across ALL pillars.
 
 Usage:
-    python validate_all_experiments.py
+    python validate_all_experiments.py              # parallel, cached
+    python validate_all_experiments.py -j 8         # cap worker count
+    python validate_all_experiments.py --no-cache   # force every proof to rerun
 
 Expected Output:
-    XX/XX PASS (runtime ~60 seconds)
+    XX/XX PASS (runtime ~ slowest single experiment on a many-core host)
 
 This script validates:
 - 10 Original 8-Week Proofs
@@ -18,13 +20,26 @@ This script validates:
 
 Total: 35+ validation points
 
+Proof scripts are scheduled on a pool sized to the available cores. Each
+result is keyed on a SHA-256 of the script directory's sources, the command
+and the expected validation string, so unchanged experiments are served from
+the cache on rerun. Per-test wall time and peak RSS are reported at the end.
+
 Copyright 2025 Portfolio B - Sovereign Handshake
 """
 
+import argparse
+import hashlib
+import json
 import os
+import shlex
+import signal
 import subprocess
 import sys
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # ============================================================================
@@ -37,49 +52,184 @@ BASE_DIR = os.path.join(SCRIPT_DIR, "proof")
 PCAP_DIR = os.path.join(SCRIPT_DIR, "attacks")
 HLS_DIR = os.path.join(SCRIPT_DIR, "silicon")
 
+# Result cache (keyed on content hash of each experiment's inputs)
+CACHE_FILE = os.path.join(SCRIPT_DIR, ".validation_cache.json")
+CACHE_VERSION = 1
+# Environment variables that change proof results; a value naming a file
+# (resolved from the proof's directory) contributes the file's contents too
+PROOF_ENV_VARS = ("UCRED_COST_PROFILE",)
+
+# Files that count as experiment inputs. Generated artifacts (png/csv/json)
+# are deliberately excluded: the proofs rewrite them on every run.
+SOURCE_EXTENSIONS = (".py", ".v", ".sv", ".cpp", ".h", ".hex")
+SOURCE_NAMES = ("Makefile",)
+
+# ============================================================================
+# RESULT CACHE
+# ============================================================================
+
+def input_digest(path, cmd, validation_string):
+    """
+    Content hash of everything an experiment depends on.
+
+    Proof scripts import sibling modules (e.g. csi_correlation_audit imports
+    csi_fingerprint_model), so every source file in the script's directory is
+    hashed, along with the command, the expected output, the interpreter and
+    PROOF_ENV_VARS.
+    """
+    script_dir = os.path.dirname(os.path.abspath(path)) if os.path.isfile(path) else path
+    h = hashlib.sha256()
+    h.update(f"v{CACHE_VERSION}|{sys.version}|{cmd}|{validation_string}".encode())
+    
+    if os.path.isdir(script_dir):
+        for fname in sorted(os.listdir(script_dir)):
+            fpath = os.path.join(script_dir, fname)
+            if not os.path.isfile(fpath):
+                continue
+            if not (fname.endswith(SOURCE_EXTENSIONS) or fname in SOURCE_NAMES):
+                continue
+            h.update(fname.encode())
+            with open(fpath, "rb") as f:
+                h.update(hashlib.sha256(f.read()).digest())
+    
+    for var in PROOF_ENV_VARS:
+        value = os.environ.get(var, "")
+        h.update(f"{var}={value}".encode())
+        fpath = os.path.join(script_dir, value)
+        if value and os.path.isfile(fpath):
+            with open(fpath, "rb") as f:
+                h.update(hashlib.sha256(f.read()).digest())
+    
+    return h.hexdigest()
+
+def load_cache(path=CACHE_FILE):
+    """Load cached results; a missing or corrupt cache is treated as empty."""
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+        if cache.get("version") == CACHE_VERSION:
+            return cache.get("results", {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+def save_cache(results, path=CACHE_FILE):
+    """Atomically write the cache next to this script."""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"version": CACHE_VERSION, "results": results}, f, indent=1)
+    os.replace(tmp, path)
+
 # ============================================================================
 # TEST RUNNER
 # ============================================================================
 
-def run_test(name, path, cmd, validation_string=None, timeout=120):
-    """Run a single test and check for expected output."""
-    print(f"  [{name}]...", end=" ", flush=True)
+def _peak_rss_mb(rusage):
+    """ru_maxrss is KiB on Linux and bytes on macOS."""
+    if rusage is None:
+        return None
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return rusage.ru_maxrss / scale
+
+def execute(cmd, cwd, timeout):
+    """
+    Run one command in its own process group and reap it with wait4() so the
+    child's peak RSS is attributed to this test alone.
+    
+    Returns (returncode, output, wall_seconds, peak_rss_mb, timed_out).
+    """
+    with tempfile.TemporaryFile() as out:
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            shlex.split(cmd),
+            stdout=out,
+            stderr=subprocess.STDOUT,
+            cwd=cwd,
+            start_new_session=True,
+        )
+        
+        timed_out = threading.Event()
+        
+        def _kill():
+            timed_out.set()
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        
+        timer = threading.Timer(timeout, _kill)
+        timer.start()
+        try:
+            if hasattr(os, "wait4"):
+                _, status, rusage = os.wait4(proc.pid, 0)
+                proc.returncode = os.waitstatus_to_exitcode(status)
+            else:
+                proc.wait()
+                rusage = None
+        finally:
+            timer.cancel()
+        wall = time.perf_counter() - start
+        
+        out.seek(0)
+        output = out.read().decode(errors="replace")
+    
+    return proc.returncode, output, wall, _peak_rss_mb(rusage), timed_out.is_set()
+
+def run_test(name, path, cmd, validation_string=None, timeout=120, cache=None):
+    """
+    Run a single test and check for expected output.
+    
+    Returns a result dict: {"passed", "status", "wall_s", "rss_mb", "key", "cached"}.
+    Passing results are stored in `cache` (if given) under the input digest.
+    """
+    key = input_digest(path, cmd, validation_string)
+    if cache is not None and key in cache:
+        return dict(cache[key], key=key, cached=True)
+    
+    result = {"passed": False, "status": "", "wall_s": 0.0, "rss_mb": None,
+              "key": key, "cached": False}
     
     try:
         script_dir = os.path.dirname(os.path.abspath(path)) if os.path.isfile(path) else path
         
-        result = subprocess.run(
-            cmd, 
-            shell=True, 
-            capture_output=True, 
-            text=True, 
-            cwd=script_dir, 
-            timeout=timeout
-        )
+        returncode, output, wall, rss_mb, timed_out = execute(cmd, script_dir, timeout)
+        result["wall_s"] = wall
+        result["rss_mb"] = rss_mb
         
+        if timed_out:
+            result["status"] = f"❌ TIMEOUT (>{timeout}s)"
         # Check return code
-        if result.returncode != 0:
-            print(f"❌ FAIL (exit code {result.returncode})")
-            return False
-        
+        elif returncode != 0:
+            result["status"] = f"❌ FAIL (exit code {returncode})"
         # Check for expected output
-        if validation_string:
-            if validation_string not in result.stdout and validation_string not in result.stderr:
-                print(f"❌ FAIL (missing: '{validation_string[:30]}...')")
-                return False
-        
-        print("✅ PASS")
-        return True
+        elif validation_string and validation_string not in output:
+            result["status"] = f"❌ FAIL (missing: '{validation_string[:30]}...')"
+        else:
+            result["passed"] = True
+            result["status"] = "✅ PASS"
         
-    except subprocess.TimeoutExpired:
-        print(f"❌ TIMEOUT (>{timeout}s)")
-        return False
     except FileNotFoundError:
-        print("❌ NOT FOUND")
-        return False
+        result["status"] = "❌ NOT FOUND"
     except Exception as e:
-        print(f"❌ ERROR: {str(e)[:50]}")
-        return False
+        result["status"] = f"❌ ERROR: {str(e)[:50]}"
+    
+    # Only passes are cached; failures and timeouts always rerun.
+    if cache is not None and result["passed"]:
+        cache[key] = {k: v for k, v in result.items() if k not in ("key", "cached")}
+    
+    return result
+
+def report_test(name, result):
+    """Print one result line in the classic format plus timing/memory."""
+    rss = f"{result['rss_mb']:.0f} MB" if result["rss_mb"] is not None else "n/a"
+    suffix = " [cached]" if result["cached"] else ""
+    print(f"  [{name}]... {result['status']} ({result['wall_s']:.1f}s, peak {rss}){suffix}")
+
+def default_jobs():
+    """Worker count: the cores this process may actually run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
 
 def check_file_exists(name, path):
     """Check if a file exists."""
@@ -331,8 +481,46 @@ def get_standards_files():
 # MAIN VALIDATION
 # ============================================================================
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Portfolio B master validation")
+    parser.add_argument("-j", "--jobs", type=int, default=default_jobs(),
+                        help="parallel experiment workers (default: available cores)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignore cached results and rerun every experiment")
+    parser.add_argument("--timeout", type=int, default=120,
+                        help="per-experiment timeout in seconds")
+    return parser.parse_args(argv)
+
+def pillar_of(path):
+    """Pillar = the proof/ subdirectory an experiment lives in."""
+    rel = os.path.relpath(os.path.abspath(path), BASE_DIR)
+    return rel.split(os.sep)[0]
+
+def print_timing_summary(timings):
+    """Per-test wall/RSS (slowest first) and per-pillar totals."""
+    print("\n" + "=" * 70)
+    print("EXPERIMENT TIMING (slowest first)")
+    print("=" * 70)
+    print(f"  {'Experiment':<40} {'Wall (s)':>9} {'Peak RSS':>10}")
+    for name, _, result in sorted(timings, key=lambda t: -t[2]["wall_s"]):
+        rss = f"{result['rss_mb']:.0f} MB" if result["rss_mb"] is not None else "n/a"
+        tag = " *" if result["cached"] else ""
+        print(f"  {name[:40]:<40} {result['wall_s']:>9.1f} {rss:>10}{tag}")
+    
+    pillars = {}
+    for _, pillar, result in timings:
+        wall, peak = pillars.get(pillar, (0.0, 0.0))
+        pillars[pillar] = (wall + result["wall_s"], max(peak, result["rss_mb"] or 0.0))
+    
+    print("-" * 50)
+    print(f"  {'Pillar':<40} {'Wall (s)':>9} {'Peak RSS':>10}")
+    for pillar, (wall, peak) in sorted(pillars.items(), key=lambda kv: -kv[1][0]):
+        print(f"  {pillar:<40} {wall:>9.1f} {peak:>7.0f} MB")
+    print("  (* = served from cache; wall time is from the cached run)")
+
+def main(argv=None):
     """Run all validations."""
+    args = parse_args(argv)
     start_time = time.time()
     
     print("=" * 70)
@@ -340,6 +528,7 @@ def main():
     print("=" * 70)
     print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"Base: {BASE_DIR}")
+    print(f"Workers: {args.jobs} | Cache: {'off' if args.no_cache else CACHE_FILE}")
     print("=" * 70)
     
     results = {
@@ -353,34 +542,37 @@ def main():
     }
     
     # -------------------------------------------------------------------------
-    # Section 1: Original 8-Week Proofs
-    # -------------------------------------------------------------------------
-    print("\n📋 SECTION 1: Original 8-Week Proofs (10 tests)")
-    print("-" * 50)
-    
-    for name, path, cmd, validation in get_original_proofs():
-        passed = run_test(name, path, cmd, validation)
-        results["original"].append(passed)
-    
-    # -------------------------------------------------------------------------
-    # Section 2: Deep Hardening Proofs
+    # Sections 1-3: schedule every proof script up front, report in order
     # -------------------------------------------------------------------------
-    print("\n📋 SECTION 2: Deep Hardening Proofs (19 tests)")
-    print("-" * 50)
+    proof_sections = [
+        ("original", "SECTION 1: Original 8-Week Proofs (10 tests)", get_original_proofs()),
+        ("hardening", "SECTION 2: Deep Hardening Proofs (19 tests)", get_hardening_proofs()),
+        ("supporting", "SECTION 3: Supporting Systems Proofs (5 tests)", get_supporting_proofs()),
+    ]
     
-    for name, path, cmd, validation in get_hardening_proofs():
-        passed = run_test(name, path, cmd, validation)
-        results["hardening"].append(passed)
+    cache = {} if args.no_cache else load_cache()
+    timings = []
     
-    # -------------------------------------------------------------------------
-    # Section 3: Supporting Systems Proofs
-    # -------------------------------------------------------------------------
-    print("\n📋 SECTION 3: Supporting Systems Proofs (5 tests)")
-    print("-" * 50)
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = {
+            section: [(name, path, pool.submit(run_test, name, path, cmd, validation,
+                                               args.timeout, cache))
+                      for name, path, cmd, validation in tests]
+            for section, _, tests in proof_sections
+        }
+        
+        for section, title, _ in proof_sections:
+            print(f"\n📋 {title}")
+            print("-" * 50)
+            for name, path, future in futures[section]:
+                result = future.result()
+                report_test(name, result)
+                results[section].append(result["passed"])
+                timings.append((name, pillar_of(path), result))
     
-    for name, path, cmd, validation in get_supporting_proofs():
-        passed = run_test(name, path, cmd, validation)
-        results["supporting"].append(passed)
+    if not args.no_cache:
+        # Keep only entries for the current inputs so stale digests don't pile up
+        save_cache({r["key"]: cache[r["key"]] for _, _, r in timings if r["key"] in cache})
     
     # -------------------------------------------------------------------------
     # Section 4: Red Team PCAPs
@@ -427,6 +619,8 @@ def main():
     # -------------------------------------------------------------------------
     elapsed = time.time() - start_time
     
+    print_timing_summary(timings)
+    
     print("\n" + "=" * 70)
     print("VALIDATION SUMMARY")
     print("=" * 70)